@@ -222,6 +222,7 @@ if __debug__:
     debug.register('IFSC', "Incremental Feature Search call")
     debug.register('DS', "*Dataset")
     debug.register('DS_NIFTI', "NiftiDataset(s)")
+    debug.register('DS_OFMRI', "OpenFMRIDataset loading")
     debug.register('DS_', "*Dataset (verbose)")
     debug.register('DS_ID', "ID Datasets")
     debug.register('DS_STATS', "Datasets statistics")
@@ -158,7 +158,7 @@ class ConditionalAttribute(IndexedCollectable):
         # to facilitate testing
         if __debug__ and 'ENFORCE_CA_ENABLED' in debug.active:
             enabled = True
-        self.__enabled = enabled
+        self._enabled = enabled
         self._defaultenabled = enabled
         IndexedCollectable.__init__(self, *args, **kwargs)
 
@@ -168,14 +168,14 @@ class ConditionalAttribute(IndexedCollectable):
                        '_value': self._value})
         # kill the value from Collectable, because we have to put it in the dict
         # to prevent loosing it during reconstruction when the CA is disabled
-        res = (icr[0], (self.__enabled, icr[1][0], None) + icr[1][2:], icr[2])
+        res = (icr[0], (self._enabled, icr[1][0], None) + icr[1][2:], icr[2])
         #if __debug__ and 'COL_RED' in debug.active:
         #    debug('COL_RED', 'Returning %s for %s' % (res, self))
         return res
 
     def __str__(self):
         res = IndexedCollectable.__str__(self)
-        if self.__enabled:
+        if self._enabled:
             res += '+'          # it is enabled but no value is assigned yet
         return res
 
@@ -187,7 +187,7 @@ class ConditionalAttribute(IndexedCollectable):
 
 
     def _set(self, val, init=False):
-        if self.__enabled:
+        if self._enabled:
             # XXX may be should have left simple assignment
             # self._value = val
             IndexedCollectable._set(self, val)
@@ -203,18 +203,18 @@ class ConditionalAttribute(IndexedCollectable):
 
 
     def _get_enabled(self):
-        return self.__enabled
+        return self._enabled
 
 
     def _set_enabled(self, value=False):
-        if self.__enabled == value:
+        if self._enabled == value:
             # Do nothing since it is already in proper state
             return
         if __debug__:
             debug("STV", "%s %s",
                   ({True: 'Enabling', False: 'Disabling'}[value],
                    self))
-        self.__enabled = value
+        self._enabled = value
 
 
     enabled = property(fget=_get_enabled, fset=_set_enabled)
@@ -15,6 +15,8 @@ __docformat__ = 'restructuredtext'
 import copy, re
 import numpy as np
 
+from itertools import count as _count
+
 from mvpa2.base.dochelpers import _str, borrowdoc
 from mvpa2.base.types import is_sequence_type
 
@@ -30,16 +32,65 @@ if __debug__:
 _object_getattribute = dict.__getattribute__
 _object_setattr = dict.__setattr__
 _object_setitem = dict.__setitem__
+_object_get = dict.get
 
 # To validate fresh
 _dict_api = set(dict.__dict__)
 
+# normalized docstrings, shared among all collectables with the same doc
+_docs = {}
+# source of version stamps for assigned values of sequence collectables
+_versions = _count()
+
+
+def _normalize_doc(doc):
+    """Return `doc` without newlines, reusing a previously normalized copy"""
+    try:
+        return _docs[doc]
+    except KeyError:
+        pass
+    except TypeError:
+        # unhashable, e.g. some old datasets stored in HDF5
+        return _normalize_doc(np.asscalar(doc))
+    try:
+        normalized = re.sub('[\n ]+', ' ', doc)
+    except TypeError:
+        # catch some old datasets stored in HDF5
+        normalized = re.sub('[\n ]+', ' ', np.asscalar(doc))
+    if len(_docs) < 10000:
+        _docs[doc] = normalized
+    return normalized
+
+
+class _InstanceDoc(object):
+    """Descriptor for the documentation of a collectable instance
+
+    Collectables have no instance dictionary, hence their `__doc__` is
+    stored in a slot. The class docstring remains accessible via the class.
+    """
+    __slots__ = ('_classdoc',)
+
+    def __init__(self, classdoc):
+        self._classdoc = classdoc
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self._classdoc
+        return obj._doc
+
+    def __set__(self, obj, value):
+        obj._doc = value
+
+
 class Collectable(object):
     """Collection element.
 
     A named single item container that allows for type, or property checks of
     an assigned value, and also offers utility functionality.
     """
+    __doc__ = _InstanceDoc(__doc__)
+    __slots__ = ('_doc', '__name', '_value')
+
     def __init__(self, value=None, name=None, doc=None):
         """
         Parameters
@@ -54,18 +105,14 @@ class Collectable(object):
         """
         if doc is not None:
             # to prevent newlines in the docstring
-            try:
-                doc = re.sub('[\n ]+', ' ', doc)
-            except TypeError:
-                # catch some old datasets stored in HDF5
-                doc = re.sub('[\n ]+', ' ', np.asscalar(doc))
+            doc = _normalize_doc(doc)
 
         self.__doc__ = doc
         self.__name = name
         self._value = None
         if value is not None:
             self._set(value)
-        if __debug__ and __mvpadebug__:
+        if __debug__ and __mvpadebug__ and 'COL' in debug.active:
             debug("COL", "Initialized %r", (self,))
 
 
@@ -88,7 +135,7 @@ class Collectable(object):
 
 
     def _set(self, val):
-        if __debug__ and __mvpadebug__:
+        if __debug__ and __mvpadebug__ and 'COL' in debug.active:
             # Since this call is quite often, don't convert
             # values to strings here, rely on passing them
             # withing msgargs
@@ -106,6 +153,13 @@ class Collectable(object):
                     (self._value, self.name, self.__doc__))
 
 
+    def __setstate__(self, state):
+        # state of derived classes might refer to slots, hence it cannot
+        # simply be put into the instance dictionary
+        for k, v in state.iteritems():
+            setattr(self, k, v)
+
+
     def __repr__(self):
         value = self.value
         return "%s(name=%s, doc=%s, value=%s)" % (self.__class__.__name__,
@@ -157,7 +211,15 @@ class SequenceCollectable(Collectable):
 
     It takes care about caching and recomputing unique values, as well as
     optional checking if assigned sequences have a desired length.
+
+    Every assignment of a value stamps the collectable with a new `version`,
+    which can be used to validate anything computed from the value (e.g. the
+    cached unique values).
     """
+    __doc__ = _InstanceDoc(__doc__)
+    __slots__ = ('_target_length', '_version', '_unique_values',
+                 '_factorization')
+
     def __init__(self, value=None, name=None, doc="Sequence attribute",
                  length=None):
         """
@@ -182,8 +244,10 @@ class SequenceCollectable(Collectable):
             raise ValueError("%s only takes sequences as value."
                              % self.__class__.__name__)
         self._target_length = length
-        Collectable.__init__(self, value=value, name=name, doc=doc)
+        self._unique_values = None
+        self._factorization = None
         self._reset_unique()
+        Collectable.__init__(self, value=value, name=name, doc=doc)
 
 
     def __reduce__(self):
@@ -224,7 +288,17 @@ class SequenceCollectable(Collectable):
 
 
     def _reset_unique(self):
-        self._unique_values = None
+        """Invalidate everything computed from the current value
+
+        Needs to be called after in-place modifications of the value.
+        """
+        self._version = _versions.next()
+
+
+    @property
+    def version(self):
+        """Stamp of the current value, changing with every assignment"""
+        return self._version
 
 
     @property
@@ -233,27 +307,95 @@ class SequenceCollectable(Collectable):
         """
         if self.value is None:
             return None
-        if self._unique_values is None:
+        cached = self._unique_values
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        try:
+            unique_values = np.unique(self.value)
+        except TypeError:
+            # We are probably on Python 3 and value contains None's
+            # or any other different type breaking the comparison
+            # so operate through set()
+            # See http://projects.scipy.org/numpy/ticket/2188
+
+            # Get a 1-D array
+            #  list around set is required for Python3
+            value_unique = list(set(np.asanyarray(self.value).ravel()))
             try:
-                self._unique_values = np.unique(self.value)
-            except TypeError:
-                # We are probably on Python 3 and value contains None's
-                # or any other different type breaking the comparison
-                # so operate through set()
-                # See http://projects.scipy.org/numpy/ticket/2188
-
-                # Get a 1-D array
-                #  list around set is required for Python3
-                value_unique = list(set(np.asanyarray(self.value).ravel()))
-                try:
-                    self._unique_values = np.array(value_unique)
-                except ValueError:
-                    # without forced dtype=object it might have failed due to
-                    # something related to
-                    # http://bugs.debian.org/cgi-bin/bugreport.cgi?bug=679948
-                    # which was fixed recently...
-                    self._unique_values = np.array(value_unique, dtype=object)
-        return self._unique_values
+                unique_values = np.array(value_unique)
+            except ValueError:
+                # without forced dtype=object it might have failed due to
+                # something related to
+                # http://bugs.debian.org/cgi-bin/bugreport.cgi?bug=679948
+                # which was fixed recently...
+                unique_values = np.array(value_unique, dtype=object)
+        self._unique_values = (self._version, unique_values)
+        return unique_values
+
+
+    def _get_factorization(self):
+        cached = self._factorization
+        if cached is not None and cached[0] == self._version:
+            return cached
+        value = np.asanyarray(self.value)
+        if value.ndim != 1:
+            raise ValueError("Codes of unique values are only available for "
+                             "one-dimensional values (got %i dimensions in "
+                             "attribute '%s')." % (value.ndim, self.name))
+        try:
+            unique_values, codes = np.unique(value, return_inverse=True)
+            self._unique_values = (self._version, unique_values)
+        except TypeError:
+            # see `unique` -- fall back on elementwise comparisons
+            from mvpa2.misc.support import array_whereequal
+            unique_values = self.unique
+            codes = np.zeros(len(value), dtype=int)
+            for i, u in enumerate(unique_values):
+                codes[array_whereequal(value, u)] = i
+        # stable sort keeps the indices of each group in ascending order
+        order = np.argsort(codes, kind='mergesort')
+        bounds = np.cumsum(np.bincount(codes, minlength=len(unique_values)))
+        groups = np.split(order, bounds[:-1])
+        # shared among all consumers (and shallow copies)
+        for a in [codes] + groups:
+            a.flags.writeable = False
+        cached = self._factorization = (self._version, codes, groups)
+        return cached
+
+
+    @property
+    def codes(self):
+        """Index of the unique value (see `unique`) of each element
+
+        Only available for one-dimensional values. Computed once and reused
+        until another value gets assigned.
+        """
+        if self.value is None:
+            return None
+        return self._get_factorization()[1]
+
+
+    @property
+    def group_indices(self):
+        """Indices of the elements with each unique value (see `unique`)
+
+        List of arrays in the order of the unique values, with indices in
+        ascending order. Only available for one-dimensional values.
+        """
+        if self.value is None:
+            return None
+        return self._get_factorization()[2]
+
+
+    def _reuse_caches(self, other):
+        """Reuse everything `other` computed for a value equal to ours"""
+        version = self._version
+        cached = other._unique_values
+        if cached is not None and cached[0] == other._version:
+            self._unique_values = (version, cached[1])
+        cached = other._factorization
+        if cached is not None and cached[0] == other._version:
+            self._factorization = (version,) + cached[1:]
 
 
     def set_length_check(self, value):
@@ -275,12 +417,17 @@ class ArrayCollectable(SequenceCollectable):
 
     When shallow-copied it includes a view of the array in the copy.
     """
+    __doc__ = _InstanceDoc(__doc__)
+    __slots__ = ()
+
     def __copy__(self):
         # preserve attribute type
         copied = self.__class__(name=self.name, doc=self.__doc__,
                                 length=self._target_length)
         # just get a view of the old data!
         copied.value = self.value.view()
+        # which has the same unique values
+        copied._reuse_caches(self)
         return copied
 
 
@@ -305,15 +452,18 @@ class ArrayCollectable(SequenceCollectable):
 
 class SampleAttribute(ArrayCollectable):
     """Per sample attribute in a dataset"""
-    pass
+    __doc__ = _InstanceDoc(__doc__)
+    __slots__ = ()
 
 class FeatureAttribute(ArrayCollectable):
     """Per feature attribute in a dataset"""
-    pass
+    __doc__ = _InstanceDoc(__doc__)
+    __slots__ = ()
 
 class DatasetAttribute(ArrayCollectable):
     """Dataset attribute"""
-    pass
+    __doc__ = _InstanceDoc(__doc__)
+    __slots__ = ()
 
 
 
@@ -486,17 +636,21 @@ class Collection(dict):
 
 
     def __getattribute__(self, key):
-        try:
-            return self[key].value
-        except KeyError:
+        # avoid raising (and catching) KeyError for every access to
+        # methods and attributes of the collection itself
+        item = _object_get(self, key)
+        if item is None:
             return _object_getattribute(self, key)
+        return item.value
 
 
     def __setattr__(self, key, value):
-        try:
-            self[key].value = value
-        except KeyError:
+        item = _object_get(self, key)
+        if item is None:
             _object_setattr(self, key, value)
+            return
+        try:
+            item.value = value
         except Exception, e:
             # catch any other exception in order to provide a useful error message
             errmsg = "parameter '%s' cannot accept value `%r` (%s)" % (key, value, str(e))
@@ -524,6 +678,10 @@ class Collection(dict):
 class UniformLengthCollection(Collection):
     """Container for attributes with the same length.
     """
+    # instance dictionary is only allocated if any other attribute gets
+    # assigned
+    __slots__ = ('_uniform_length',)
+
     def __init__(self, items=None, length=None):
         """
         Parameters
@@ -11,12 +11,13 @@
 __docformat__ = 'restructuredtext'
 
 from os.path import lexists
+import inspect
 import numpy as np
 import copy
 
 from mvpa2.base import externals, cfg, warning
 from mvpa2.base.collections import SampleAttributesCollection, \
-    FeatureAttributesCollection, DatasetAttributesCollection
+    FeatureAttributesCollection, DatasetAttributesCollection, ArrayCollectable
 from mvpa2.base.types import is_datasetlike
 from mvpa2.base.dochelpers import _str, _strid
 
@@ -465,11 +466,17 @@ class AttrDataset(object):
 
         # per-sample attributes; always needs to run even if slice(None), since
         # we need fresh SamplesAttributes even if they share the data
+        all_samples = isinstance(args[0], slice) and args[0] == slice(None)
         for attr in self.sa.values():
-            # preserve attribute type
-            newattr = attr.__class__(doc=attr.__doc__)
-            # slice
-            newattr.value = attr.value[args[0]]
+            if all_samples and isinstance(attr, ArrayCollectable):
+                # a view, which also shares cached unique values etc. (most
+                # common case for selecting features, e.g. in searchlights)
+                newattr = attr.__copy__()
+            else:
+                # preserve attribute type
+                newattr = attr.__class__(doc=attr.__doc__)
+                # slice
+                newattr.value = attr.value[args[0]]
             # assign to target collection
             sa[attr.name] = newattr
 
@@ -747,14 +754,14 @@ def vstack(datasets, a=None):
     stacked_samp = np.concatenate([ds.samples for ds in datasets], axis=0)
 
     stacked_sa = {}
+    sas = [ds.sa for ds in datasets]
     for attr in datasets[0].sa:
         stacked_sa[attr] = np.concatenate(
-            [ds.sa[attr].value for ds in datasets], axis=0)
+            [sa[attr].value for sa in sas], axis=0)
     # create the dataset
     merged = datasets[0].__class__(stacked_samp, sa=stacked_sa)
 
-    for ds in datasets:
-        merged.fa.update(ds.fa)
+    merged.fa.update(_merge_collections([ds.fa for ds in datasets]))
 
     _stack_add_equal_dataset_attributes(merged, datasets, a)
     return merged
@@ -816,14 +823,14 @@ def hstack(datasets, a=None):
     stacked_samp = np.concatenate([ds.samples for ds in datasets], axis=1)
 
     stacked_fa = {}
+    fas = [ds.fa for ds in datasets]
     for attr in datasets[0].fa:
         stacked_fa[attr] = np.concatenate(
-            [ds.fa[attr].value for ds in datasets], axis=0)
+            [fa[attr].value for fa in fas], axis=0)
     # create the dataset
     merged = datasets[0].__class__(stacked_samp, fa=stacked_fa)
 
-    for ds in datasets:
-        merged.sa.update(ds.sa)
+    merged.sa.update(_merge_collections([ds.sa for ds in datasets]))
 
     _stack_add_equal_dataset_attributes(merged, datasets, a)
 
@@ -950,15 +957,10 @@ def _stack_add_equal_dataset_attributes(merged_dataset, datasets, a=None):
     # consider all keys that are present in at least one dataset
     all_keys = set.union(*[set(dataset.a.keys()) for dataset in datasets])
 
-    def _contains(xs, y, comparator=all_equal):
-        for x in xs:
-            if comparator(x, y):
-                return True
-        return False
-
     for key in all_keys:
         add_key = True
         values = []
+        uniques = _UniqueValues()
         for i, dataset in enumerate(datasets):
             if not key in dataset.a:
                 if a == 'all':
@@ -968,19 +970,19 @@ def _stack_add_equal_dataset_attributes(merged_dataset, datasets, a=None):
             value = dataset.a[key].value
 
             if a in ('drop_nonunique', 'unique'):
-                if not values:
-                    values.append(value)
-                elif not _contains(values, value):
+                if not uniques.values:
+                    uniques.add(value)
+                elif not value in uniques:
                     if a == 'unique':
                         raise DatasetError("Not unique dataset attribute value "
                                            " for %s: %s and %s"
-                                           % (key, values[0], value))
+                                           % (key, uniques.values[0], value))
                     else:
                         add_key = False
                         break
             elif a == 'uniques':
-                if not _contains(values, value):
-                    values.append(value)
+                if not value in uniques:
+                    uniques.add(value)
             elif a == 'all':
                 values.append(value)
             else:
@@ -988,11 +990,104 @@ def _stack_add_equal_dataset_attributes(merged_dataset, datasets, a=None):
 
         if add_key:
             if a in ('drop_nonunique', 'unique'):
-                merged_dataset.a[key] = values[0]
+                merged_dataset.a[key] = uniques.values[0]
+            elif a == 'uniques':
+                merged_dataset.a[key] = tuple(uniques.values)
             else:
                 merged_dataset.a[key] = tuple(values)
 
 
+def _merge_collections(collections):
+    """Merge the collectables of a sequence of collections into a dict.
+
+    Collectables with identical keys in later collections override earlier
+    ones, as sequential ``Collection.update()`` calls would do, but the target
+    collection has to process each key only once.
+    """
+    merged = {}
+    prev = None
+    for col in collections:
+        # stacked datasets often share their collections
+        if col is not prev:
+            merged.update(col)
+            prev = col
+    return merged
+
+
+# types of values that are compared by their hash when stacking dataset
+# attributes
+_HASHED_ATTR_TYPES = (basestring, int, long, float, complex,
+                      np.number, np.bool_, type(None))
+_identity_eq_cache = {}
+
+
+def _has_identity_eq(cls):
+    """Whether instances of `cls` only compare equal to themselves"""
+    try:
+        return _identity_eq_cache[cls]
+    except KeyError:
+        pass
+    res = not any('__eq__' in c.__dict__ or '__cmp__' in c.__dict__
+                  for c in inspect.getmro(cls) if not c is object)
+    _identity_eq_cache[cls] = res
+    return res
+
+
+def _get_hash_key(value):
+    """Key for hash-based comparison of `value`, or None if not applicable
+
+    0-d arrays compare equal to the scalar they contain, hence they are
+    looked up by that scalar.
+    """
+    if isinstance(value, np.ndarray) and value.ndim == 0:
+        value = value.item()
+    if isinstance(value, _HASHED_ATTR_TYPES):
+        return (value,)
+    return None
+
+
+class _UniqueValues(object):
+    """Ordered collection of unique dataset attribute values.
+
+    Values are considered equal according to `all_equal()`, but lookups
+    first check identity, and hashes for simple scalars (including 0-d
+    arrays). Pairwise
+    comparisons are only done for values that support neither, e.g.
+    arrays, and only among those. Instances of classes without an
+    equality operator (e.g. most mappers) are compared by identity only.
+    Hence stacking many datasets is no longer quadratic in the number of
+    distinct values.
+    """
+    def __init__(self):
+        self.values = []
+        self._ids = set()
+        self._hashed = set()
+        self._compared = []
+
+    def __contains__(self, value):
+        if id(value) in self._ids:
+            return True
+        key = _get_hash_key(value)
+        if key is not None:
+            return key in self._hashed
+        if _has_identity_eq(value.__class__):
+            return False
+        for x in self._compared:
+            if all_equal(x, value):
+                return True
+        return False
+
+    def add(self, value):
+        self.values.append(value)
+        # all values are referenced in self.values, hence ids stay unique
+        self._ids.add(id(value))
+        key = _get_hash_key(value)
+        if key is not None:
+            self._hashed.add(key)
+        elif not _has_identity_eq(value.__class__):
+            self._compared.append(value)
+
+
 def _expand_attribute(attr, length, attr_name):
     """Helper function to expand attributes to a desired length.
 
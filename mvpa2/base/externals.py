@@ -13,6 +13,9 @@ __docformat__ = 'restructuredtext'
 
 import os
 import sys
+import hashlib as _hashlib
+import json as _json
+import tempfile
 import numpy as np                      # NumPy is required anyways
 import warnings
 
@@ -596,6 +599,129 @@ _KNOWN = {'libsvm': 'import mvpa2.clfs.libsvmc._svm as __; x=__.seq_to_svm_node'
           'datalad': "__check('datalad')",
           }
 
+# results of these checks depend on the running process, hence they are
+# never stored in the persistent cache
+_RUNTIME_CHECKS = frozenset(('running ipython env', 'pylab plottable'))
+# these checks also configure the external when it is present, hence only
+# negative results are taken from the persistent cache
+_CONFIGURING_CHECKS = frozenset((
+    'libsvm verbosity control', 'matplotlib', 'pylab', 'rpy2', 'lars',
+    'mass', 'elasticnet', 'glmnet', 'cran-energy'))
+# only the built-in checks are cached
+_CACHEABLE = frozenset(_KNOWN) - _RUNTIME_CHECKS
+
+_persistent_cache = {}
+"""Results of checks stored on disk, loaded on first use"""
+
+
+def _persistent_cache_key():
+    """Identify the environment in which externals were checked
+
+    Besides the interpreter (which determines the cache file), results of
+    the checks depend on the module search path and what is installed in it,
+    hence on modification times of the directories in the search path (and
+    of the directory of PyMVPA itself, where extensions might be built in
+    place).
+    """
+    cwd = os.getcwd()
+    mvpa_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = [os.path.abspath(p) for p in sys.path]
+    mtimes = []
+    for p in paths + [mvpa_dir, os.path.join(mvpa_dir, 'clfs', 'libsvmc')]:
+        # the current directory is modified too often to be considered
+        if p == cwd or not os.path.exists(p):
+            mtimes.append(None)
+        else:
+            mtimes.append(os.stat(p).st_mtime)
+    return _hashlib.sha1(repr((paths, mtimes))).hexdigest()
+
+
+def _get_persistent_cache_filename():
+    """Return filename of the persistent cache for the current interpreter
+
+    There is a single file per interpreter, which only holds results for the
+    most recently seen environment (see :func:`_persistent_cache_key`).
+    """
+    cache_dir = cfg.get('externals', 'cache dir', default=None)
+    if not cache_dir:
+        cache_dir = os.path.join(
+            os.environ.get('XDG_CACHE_HOME',
+                           os.path.join(os.path.expanduser('~'), '.cache')),
+            'pymvpa2')
+    interpreter = _hashlib.sha1(repr((sys.executable, sys.version))
+                               ).hexdigest()
+    return os.path.join(cache_dir, 'externals-%s.json' % interpreter)
+
+
+def _load_persistent_cache():
+    """Load results of checks from the persistent cache (once)"""
+    if 'results' not in _persistent_cache:
+        results = {}
+        filename = _get_persistent_cache_filename()
+        key = _persistent_cache_key()
+        _persistent_cache['filename'] = filename
+        _persistent_cache['key'] = key
+        if os.path.exists(filename):
+            try:
+                with open(filename) as f:
+                    stored = _json.load(f)
+                if stored.get('key') == key:
+                    results = dict((k, bool(v))
+                                   for k, v in stored['results'].iteritems())
+                elif __debug__:
+                    debug('EXT', "Ignoring persistent cache %s of another "
+                          "environment" % filename)
+            except (IOError, ValueError, KeyError, AttributeError), e:
+                if __debug__:
+                    debug('EXT', "Ignoring persistent cache %s: %s"
+                          % (filename, e))
+        _persistent_cache['results'] = results
+    return _persistent_cache['results']
+
+
+def _store_persistent_cache(dep, result):
+    """Store the result of a check in the persistent cache"""
+    results = _load_persistent_cache()
+    if results.get(dep) is result:
+        return
+    results[dep] = result
+    filename = _persistent_cache['filename']
+    try:
+        cache_dir = os.path.dirname(filename)
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # write atomically, other processes might be reading it
+        fd, tmpname = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            # results of another environment get replaced
+            _json.dump({'key': _persistent_cache['key'], 'results': results},
+                       f, indent=1, sort_keys=True)
+        os.rename(tmpname, filename)
+    except (IOError, OSError), e:
+        if __debug__:
+            debug('EXT', "Failed to store persistent cache %s: %s"
+                  % (filename, e))
+
+
+def _use_persistent_cache(dep):
+    return dep in _CACHEABLE \
+           and cfg.getboolean('externals', 'persistent cache', True)
+
+
+def clear_persistent_cache():
+    """Remove stored results of checks for the current interpreter
+
+    Returns
+    -------
+    str
+      Name of the (removed) cache file.
+    """
+    filename = _get_persistent_cache_filename()
+    if os.path.exists(filename):
+        os.unlink(filename)
+    _persistent_cache.clear()
+    return filename
+
 
 def exists(dep, force=False, raise_=False, issueWarning=None,
            exception=RuntimeError):
@@ -624,6 +750,14 @@ def exists(dep, force=False, raise_=False, issueWarning=None,
       text.
     exception : exception, optional
       What exception to raise.  Defaults to RuntimeError
+
+    Notes
+    -----
+    Unless configured otherwise (option 'persistent cache' in section
+    'externals'), results of checks are also stored on disk and reused by
+    other processes in the same environment (interpreter, module search
+    path, and installed modules), so that expensive checks do not have
+    to be repeated.  See :func:`clear_persistent_cache`.
     """
     # if we are provided with a list of deps - go through all of them
     if isinstance(dep, (list, tuple)):
@@ -662,8 +796,20 @@ def exists(dep, force=False, raise_=False, issueWarning=None,
     # default to 'not found'
     result = False
 
+    cached = None
     if dep not in _KNOWN:
         raise ValueError("%r is not a known dependency key." % (dep,))
+    elif not force and _use_persistent_cache(dep) \
+             and not cfg.getboolean('externals', 'retest', default='no'):
+        cached = _load_persistent_cache().get(dep)
+        if cached and dep in _CONFIGURING_CHECKS:
+            cached = None
+
+    if cached is not None:
+        if __debug__:
+            debug('EXT', "Presence of %s is%s known from persistent cache"
+                  % (dep, {True: '', False: ' NOT'}[cached]))
+        result = cached
     else:
         # try and load the specific dependency
         if __debug__:
@@ -700,6 +846,9 @@ def exists(dep, force=False, raise_=False, issueWarning=None,
             debug('EXT', "Presence of %s%s is%s verified%s" %
                   (dep, vstr, {True: '', False: ' NOT'}[result], error_str))
 
+        if _use_persistent_cache(dep):
+            _store_persistent_cache(dep, result)
+
     if not result:
         if raise_:
             raise exception("Required external '%s' was not found" % dep)
@@ -120,7 +120,7 @@ class Learner(Node):
         if got_ds and (ds.nfeatures == 0 or len(ds) == 0):
             raise DegenerateInputError(
                 "Cannot train learner on degenerate data %s" % ds)
-        if __debug__:
+        if __debug__ and 'LRN' in debug.active:
             debug(
                 "LRN",
                 "Training learner %(lrn)s on dataset %(dataset)s",
@@ -154,7 +154,7 @@ class Learner(Node):
         # finally flag as trained
         self._set_trained()
 
-        if __debug__:
+        if __debug__ and 'LRN' in debug.active:
             debug(
                 "LRN",
                 "Finished training learner %(lrn)s on dataset %(dataset)s",
@@ -239,7 +239,7 @@ class Learner(Node):
                           (self, ds))
                 # but retraining is enforced
                 self.train(ds)
-            elif __debug__:
+            elif __debug__ and 'LRN' in debug.active:
                 debug('LRN', "Skipping training of already trained %s on %s",
                       (self, ds))
         else:
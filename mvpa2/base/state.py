@@ -68,6 +68,7 @@ _def_sep = ('`', '')[int(_in_ipython)]
 
 _object_getattribute = object.__getattribute__
 _object_setattr = object.__setattr__
+_dict_get = dict.get
 
 ###################################################################
 # Collections
@@ -452,9 +453,23 @@ class ConditionalAttributesCollection(Collection):
                     self[name].value = operation(fromstate[name].value)
 
 
+    def __setattr__(self, key, value):
+        item = _dict_get(self, key)
+        if item.__class__ is ConditionalAttribute \
+               and not (__debug__ and 'COL' in debug.active):
+            # shortcut for the most frequent operation: storing a value
+            # (if enabled) without going through the value property
+            if item._enabled:
+                item._value = value
+                item._isset = True
+            return
+        BaseCollection.__setattr__(self, key, value)
+
+
     def is_enabled(self, key):
         """Returns `True` if state `key` is enabled"""
-        return key in self and self[key].enabled
+        item = _dict_get(self, key)
+        return item is not None and item._enabled
 
 
     def is_active(self, key):
@@ -38,6 +38,31 @@ def accepts_dataset_as_samples(fx):
     return extract_samples
 
 
+def get_float_dtype(dtype):
+    """Floating point dtype to hold results computed from data of `dtype`.
+
+    Floating point data keeps its dtype, so e.g. float32 samples are
+    processed without upcasting them to float64.  Any other data (integer,
+    boolean) is converted into the dtype configured by the ``float dtype``
+    option of the ``datasets`` section (environment variable
+    ``MVPA_DATASETS_FLOAT_DTYPE``), which is float64 by default.
+
+    Note that results computed in float32 typically agree with the ones
+    computed in float64 only up to a relative tolerance of about 1e-5.
+
+    Parameters
+    ----------
+    dtype : dtype or str
+      Type of the input data.
+    """
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.inexact):
+        return dtype
+    # lazy import to avoid circular dependency on mvpa2.base
+    from mvpa2.base import cfg
+    return np.dtype(cfg.get('datasets', 'float dtype', default='float64'))
+
+
 def asobjarray(x):
     """Generates numpy.ndarray with dtype object from an iterable
 
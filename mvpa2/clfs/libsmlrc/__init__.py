@@ -34,11 +34,41 @@ if externals.exists('ctypes', raise_=True):
     else:
         smlrlib = np.ctypeslib.load_library('smlrc', os.path.dirname(__file__))
 
+def max_threads():
+    """Number of threads the C implementation could use at most.
+
+    It is 1 if the extension was built without OpenMP support.
+    """
+    func = smlrlib.max_threads
+    func.restype = C.c_int
+    return func()
+
+
+def is_supported_array(X):
+    """Whether `X` could be passed to `stepwise_regression` without a copy.
+
+    Any aligned 2D float32 or float64 array, regardless of its memory
+    layout, is accepted by the C code.
+    """
+    return (isinstance(X, np.ndarray)
+            and X.ndim == 2
+            and X.dtype in (np.float32, np.float64)
+            and X.flags['ALIGNED']
+            and not (X.strides[0] % X.itemsize or X.strides[1] % X.itemsize))
+
+
 # wrap the stepwise function
-def stepwise_regression(*args):
+def stepwise_regression(w, X, XY, Xw, E, auto_corr, lambda_over_2_auto_corr,
+                        S, M, maxiter, convergence_tol, resamp_decay,
+                        min_resamp, verbose, seed, nthreads=1):
+    if not is_supported_array(X):
+        raise ValueError("X must be an aligned 2D float32 or float64 array. "
+                         "Got %s array with strides %s"
+                         % (X.dtype, X.strides))
     func = smlrlib.stepwise_regression
     func.argtypes = [C.c_int, C.c_int, c_darray,
-                     C.c_int, C.c_int, c_darray,
+                     C.c_int, C.c_int, C.c_void_p,
+                     C.c_long, C.c_long, C.c_int,
                      C.c_int, C.c_int, c_darray,
                      C.c_int, C.c_int, c_darray,
                      C.c_int, C.c_int, c_darray,
@@ -50,11 +80,23 @@ def stepwise_regression(*args):
                      C.c_double,
                      C.c_float,
                      C.c_float,
-                     C.c_int64]
+                     C.c_int,
+                     C.c_int64,
+                     C.c_int]
     func.restype = C.c_long
 
+    # X goes in as a plain pointer with strides in elements, so the C
+    # code could handle arbitrary views without copying
+    Xargs = list(X.shape) + [X.ctypes.data,
+                             X.strides[0] // X.itemsize,
+                             X.strides[1] // X.itemsize,
+                             int(X.dtype == np.float32)]
     # get the new arglist
-    arglist = extend_args(*args)
+    arglist = extend_args(w) + Xargs \
+              + extend_args(XY, Xw, E, auto_corr, lambda_over_2_auto_corr, S,
+                            M, maxiter, convergence_tol, resamp_decay,
+                            min_resamp, verbose,
+                            0 if seed is None else seed, nthreads)
     return func(*arglist)
 
 if __debug__:
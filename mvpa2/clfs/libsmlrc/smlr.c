@@ -9,6 +9,15 @@
 
 #include <Python.h>
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+/* Minimal number of samples each thread has to get before the per-weight
+   loops over samples are split across threads -- for smaller problems the
+   threading overhead dominates any gain */
+#define SMLR_MIN_SAMPLES_PER_THREAD 256
+
 /* Following code is for compatibility with Python3
    Example taken from: http://docs.python.org/py3k/howto/cporting.html#module-initialization-and-state
 */
@@ -100,9 +109,28 @@ initsmlrc(void)
 #define DL_EXPORT(RTYPE) RTYPE
 #endif
 
+
+/* Number of threads actually available for the stepwise regression.
+   Returns 1 if the library was built without OpenMP support. */
+DL_EXPORT(int)
+max_threads(void)
+{
+#ifdef _OPENMP
+  return omp_get_max_threads();
+#else
+  return 1;
+#endif
+}
+
+/* X is accessed through a generic pointer with strides given in elements
+   (not bytes), so any aligned float32 or float64 view (transposed, sliced,
+   Fortran-ordered) can be processed without a prior copy */
+#define XVAL(idx) (Xf ? (double)Xf[(idx)] : Xd[(idx)])
+
 DL_EXPORT(int)
 stepwise_regression(int w_rows, int w_cols, double w[],
-			int X_rows, int X_cols, double X[],
+			int X_rows, int X_cols, void *X,
+			long X_rstride, long X_cstride, int X_float32,
 			int XY_rows, int XY_cols, double XY[],
 			int Xw_rows, int Xw_cols, double Xw[],
 			int E_rows, int E_cols, double E[],
@@ -115,7 +143,8 @@ stepwise_regression(int w_rows, int w_cols, double w[],
 			float resamp_decay,
 			float min_resamp,
 			int verbose,
-			long long int seed)
+			long long int seed,
+			int nthreads)
 {
   // initialize the iterative optimization
   double incr = DBL_MAX;
@@ -146,11 +175,15 @@ stepwise_regression(int w_rows, int w_cols, double w[],
   // loop indexes
   int i = 0;
 
-  // pointers to elements to avoid explicit indexing
-  double* Sp = (double*) NULL;
-  double* Ep = (double*) NULL;
-  double* Xp = (double*) NULL;
-  double* Xwp = (double*) NULL;
+  // whether to split loops over samples across threads
+  int use_threads = 0;
+
+  // typed views of X -- exactly one of them is set
+  const float* Xf = X_float32 ? (const float*) X : (const float*) NULL;
+  const double* Xd = X_float32 ? (const double*) NULL : (const double*) X;
+
+  // offset of the currently processed column of X
+  long Xoff = 0;
 
   // prob of resample each weight
   // allocate everything in heap -- not on stack
@@ -159,13 +192,23 @@ stepwise_regression(int w_rows, int w_cols, double w[],
   for (i=0; i<w_rows; i++)
     p_resamp[i] = (float*)calloc(w_cols, sizeof(float));
 
+  // figure out the number of threads
+#ifdef _OPENMP
+  if (nthreads <= 0)
+    nthreads = omp_get_max_threads();
+#else
+  nthreads = 1;
+#endif
+  use_threads = (nthreads > 1) && (ns >= nthreads*SMLR_MIN_SAMPLES_PER_THREAD);
+
   // initialize random seed
   if (seed == 0)
     seed = (long long int)time(NULL);
 
   if (verbose)
   {
-    fprintf(stdout, "SMLR: random seed=%lld\n", seed);
+    fprintf(stdout, "SMLR: random seed=%lld ; nthreads=%d (%s)\n", seed,
+	    nthreads, use_threads ? "used" : "unused");
     fflush(stdout);
   }
 
@@ -186,6 +229,7 @@ stepwise_regression(int w_rows, int w_cols, double w[],
     // update each weight
     for (basis=0; basis<nd; basis++)
     {
+      Xoff = basis*X_cstride;
       for (m=0; m<w_cols; m++)
       {
 	// get the starting weight
@@ -203,12 +247,12 @@ stepwise_regression(int w_rows, int w_cols, double w[],
 	{
 	  // calc the probability
 	  XdotP = 0.0;
-	  for (i=0, Xp=X+basis, Ep=E+m;
-	       i<ns; i++)
+#ifdef _OPENMP
+#pragma omp parallel for reduction(+:XdotP) num_threads(nthreads) if(use_threads)
+#endif
+	  for (i=0; i<ns; i++)
 	  {
-	    XdotP += (*Xp) * (*Ep)/S[i];
-	    Xp += X_cols;
-	    Ep += E_cols;
+	    XdotP += XVAL(i*X_rstride + Xoff) * E[(long)i*E_cols + m]/S[i];
 	  }
 
 	  // get the gradient
@@ -287,17 +331,15 @@ stepwise_regression(int w_rows, int w_cols, double w[],
 	  {
 	    // update the expected values
 	    w_diff = w_new - w_old;
-	    for (Sp=S, Xp=X+basis, Ep=E+m, Xwp=Xw+m;
-		 Sp<S+S_rows; Sp++)
+#ifdef _OPENMP
+#pragma omp parallel for private(E_new_m) num_threads(nthreads) if(use_threads)
+#endif
+	    for (i=0; i<ns; i++)
 	    {
-	      (*Xwp) += (*Xp)*w_diff;
-	      E_new_m = exp(*Xwp);
-	      *Sp += E_new_m - *Ep;
-	      *Ep = E_new_m;
-
-	      Xp += X_cols;
-	      Ep += E_cols;
-	      Xwp += Xw_cols;
+	      Xw[(long)i*Xw_cols + m] += XVAL(i*X_rstride + Xoff)*w_diff;
+	      E_new_m = exp(Xw[(long)i*Xw_cols + m]);
+	      S[i] += E_new_m - E[(long)i*E_cols + m];
+	      E[(long)i*E_cols + m] = E_new_m;
 	    }
 
 	    // update the weight
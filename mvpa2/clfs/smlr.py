@@ -32,6 +32,7 @@ if externals.exists('ctypes'):
     # Uber-fast C-version of the stepwise regression
     try:
         from mvpa2.clfs.libsmlrc import stepwise_regression as _cStepwiseRegression
+        from mvpa2.clfs.libsmlrc import is_supported_array as _cSupportsArray
         _DEFAULT_IMPLEMENTATION = "C"
     except OSError, e:
         warning("Failed to load fast implementation of SMLR.  May be you "
@@ -119,6 +120,16 @@ class SMLR(Classifier):
              stepwise_regression. C version brings significant speedup thus is
              the default one.""")
 
+    nthreads = Parameter(1, constraints=EnsureInt() & EnsureRange(min=0),
+             doc="""Number of threads the C implementation of
+             stepwise_regression could use to process the samples in
+             parallel.  0 means to use all available cores.  It has no effect
+             on the Python implementation, if the C extension was built
+             without OpenMP support, or if there are too few samples to make
+             it worthwhile.  Results obtained with multiple threads might
+             differ slightly due to a different order of floating point
+             summation.""")
+
     ties = Parameter('random', constraints='str',
                      doc="""Resolve ties which could occur.  At the moment
                      only obvious ties resulting in identical weights
@@ -179,10 +190,11 @@ class SMLR(Classifier):
                                   resamp_decay,
                                   min_resamp,
                                   verbose,
-                                  seed = None):
+                                  seed = None,
+                                  nthreads = 1):
         """The (much slower) python version of the stepwise
         regression.  I'm keeping this around for now so that we can
-        compare results."""
+        compare results.  `nthreads` is ignored."""
 
         # get the data information into easy vars
         ns, nd = X.shape
@@ -344,21 +356,14 @@ class SMLR(Classifier):
 
         if self.params.implementation.upper() == 'C':
             _stepwise_regression = _cStepwiseRegression
-            #
-            # TODO: avoid copying to non-contig arrays, use strides in ctypes?
-            if not (X.flags['C_CONTIGUOUS'] and X.flags['ALIGNED']):
+            # C code takes float32/float64 arrays with arbitrary strides,
+            # so copy only if it is something else
+            if not _cSupportsArray(X):
                 if __debug__:
                     debug("SMLR_",
-                          "Copying data to get it C_CONTIGUOUS/ALIGNED")
+                          "Copying data to get it C_CONTIGUOUS/ALIGNED double")
                 X = np.array(X, copy=True, dtype=np.double, order='C')
 
-            # currently must be double for the C code
-            if X.dtype != np.double:
-                if __debug__:
-                    debug("SMLR_", "Converting data to double")
-                # must cast to double
-                X = X.astype(np.double)
-
         # set the feature dimensions
         elif self.params.implementation.upper() == 'PYTHON':
             _stepwise_regression = self._python_stepwise_regression
@@ -377,7 +382,9 @@ class SMLR(Classifier):
             c_to_fit = M - 1
 
         # Precompute what we can
-        auto_corr = ((M - 1.) / (2. * M)) * (np.sum(X * X, 0))
+        # square in double precision, so float32 input gives the same results
+        auto_corr = ((M - 1.) / (2. * M)) * \
+                    np.sum(np.square(X, dtype=np.double), 0)
         XY = np.dot(X.T, Y[:, :c_to_fit])
         lambda_over_2_auto_corr = (self.params.lm/2.)/auto_corr
 
@@ -409,7 +416,8 @@ class SMLR(Classifier):
                                       self.params.resamp_decay,
                                       self.params.min_resamp,
                                       verbosity,
-                                      self.params.seed)
+                                      self.params.seed,
+                                      self.params.nthreads)
 
         if cycles >= self.params.maxiter:
             # did not converge
@@ -22,6 +22,10 @@ def setup_parser(parser):
     excl = parser.add_mutually_exclusive_group()
     excl.add_argument('--externals', action='store_true',
                         help='list status of external dependencies')
+    excl.add_argument('--refresh-externals', action='store_true',
+                        help="""check all external dependencies again,
+                        replacing results stored in the persistent cache,
+                        and list their status""")
     if __debug__:
         excl.add_argument('--debug', action='store_true',
                           help='list available debug channels')
@@ -35,6 +39,11 @@ def setup_parser(parser):
 def run(args):
     if args.externals:
         print mvpa2.wtf(include=['externals'])
+    elif args.refresh_externals:
+        from mvpa2.base import externals
+        externals.clear_persistent_cache()
+        externals.check_all_dependencies(force=True, verbosity=0)
+        print mvpa2.wtf(include=['externals'])
     elif args.debug:
         mvpa2.debug.print_registered()
     elif not args.learner_warehouse is False:
@@ -13,7 +13,7 @@ __docformat__ = 'restructuredtext'
 import numpy as np
 import copy
 
-from mvpa2.base import warning
+from mvpa2.base import warning, externals
 from mvpa2.base.dataset import AttrDataset
 from mvpa2.base.dataset import _expand_attribute
 from mvpa2.misc.support import idhash as idhash_
@@ -546,6 +546,263 @@ class HollowSamples(object):
         return self
 
 
+# number of samples read at once while iterating over out-of-core samples
+_ITER_BLOCK_SIZE = 100
+
+
+def _as_slice(ids):
+    """Return a slice equivalent to an index vector, or None"""
+    if not len(ids):
+        return slice(0, 0)
+    if ids[0] >= 0 and np.all(np.diff(ids) == 1):
+        return slice(ids[0], ids[-1] + 1)
+    return None
+
+
+def _open_hdf5_samples(filename, name, sid, fid):
+    """Re-open a HDF5 backend (used for unpickling)"""
+    return OutOfCoreSamples.from_hdf5(filename, name)._select(sid, fid)
+
+
+def _open_memmap_samples(filename, dtype, shape, offset, order, view,
+                         sid, fid):
+    """Re-open a memory-mapped backend (used for unpickling)
+
+    `view` is None for the mapping of the file, or the (byte offset,
+    shape, strides) of a view of this mapping.
+    """
+    data = np.memmap(filename, dtype=dtype, mode='r', shape=shape,
+                     offset=offset, order=order)
+    if view is not None:
+        voffset, vshape, vstrides = view
+        data = np.ndarray.__new__(np.memmap, vshape, dtype, buffer=data,
+                                  offset=voffset, strides=vstrides)
+    return OutOfCoreSamples(data, sid=sid, fid=fid)
+
+
+class OutOfCoreSamples(object):
+    """Samples container for data that are kept on disk.
+
+    Samples are read from a two-dimensional backend, e.g. an HDF5 dataset
+    (``h5py.Dataset``) or a memory-mapped array (``np.memmap``), only when
+    they are actually needed. Similar to `HollowSamples`, the container
+    only maintains vectors of sample and feature IDs (``sid`` and ``fid``),
+    hence it can be used as ``samples`` of a Dataset that is too large to
+    be loaded into memory at once.
+
+    Operations that do not read any data:
+
+    - selecting samples and/or features (e.g. ``ds[:10]``, ``ds[:, roi]``,
+      or the selections done by partitioners and searchlights)
+    - shallow and deep copies of a dataset (the backend is shared, it is
+      never modified)
+    - ``shape``, ``dtype``, ``len()`` and all attribute operations
+
+    Operations that materialize data (read the currently selected samples
+    and features into an in-memory array):
+
+    - ``np.asanyarray(ds.samples)`` and any other conversion through
+      ``__array__``, i.e. any computation on the samples
+    - ``samples.copy()`` and ``samples.astype()``, which return ndarrays
+    - integer indexing and iteration, which yield in-memory rows (as for
+      arrays, an integer index reduces the dimensionality)
+    - forward-mapping with mappers that compute new samples; their output
+      datasets contain ordinary in-memory samples
+
+    Mappers that process their input in blocks only read one block at a
+    time, e.g. `ZScoreMapper` training with ``block_size`` (blocks of
+    samples), or `NativeGLMMapper` (blocks of features). A searchlight only
+    reads the features of the current sphere when the measure accesses
+    the samples of an ROI dataset.
+    """
+    def __init__(self, data, sid=None, fid=None):
+        """
+        Parameters
+        ----------
+        data : array-like
+          Two-dimensional backend (nsamples x nfeatures) supporting NumPy-
+          style indexing, e.g. ``h5py.Dataset`` or ``np.memmap``. It is
+          treated as read-only.
+        sid : 1d-array or None
+          Vector of backend sample IDs. All samples if None.
+        fid : 1d-array or None
+          Vector of backend feature IDs. All features if None.
+        """
+        if not len(data.shape) == 2:
+            raise ValueError("Only two-dimensional backends are supported "
+                             "(got: %i dimensions)" % len(data.shape))
+        self._data = data
+        # file opened by from_hdf5()
+        self._file = None
+        self.sid = np.arange(data.shape[0]) if sid is None \
+                        else np.asanyarray(sid)
+        self.fid = np.arange(data.shape[1]) if fid is None \
+                        else np.asanyarray(fid)
+
+    @classmethod
+    def from_hdf5(cls, filename, name):
+        """Open the HDF5 dataset ``name`` in ``filename`` read-only
+
+        The file is owned by the returned container and all selections
+        of it, and remains open until `close()` is called on any of them
+        (or all of them are garbage-collected).
+        """
+        externals.exists('h5py', raise_=True)
+        import h5py
+        hdf = h5py.File(filename, 'r')
+        try:
+            samples = cls(hdf[name])
+        except:
+            hdf.close()
+            raise
+        samples._file = hdf
+        return samples
+
+    def close(self):
+        """Close the file opened by `from_hdf5()`
+
+        Afterwards no data can be read from this container, or any other
+        selection sharing its backend.
+        """
+        if self._file is not None:
+            self._file.close()
+
+    @classmethod
+    def from_npy(cls, filename):
+        """Memory-map an array stored in NumPy's ``.npy`` format read-only"""
+        return cls(np.load(filename, mmap_mode='r'))
+
+    def __reduce__(self):
+        data = self._data
+        base = data
+        while isinstance(base, np.memmap) and isinstance(base.base, np.memmap):
+            base = base.base
+        if isinstance(base, np.memmap) and base.filename is not None:
+            # store the mapping of the complete file, and the location of
+            # the backend within it, as it might be a view
+            view = None
+            if data is not base:
+                view = (data.__array_interface__['data'][0]
+                            - base.__array_interface__['data'][0],
+                        data.shape, data.strides)
+            return (_open_memmap_samples,
+                    (base.filename, base.dtype, base.shape, base.offset,
+                     'F' if np.isfortran(base) else 'C', view,
+                     self.sid, self.fid))
+        if hasattr(data, 'file') and hasattr(data, 'name'):
+            # h5py dataset
+            return (_open_hdf5_samples,
+                    (data.file.filename, data.name, self.sid, self.fid))
+        return (self.__class__, (data, self.sid, self.fid))
+
+    def __deepcopy__(self, memo):
+        # the backend is never modified, hence can be shared
+        return self.view()
+
+    def _select(self, sid, fid):
+        selected = self.__class__(self._data, sid=sid, fid=fid)
+        selected._file = self._file
+        return selected
+
+    def view(self):
+        """Return a new container with the same selection"""
+        return self._select(self.sid, self.fid)
+
+    def copy(self):
+        """Return the selected samples as an in-memory array"""
+        return self._read()
+
+    def astype(self, dtype, copy=True):
+        """Return the selected samples as an in-memory array of ``dtype``"""
+        return self._read().astype(dtype, copy=False)
+
+    shape = property(fget=lambda self: (len(self.sid), len(self.fid)))
+    dtype = property(fget=lambda self: self._data.dtype)
+    ndim = property(fget=lambda self: 2)
+    size = property(fget=lambda self: len(self.sid) * len(self.fid))
+
+    def __len__(self):
+        return len(self.sid)
+
+    def __array__(self, *args):
+        samples = self._read()
+        if len(args) and args[0] is not None:
+            return samples.astype(args[0], copy=False)
+        return samples
+
+    def __getitem__(self, args):
+        if not isinstance(args, tuple):
+            args = (args,)
+
+        if len(args) > 2:
+            raise ValueError("Too many arguments (%i). At most there can be "
+                             "two arguments, one for samples selection and one "
+                             "for features selection" % len(args))
+
+        if len(args) == 1:
+            args = [args[0], slice(None)]
+        else:
+            args = [a for a in args]
+        # like for arrays, integer indices reduce the dimensionality, which
+        # can only be done for in-memory data
+        squeeze = [i for i, a in enumerate(args)
+                   if isinstance(a, (int, np.integer))]
+        for i in squeeze:
+            args[i] = [args[i]]
+        selected = self._select(self.sid[args[0]], self.fid[args[1]])
+        if not squeeze:
+            return selected
+        return selected._read()[tuple(0 if i in squeeze else slice(None)
+                                      for i in xrange(2))]
+
+    def __iter__(self):
+        for block in self.iter_blocks(_ITER_BLOCK_SIZE):
+            for row in block:
+                yield row
+
+    def iter_blocks(self, block_size):
+        """Generate in-memory blocks of at most ``block_size`` samples"""
+        for start in xrange(0, len(self.sid), block_size):
+            yield self[start:start + block_size]._read()
+
+    def _read(self):
+        """Read the selected samples and features from the backend"""
+        data = self._data
+        sid, fid = self.sid, self.fid
+        if not len(sid) or not len(fid):
+            return np.empty(self.shape, dtype=self.dtype)
+        rows, cols = _as_slice(sid), _as_slice(fid)
+        if isinstance(data, np.ndarray):
+            # memmaps only read what is indexed
+            samples = data[sid if rows is None else rows]
+            samples = samples[:, fid if cols is None else cols]
+            # make sure it is in memory and detached from the backend
+            return np.array(samples, subok=False)
+        # other backends (e.g. h5py) only support a single increasing
+        # index list per selection
+        sinv = finv = None
+        if rows is None:
+            rows, sinv = np.unique(sid, return_inverse=True)
+        if cols is None:
+            cols, finv = np.unique(fid, return_inverse=True)
+        if sinv is not None and finv is not None:
+            # read the span of selected features for all selected samples
+            span = slice(cols[0], cols[-1] + 1)
+            samples = data[list(rows), span][:, cols - cols[0]]
+        else:
+            samples = data[rows if sinv is None else list(rows),
+                           cols if finv is None else list(cols)]
+        samples = np.asanyarray(samples)
+        # restore the requested order (and duplicates)
+        if sinv is not None and not (len(rows) == len(sid)
+                                     and np.all(rows == sid)):
+            samples = samples[sinv]
+        if finv is not None and not (len(cols) == len(fid)
+                                     and np.all(cols == fid)):
+            samples = samples[:, finv]
+        return samples
+
+
 def preprocessed_dataset(
         src, raw_loader, ds_converter, preproc_raw=None,
         preproc_ds=None, add_sa=None, **kwargs):
@@ -193,7 +193,7 @@ def _evvars2ds(ds, evvars, eprefix):
 def extract_boxcar_event_samples(
         ds, events=None, time_attr=None, match='prev',
         event_offset=None, event_duration=None,
-        eprefix='event', event_mapper=None):
+        eprefix='event', event_mapper=None, lazy=False):
     """Segment a dataset by extracting boxcar events
 
     (Multiple) consecutive samples are extracted for each event, and are either
@@ -265,6 +265,11 @@ def extract_boxcar_event_samples(
       e.g. averaging samples within an event boxcar using an FxMapper. Any
       mapper needs to keep the sample axis unchanged, i.e. number and order of
       samples remain the same.
+    lazy : bool
+      If True, event samples are passed to ``event_mapper`` as a read-only
+      view of the input samples, whenever the event onsets are equally spaced
+      (see :class:`~mvpa2.mappers.boxcar.BoxcarMapper`). This avoids copying
+      all boxcars in memory, if the event mapper compresses them anyway.
 
     Returns
     -------
@@ -362,7 +367,7 @@ def extract_boxcar_event_samples(
                     'provided Events.'% boxlength)
 
     # finally create, train und use the boxcar mapper
-    bcm = BoxcarMapper(evvars['onset'], boxlength, space=eprefix)
+    bcm = BoxcarMapper(evvars['onset'], boxlength, space=eprefix, lazy=lazy)
     bcm.train(ds)
     ds = ds.get_mapped(bcm)
     if event_mapper is None:
@@ -383,9 +388,14 @@ def extract_boxcar_event_samples(
     return ds
 
 
+# glmfit_kwargs supported by the 'native' GLM backend
+_NATIVE_GLMFIT_KWARGS = ('model', 'block_size', 'return_stats')
+
+
 def fit_event_hrf_model(
         ds, events, time_attr, condition_attr='targets', design_kwargs=None,
-        glmfit_kwargs=None, regr_attrs=None, return_model=False):
+        glmfit_kwargs=None, regr_attrs=None, return_model=False,
+        glm_backend='nipy'):
     """Fit a GLM with HRF regressor and yield a dataset with model parameters
 
     A univariate GLM is fitted for each feature and model parameters are
@@ -416,7 +426,10 @@ def fit_event_hrf_model(
     ``regr_attrs``).
 
     The actual GLM fit is also performed by NiPy and can be fully customized
-    (see ``glmfit_kwargs``).
+    (see ``glmfit_kwargs``). Alternatively, the fit can be done by
+    :class:`~mvpa2.mappers.glm.NativeGLMMapper`, which solves the model for
+    all features at once and is much faster for large datasets (see
+    ``glm_backend``).
 
     Parameters
     ----------
@@ -441,6 +454,9 @@ def fit_event_hrf_model(
     glmfit_kwargs : dict
       Arbitrary keyword arguments for NiPy's GeneralLinearModel.fit() used for
       estimating model parameter. Choose fitting algorithm: OLS or AR1.
+      With the 'native' backend only ``model`` (with the same meaning and
+      default 'ar1'), ``block_size`` and ``return_stats`` are supported,
+      and passed to NativeGLMMapper. Other keys raise ValueError.
     regr_attrs : list
       List of dataset sample attribute names that shall be extracted from the
       input dataset and used as additional regressors in the design matrix.
@@ -449,6 +465,10 @@ def fit_event_hrf_model(
       For large input data this can be problematic, as the model may contain
       the residuals (same size is input data), hence multiplies the memory
       demand. Off by default.
+    glm_backend : {'nipy', 'native'}
+      Implementation used for the GLM fit. Only the design matrix is
+      generated by NiPy with the 'native' backend, and no model instance
+      is available (``model`` attribute is None).
 
     Returns
     -------
@@ -493,7 +513,9 @@ def fit_event_hrf_model(
     """
     if externals.exists('nipy', raise_=True):
         from nipy.modalities.fmri.design_matrix import make_dmtx
-        from mvpa2.mappers.glm import NiPyGLMMapper
+        from mvpa2.mappers.glm import NiPyGLMMapper, NativeGLMMapper
+    if not glm_backend in ('nipy', 'native'):
+        raise ValueError("unknown GLM backend %r" % (glm_backend,))
 
     # Decide/device condition attribute on which GLM will actually be done
     if isinstance(condition_attr, basestring):
@@ -579,10 +601,25 @@ def fit_event_hrf_model(
         for i, reg in enumerate(design_matrix.names)]
 
     # GLM
-    glm = NiPyGLMMapper([], glmfit_kwargs=glmfit_kwargs,
-            add_regs=glm_regs,
-            return_design=True, return_model=return_model,
-            space=glm_condition_attr)
+    if glm_backend == 'native':
+        # same default fitting algorithm as NiPy
+        native_kwargs = dict(model='ar1')
+        if glmfit_kwargs is not None:
+            unsupported = set(glmfit_kwargs) - set(_NATIVE_GLMFIT_KWARGS)
+            if unsupported:
+                raise ValueError(
+                    "glmfit_kwargs %s are not supported by the 'native' GLM "
+                    "backend, only %s are"
+                    % (sorted(unsupported), list(_NATIVE_GLMFIT_KWARGS)))
+            native_kwargs.update(glmfit_kwargs)
+        glm = NativeGLMMapper([], add_regs=glm_regs,
+                return_design=True, return_model=return_model,
+                space=glm_condition_attr, **native_kwargs)
+    else:
+        glm = NiPyGLMMapper([], glmfit_kwargs=glmfit_kwargs,
+                add_regs=glm_regs,
+                return_design=True, return_model=return_model,
+                space=glm_condition_attr)
 
     model_params = glm(ds)
 
@@ -30,6 +30,10 @@ from mvpa2.datasets.base import Dataset
 from mvpa2.mappers.flatten import FlattenMapper
 from mvpa2.base import warning
 
+# upper limit of the amount of image data (in bytes) the lazy loader reads
+# at once
+_LAZY_BLOCK_BYTES = 16 * 1024 ** 2
+
 
 def _hdr2dict(hdr):
     """Helper to convert a NiBabel image header to a dict of arrays"""
@@ -187,7 +191,7 @@ def map2nifti(dataset, data=None, imghdr=None, imgtype=None):
 
 
 def fmri_dataset(samples, targets=None, chunks=None, mask=None,
-                 sprefix='voxel', tprefix='time', add_fa=None,):
+                 sprefix='voxel', tprefix='time', add_fa=None, lazy=False):
     """Create a dataset from an fMRI timeseries image.
 
     The timeseries image serves as the samples data, with each volume becoming
@@ -245,11 +249,22 @@ def fmri_dataset(samples, targets=None, chunks=None, mask=None,
       as feature attributes in the dataset. The dictionary key serves as the
       feature attribute name. Each value might be of any type supported by the
       'mask' argument of this function.
+    lazy : bool
+      If True, the timeseries images are never loaded completely.  Instead,
+      blocks of volumes are read from the files one after another (random
+      access for uncompressed images, sequential decompression for gzipped
+      ones) and only the voxels selected by the mask are stored.  Samples are
+      then of float32 dtype.  Only filenames and NiBabel image instances are
+      supported as `samples` in this mode.
 
     Returns
     -------
     Dataset
     """
+    if lazy:
+        return _fmri_dataset_lazy(samples, targets=targets, chunks=chunks,
+                                  mask=mask, sprefix=sprefix, tprefix=tprefix,
+                                  add_fa=add_fa)
     # load the samples
     imgdata, imghdr, img = _load_anyimg(samples, ensure=True, enforce_dim=4)
 
@@ -289,6 +304,14 @@ def fmri_dataset(samples, targets=None, chunks=None, mask=None,
         #ds = ds.get_mapped(StaticFeatureSelection(flatmask))
         ds = ds[:, flatmask != 0]
 
+    return _finalize_fmri_dataset(ds, imghdr, img, imgdata.shape[1:],
+                                  sprefix=sprefix, tprefix=tprefix,
+                                  add_fa=add_fa)
+
+
+def _finalize_fmri_dataset(ds, imghdr, img, vol_shape, sprefix, tprefix,
+                           add_fa):
+    """Store all image-related attributes in a (masked) fMRI dataset"""
     # load and store additional feature attributes
     if add_fa is not None:
         for fattr in add_fa:
@@ -306,7 +329,7 @@ def fmri_dataset(samples, targets=None, chunks=None, mask=None,
 
     # If there is a space assigned , store the extent of that space
     if sprefix is not None:
-        ds.a[sprefix + '_dim'] = imgdata.shape[1:]
+        ds.a[sprefix + '_dim'] = vol_shape
         # 'voxdim' is (x,y,z) while 'samples' are (t,z,y,x)
         ds.a[sprefix + '_eldim'] = _get_voxdim(imghdr)
         # TODO extend with the unit
@@ -319,6 +342,118 @@ def fmri_dataset(samples, targets=None, chunks=None, mask=None,
     return ds
 
 
+def _fmri_dataset_lazy(samples, targets, chunks, mask, sprefix, tprefix,
+                       add_fa):
+    """Lazy-loading counterpart of `fmri_dataset()`"""
+    if not isinstance(samples, (list, tuple)):
+        samples = [samples]
+    readers = [_get_volume_reader(_open_img(s)) for s in samples]
+    vol_shape = readers[0][1]
+    for r in readers:
+        if r[1] != vol_shape:
+            raise ValueError("Input volumes vary in their shapes: %s"
+                             % ([r[1] for r in readers],))
+    img = readers[0][0]
+    imghdr = img.header
+    nvols = sum([r[2] for r in readers])
+
+    masked = mask is not None
+    maskimg = _load_anyimg(mask)
+    if maskimg is not None:
+        mask = maskimg[0]
+    elif masked:
+        # accept plain arrays, like the mapper would do
+        mask = np.asanyarray(mask)
+    else:
+        mask = np.ones(vol_shape, dtype='bool')
+    # permit 4D image mask if time dimension is 1
+    if mask.shape == (1,) + vol_shape:
+        mask = mask.reshape(mask.shape[1:])
+    if mask.shape != vol_shape:
+        raise ValueError("Mask of shape %s does not match the volume shape %s"
+                         % (mask.shape, vol_shape))
+    mask = mask != 0
+
+    # read the volumes block-wise -- assume the worst case of the data being
+    # upcasted to float64 by NiBabel's scaling
+    samples = np.empty((nvols, mask.sum()), dtype='float32')
+    block_size = max(1, _LAZY_BLOCK_BYTES // (np.prod(vol_shape) * 8))
+    offset = 0
+    for _, _, n, read in readers:
+        for start in xrange(0, n, block_size):
+            stop = min(start + block_size, n)
+            # (nmasked x nvols) -> samples
+            samples[offset + start:offset + stop] = read(start, stop)[mask].T
+        offset += n
+
+    # compile the samples attributes
+    sa = {}
+    if targets is not None:
+        sa['targets'] = _expand_attribute(targets, nvols, 'targets')
+    if chunks is not None:
+        sa['chunks'] = _expand_attribute(chunks, nvols, 'chunks')
+
+    # obtain the very same mapper and feature attributes the regular loader
+    # would produce, but from a single boolean volume
+    if sprefix is None:
+        space = None
+    else:
+        space = sprefix + '_indices'
+    dummy = Dataset(np.zeros((1,) + vol_shape, dtype='bool'))
+    dummy = dummy.get_mapped(FlattenMapper(shape=vol_shape, space=space))
+    if masked:
+        dummy = dummy[:, dummy.a.mapper.forward1(mask)]
+    ds = Dataset(samples, sa=sa, fa=dummy.fa.copy(deep=False),
+                 a=dummy.a.copy(deep=False))
+
+    return _finalize_fmri_dataset(ds, imghdr, img, vol_shape,
+                                  sprefix=sprefix, tprefix=tprefix,
+                                  add_fa=add_fa)
+
+
+def _open_img(src):
+    """Open an image without loading its data"""
+    import nibabel
+    if isinstance(src, basestring):
+        try:
+            # keep compressed files open, so reading subsequent blocks does
+            # not decompress from the beginning of the file every time
+            return nibabel.load(src, keep_file_open=True)
+        except TypeError:
+            # older NiBabel
+            return nibabel.load(src)
+    elif isinstance(src, nibabel.spatialimages.SpatialImage):
+        return src
+    raise ValueError("Cannot lazily load %r -- only filenames and NiBabel "
+                     "images are supported" % (src,))
+
+
+def _get_volume_reader(img):
+    """Get a function to read blocks of volumes from an image
+
+    Returns
+    -------
+    tuple
+      (img, volume shape, number of volumes, reader).  The reader is called
+      with start and stop volume index and returns an (x,y,z,t) array.
+    """
+    shape = img.shape
+    dataobj = img.dataobj
+    if len(shape) == 3:
+        return img, shape, 1, \
+               lambda start, stop: np.asanyarray(dataobj)[..., np.newaxis]
+    elif len(shape) == 4:
+        return img, shape[:3], shape[3], \
+               lambda start, stop: dataobj[..., start:stop]
+    elif len(shape) == 5 and shape[3] == 1:
+        warning('dataset with 5th dimension found but 4th is empty (AFNI '
+                ' NIFTI conversion syndrome) - ignoring the 4th dimension')
+        return img, shape[:3], shape[4], \
+               lambda start, stop: dataobj[:, :, :, 0, start:stop]
+    raise ValueError("Cannot load timeseries from an image of shape %s"
+                     % (shape,))
+
+
 def _get_voxdim(hdr):
     """Get the size of a voxel from some image header format."""
     return hdr.get_zooms()[:-1]
@@ -14,11 +14,15 @@ __docformat__ = 'restructuredtext'
 __all__ = [ 'OpenFMRIDataset']
 
 import os
+import time
 from os.path import join as _opj
 import numpy as np
 from mvpa2.datasets import vstack
 from mvpa2.base import warning
 
+if __debug__:
+    from mvpa2.base import debug
+
 
 def _prefix(prefix, val):
     if isinstance(val, (np.integer, int)):
@@ -106,6 +110,9 @@ class OpenFMRIDataset(object):
           subdirectories).
         """
         self.basedir = os.path.expanduser(os.path.expandvars(basedir))
+        # (subj, task, run, seconds) records of the last
+        # get_model_bold_dataset() call
+        self.load_timings = []
 
     def get_subj_ids(self):
         """Return a (sorted) list of IDs for all subjects in the dataset
@@ -557,7 +564,7 @@ class OpenFMRIDataset(object):
                                preproc_img=None,
                                preproc_ds=None, modelfx=None, stack=True,
                                flavor=None, mask=None, add_fa=None,
-                               add_sa=None, **kwargs):
+                               add_sa=None, nproc=1, **kwargs):
         """Build a PyMVPA dataset for a model defined in the OpenFMRI dataset
 
         Parameters
@@ -593,6 +600,14 @@ class OpenFMRIDataset(object):
           See fmri_dataset() documentation.
         add_sa
           See get_bold_run_dataset() documentation.
+        nproc : int or None
+          Number of threads to load individual runs with. Image reading and
+          decompression mostly happen outside of the GIL, hence loading
+          many runs/subjects concurrently can substantially reduce the
+          total time. If None, as many threads as CPU cores are used.
+          ``preproc_img``, ``preproc_ds``, and ``modelfx`` are called from
+          within these threads and need to be thread-safe if ``nproc`` > 1.
+          Per-run load times are available in ``load_timings`` afterwards.
 
         Returns
         -------
@@ -613,7 +628,13 @@ class OpenFMRIDataset(object):
         tasks = np.unique([c['task'] for c in conds])
         if isinstance(subj_id, (int, basestring)):
             subj_id = [subj_id]
-        dss = []
+        modelfx_kwargs = dict([(k, v) for k, v in kwargs.iteritems()
+                               if not k in ('preproc_img', 'preproc_ds',
+                                            'modelfx', 'stack', 'flavor',
+                                            'mask', 'add_fa', 'add_sa')])
+        # collect all subject/task/run combinations first -- their order
+        # determines the order of the datasets in the output
+        jobs = []
         for sub in subj_id:
             # we need to loop over tasks first in order to be able to determine
             # what runs exists: that means we have to load the model info
@@ -622,44 +643,70 @@ class OpenFMRIDataset(object):
                 run_ids_ = run_ids \
                     if run_ids is not None \
                     else self.get_bold_run_ids(sub, task)
-                for i, run in enumerate(run_ids_):
-                    events = self.get_bold_run_model(model_id, sub, run)
-                    # at this point our events should only contain those
-                    # matching the current task. If not, this model violates
-                    # the implicit assumption that one condition (label) can
-                    # only be present in a single task. The current OpenFMRI
-                    # spec does not allow for a more complex setup. I think
-                    # this is worth a runtime check
-                    check_events = [ev for ev in events if ev['task'] == task]
-                    if not len(check_events) == len(events):
-                        warning(
-                            "not all event specifications match the expected "
-                            "task ID -- something is wrong -- check that each "
-                            "model condition label is only associated with a "
-                            "single task")
-
-                    if not len(events):
-                        # nothing in this run for the given model
-                        # it could be argued whether we'd still want this data loaded
-                        # XXX maybe a flag?
-                        continue
-                    d = self.get_bold_run_dataset(
-                        sub, task, run=run, flavor=flavor,
-                        preproc_img=preproc_img, chunks=i, mask=mask,
-                        add_fa=add_fa, add_sa=add_sa)
-                    if preproc_ds is not None:
-                        d = preproc_ds(d)
-                    d = modelfx(
-                        d, events, **dict([(k, v) for k, v in kwargs.iteritems()
-                                          if not k in ('preproc_img', 'preproc_ds',
-                                                       'modelfx', 'stack', 'flavor',
-                                                       'mask', 'add_fa', 'add_sa')]))
-                    # if the modelfx doesn't leave 'chunk' information, we put
-                    # something minimal in
-                    for attr, info in (('chunks', i), ('run', run), ('subj', sub)):
-                        if not attr in d.sa:
-                            d.sa[attr] = [info] * len(d)
-                    dss.append(d)
+                jobs.extend([(sub, task, i, run)
+                             for i, run in enumerate(run_ids_)])
+
+        def _load_run(job):
+            sub, task, i, run = job
+            tstart = time.time()
+            events = self.get_bold_run_model(model_id, sub, run)
+            # at this point our events should only contain those
+            # matching the current task. If not, this model violates
+            # the implicit assumption that one condition (label) can
+            # only be present in a single task. The current OpenFMRI
+            # spec does not allow for a more complex setup. I think
+            # this is worth a runtime check
+            check_events = [ev for ev in events if ev['task'] == task]
+            if not len(check_events) == len(events):
+                warning(
+                    "not all event specifications match the expected "
+                    "task ID -- something is wrong -- check that each "
+                    "model condition label is only associated with a "
+                    "single task")
+
+            if not len(events):
+                # nothing in this run for the given model
+                # it could be argued whether we'd still want this data loaded
+                # XXX maybe a flag?
+                return None, time.time() - tstart
+            d = self.get_bold_run_dataset(
+                sub, task, run=run, flavor=flavor,
+                preproc_img=preproc_img, chunks=i, mask=mask,
+                add_fa=add_fa, add_sa=add_sa)
+            if preproc_ds is not None:
+                d = preproc_ds(d)
+            d = modelfx(d, events, **modelfx_kwargs)
+            # if the modelfx doesn't leave 'chunk' information, we put
+            # something minimal in
+            for attr, info in (('chunks', i), ('run', run), ('subj', sub)):
+                if not attr in d.sa:
+                    d.sa[attr] = [info] * len(d)
+            return d, time.time() - tstart
+
+        if nproc is None:
+            from multiprocessing import cpu_count
+            nproc = cpu_count()
+        if nproc > 1 and len(jobs) > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(min(nproc, len(jobs)))
+            try:
+                # map() preserves the order of the jobs
+                results = pool.map(_load_run, jobs)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_load_run(job) for job in jobs]
+
+        self.load_timings = []
+        dss = []
+        for (sub, task, i, run), (d, t) in zip(jobs, results):
+            self.load_timings.append((sub, task, run, t))
+            if __debug__:
+                debug('DS_OFMRI', "Loaded subject %s, task %s, run %s in %.2fs"
+                      % (sub, task, run, t))
+            if d is not None:
+                dss.append(d)
         if stack:
             dss = vstack(dss, a=0)
         return dss
@@ -27,6 +27,20 @@ if __debug__:
     from mvpa2.base import debug
 
 
+def _split_partitions_attr(pattr, nparts=None):
+    """Split sample indices according to a partition attribute array
+
+    Returns a list with the indices of the samples in partitions 1 to
+    `nparts` (by default the largest partition value).
+    """
+    # stable sort keeps the samples of each partition in order
+    order = np.argsort(pattr, kind='mergesort')
+    counts = np.bincount(pattr, minlength=(nparts or 0) + 1)
+    if nparts is not None:
+        counts = counts[:nparts + 1]
+    return np.split(order, np.cumsum(counts)[:-1])[1:]
+
+
 class Partitioner(Node):
     """Generator node to partition a dataset.
 
@@ -129,6 +143,19 @@ class Partitioner(Node):
             yield pds
 
 
+    def generate_indices(self, ds):
+        """Generate the partition sets as index arrays.
+
+        Unlike `generate()` no datasets are created. For each partition set
+        a list is yielded, with an array of the indices of the samples in each
+        partition (e.g. training and testing samples for `NFoldPartitioner`).
+        Samples not assigned to any partition are not included.
+        """
+        for parts in self.get_partition_specs(ds):
+            yield _split_partitions_attr(self.get_partitions_attr(ds, parts),
+                                         len(parts))
+
+
     def get_partitions_attr(self, ds, specs):
         """Create a partition attribute array for a particular partition spec.
 
@@ -149,7 +176,14 @@ class Partitioner(Node):
         none_specs = 0
         cum_filter = None
 
-        splitattr_data = ds.sa[self.__attr].value
+        splitattr = ds.sa[self.__attr]
+        if splitattr.value.ndim == 1:
+            # membership only needs to be determined once per unique value
+            uniqueattrs = splitattr.unique
+            codes = splitattr.codes
+        else:
+            uniqueattrs = splitattr.value
+            codes = None
         # for each partition in this set
         for spec in specs:
             if spec is None:
@@ -157,7 +191,9 @@ class Partitioner(Node):
                 none_specs += 1
             else:
                 filter_ = np.array([ i in spec \
-                                    for i in splitattr_data], dtype='bool')
+                                    for i in uniqueattrs], dtype='bool')
+                if codes is not None:
+                    filter_ = filter_[codes]
                 filters.append(filter_)
                 if cum_filter is None:
                     cum_filter = filter_
@@ -538,13 +574,15 @@ class FactorialPartitioner(Partitioner):
                          _repr_attrs(self, ['partitioner'], default=1))
 
 
-    def generate(self, ds):
+    def _get_target_partitionings(self, ds):
+        """Generate the partition attribute arrays of all partition sets"""
+        # samples for each unique value of the superordinate attribute
+        uattr_idx = ds.sa[self.attr].group_indices
+
         # check whether the ds is balanced
-        unique_super = ds.sa[self.attr].unique
-        nunique_subord = []
-        for usuper in unique_super:
-            mask = ds.sa[self.attr].value == usuper
-            nunique_subord.append(len(np.unique(ds[mask].sa[self.partitioner.attr].value)))
+        subord_attr = ds.sa[self.partitioner.attr].value
+        nunique_subord = [len(np.unique(subord_attr[idx]))
+                          for idx in uattr_idx]
         if len(np.unique(nunique_subord)) != 1:
             warnings.warn('One or more superordinate attributes do not have the same '
                     'number of subordinate attributes. This could yield to '
@@ -555,19 +593,25 @@ class FactorialPartitioner(Partitioner):
         if self.selection_strategy != 'equidistant':
             raise NotImplementedError("This strategy is not yet implemented")
 
-        attr_value = ds.sa[self.attr].value
-        uattr = ds.sa[self.attr].unique
-        uattr_masks = [attr_value == u for u in uattr]
+        for partitionings in iterprod(*[self.partitioner.generate(fakeds[idx]) for idx in uattr_idx]):
+            target_partitioning = np.zeros(len(ds), dtype=int)
+            for idx, partitioning in zip(uattr_idx, partitionings):
+                target_partitioning[idx] = partitioning.sa[self.partitioner.space].value
+            yield target_partitioning
+
 
-        for partitionings in iterprod(*[self.partitioner.generate(fakeds[uattr_mask]) for uattr_mask in uattr_masks]):
+    def generate(self, ds):
+        for target_partitioning in self._get_target_partitionings(ds):
             pds = ds.copy(deep=False)
-            target_partitioning = np.zeros(len(pds), dtype=int)
-            for uattr_mask, partitioning in zip(uattr_masks, partitionings):
-                target_partitioning[uattr_mask] = partitioning.sa[self.partitioner.space].value
             pds.sa[self.space] = target_partitioning
             yield pds
 
 
+    def generate_indices(self, ds):
+        for target_partitioning in self._get_target_partitionings(ds):
+            yield _split_partitions_attr(target_partitioning)
+
+
 class ExcludeTargetsCombinationsPartitioner(Node):
     """Exclude combinations for a given partition from other partitions
 
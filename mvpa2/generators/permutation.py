@@ -26,6 +26,26 @@ from mvpa2.mappers.fx import _product
 if __debug__:
     from mvpa2.base import debug
 
+def _get_limit_indices(limit_filter):
+    """Return the indices of the elements within each limit of a filter
+
+    See `get_limit_filter()` for the meaning of boolean and numerical filters.
+    Indices are given in ascending order for each limit, and limits in the
+    order of their values.
+    """
+    if limit_filter.dtype == np.bool:
+        # simple boolean filter -> only the selected ones
+        if not np.any(limit_filter):
+            return []
+        return [limit_filter.nonzero()[0]]
+    if not len(limit_filter):
+        return []
+    # non-boolean limiter -> stable sort keeps the order within each limit
+    order = np.argsort(limit_filter, kind='mergesort')
+    return np.split(order,
+                    np.flatnonzero(np.diff(limit_filter[order])) + 1)
+
+
 class AttributePermutator(Node):
     """Node to permute one a more attributes in a dataset.
 
@@ -96,10 +116,15 @@ class AttributePermutator(Node):
             # must be sequence of attrs, take first since we only need the shape
             pattr, collection = ds.get_attr(pattr[0])
 
-        return get_limit_filter(self._limit, collection)
+        return _get_limit_indices(get_limit_filter(self._limit, collection))
 
 
-    def _call(self, ds):
+    def _get_permutations(self, ds):
+        """Return index arrays with the permutation of each attribute
+
+        The permuted values of an attribute are given by indexing its original
+        values with the corresponding index array.
+        """
         # local binding
         pattr = self._pattr
         assure_permute = self._assure_permute
@@ -125,41 +150,22 @@ class AttributePermutator(Node):
             raise ValueError("Unknown permutation strategy %r" % self.strategy)
 
         if self.chunk_attr is not None:
-            permute_kwargs['chunks'] = ds.sa[self.chunk_attr].value
+            permute_kwargs['chunks'] = ds.sa[self.chunk_attr]
 
+        nelements = len(in_pattrs[0].value)
         for i in xrange(10):  # for the case of assure_permute
-            # shallow copy of the dataset for output
-            out = ds.copy(deep=False)
-
-            out_pattrs = [out.get_attr(pa)[0] for pa in pattr]
-            # replace .values with copies in out_pattrs so we do
-            # not override original values
-            for pa in out_pattrs:
-                pa.value = pa.value.copy()
-
-            for limit_value in np.unique(pcfg):
-                if pcfg.dtype == np.bool:
-                    # simple boolean filter -> do nothing on False
-                    if not limit_value:
-                        continue
-                    # otherwise get indices of "selected ones"
-                    limit_idx = pcfg.nonzero()[0]
-                else:
-                    # non-boolean limiter -> determine "chunk" and permute within
-                    limit_idx = (pcfg == limit_value).nonzero()[0]
-
-                # need list to index properly
-                limit_idx = list(limit_idx)
-
-                permute_fx(limit_idx, in_pattrs, out_pattrs, **permute_kwargs)
+            # start with identity and permute within each limit
+            perms = [np.arange(nelements) for pa in in_pattrs]
+            for limit_idx in pcfg:
+                permute_fx(limit_idx, in_pattrs, perms, **permute_kwargs)
 
             if not assure_permute:
                 break
 
             # otherwise check if we differ from original, and if so -- break
             differ = False
-            for in_pattr, out_pattr in zip(in_pattrs, out_pattrs):
-                differ = differ or np.any(in_pattr.value != out_pattr.value)
+            for in_pattr, perm in zip(in_pattrs, perms):
+                differ = differ or np.any(in_pattr.value != in_pattr.value[perm])
                 if differ:
                     break                 # leave check loop if differ
             if differ:
@@ -171,10 +177,24 @@ class AttributePermutator(Node):
                 "some reason (dataset %s). Should not happen"
                 % (pattr, self._limit, ds))
 
+        return perms
+
+
+    def _call(self, ds):
+        pattr = self._pattr
+        if isinstance(pattr, str):
+            pattr = (pattr,)
+        perms = self._get_permutations(ds)
+
+        # shallow copy of the dataset for output
+        out = ds.copy(deep=False)
+        # assign permuted copies, so we do not override original values
+        for pa, perm in zip(pattr, perms):
+            out.get_attr(pa)[0].value = ds.get_attr(pa)[0].value[perm]
         return out
 
 
-    def _permute_simple(self, limit_idx, in_pattrs, out_pattrs):
+    def _permute_simple(self, limit_idx, in_pattrs, perms):
         """The simplest permutation
         """
         perm_idx = self.rng.permutation(limit_idx)
@@ -183,13 +203,13 @@ class AttributePermutator(Node):
             debug('APERM', "Obtained permutation %s", (perm_idx, ))
 
         # for all to be permuted attrs
-        for in_pattr, out_pattr in zip(in_pattrs, out_pattrs):
+        for perm in perms:
             # replace all values in current limit with permutations
             # of the original ds's attributes
-            out_pattr.value[limit_idx] = in_pattr.value[perm_idx]
+            perm[limit_idx] = perm_idx
 
 
-    def _permute_uattrs(self, limit_idx, in_pattrs, out_pattrs):
+    def _permute_uattrs(self, limit_idx, in_pattrs, perms):
         """Provide a permutation given a specified strategy
         """
         # Select given limit_idx
@@ -201,56 +221,61 @@ class AttributePermutator(Node):
         # now we need to permute the groups to generate remapping
         # get permutation indexes first
         perm_idx = self.rng.permutation(np.arange(len(unique_groups)))
-        # generate remapping
-        remapping = dict([(t, unique_groups[i])
-                          for t, i in zip(unique_groups, perm_idx)])
-        if __debug__:
+        if __debug__ and 'APERM' in debug.active:
+            # generate remapping
+            remapping = dict([(t, unique_groups[i])
+                              for t, i in zip(unique_groups, perm_idx)])
             debug('APERM', "Using remapping %s", (remapping,))
 
-        for i, in_group in zip(limit_idx, pattrs_lim_zip):
-            out_group = remapping[in_group]
-            # now we need to assign them ot out_pattrs
-            for pa, out_v in zip(out_pattrs, out_group):
-                pa.value[i] = out_v
+        # group of each element
+        group_idx = dict((g, i) for i, g in enumerate(unique_groups))
+        groups = np.array([group_idx[g] for g in pattrs_lim_zip], dtype=int)
+        # the first element of each group provides the values of the group
+        first = np.empty(len(unique_groups), dtype=int)
+        first[groups[::-1]] = np.arange(len(groups))[::-1]
+        # all elements of a group get the values of the group it is remapped to
+        src = limit_idx[first[perm_idx[groups]]]
+        for perm in perms:
+            perm[limit_idx] = src
 
     @staticmethod
-    def _permute_chunks_sanity_check(in_pattrs, chunks, uniques):
+    def _permute_chunks_sanity_check(in_pattrs, groups):
         #  Verify that we are not dealing with some degenerate scenario
 
         for in_pattr in in_pattrs:
-            sample_targets = in_pattr.value[np.where(chunks == uniques[0])]
-
-            for orig in uniques[1:]:
-                chunk_targets = in_pattr.value[np.where(chunks == orig)]
-                # must be of the same length
-                if np.any(chunk_targets != sample_targets):
-                    # Escape as early as possible
-                    return
+            chunk_targets = in_pattr.value[groups]
+            # each row must be identical to the first one
+            if np.any(chunk_targets[1:] != chunk_targets[:1]):
+                # Escape as early as possible
+                return
 
         warning("Permutation via strategy='chunk' makes no sense --"
                 " all chunks have the same order of targets: %s"
-                % (sample_targets,))
+                % (chunk_targets[0],))
 
-    def _permute_chunks(self, limit_idx, in_pattrs, out_pattrs, chunks=None):
+    def _permute_chunks(self, limit_idx, in_pattrs, perms, chunks=None):
         # limit_idx is doing nothing
 
         if chunks is None:
             raise ValueError("Missing 'chunk_attr' for strategy='chunk'")
 
-        uniques = np.unique(chunks)
+        group_indices = chunks.group_indices
+        if len(set(len(g) for g in group_indices)) > 1:
+            raise ValueError("Permutation via strategy='chunks' requires the "
+                             "same number of samples in all chunks")
+        # (chunks x samples) matrix of indices
+        groups = np.array(group_indices, dtype=int)
 
-        if __debug__ and len(uniques):
+        if __debug__ and len(groups):
             # Somewhat a duplication, since could be checked within the loop,
             # but IMHO makes it cleaner and shouldn't be that big of an impact
-            self._permute_chunks_sanity_check(in_pattrs, chunks, uniques)
+            self._permute_chunks_sanity_check(in_pattrs, groups)
 
-        for in_pattr, out_pattr in zip(in_pattrs, out_pattrs):
-            shuffled = uniques.copy()
+        for perm in perms:
+            shuffled = np.arange(len(groups))
             self.rng.shuffle(shuffled)
-
-            for orig, new in zip(uniques, shuffled):
-                out_pattr.value[np.where(chunks == orig)] = \
-                    in_pattr.value[np.where(chunks == new)]
+            # samples of each chunk take the values of a shuffled chunk
+            perm[groups.ravel()] = groups[shuffled].ravel()
 
 
     def generate(self, ds):
@@ -267,6 +292,28 @@ class AttributePermutator(Node):
         self._pcfg = None
 
 
+    def generate_indices(self, ds):
+        """Generate the desired number of permutations as index arrays.
+
+        Unlike `generate()` no permuted datasets are created. For each
+        permutation an index array is yielded which permutes the values of the
+        attribute (e.g. ``ds.sa.targets[perm]``), or a list of such arrays (one
+        per attribute) if a list of attributes is to be permuted.
+        """
+        # figure out permutation setup once for all runs
+        self._pcfg = self._get_pcfg(ds)
+        try:
+            for i in xrange(self.count):
+                perms = self._get_permutations(ds)
+                if isinstance(self._pattr, str):
+                    yield perms[0]
+                else:
+                    yield perms
+        finally:
+            # reset permutation setup to do the right thing upon next call
+            self._pcfg = None
+
+
     def __str__(self):
         return _str(self, self._pattr, n=self.count, limit=self._limit,
                     assure=self._assure_permute)
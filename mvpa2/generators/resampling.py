@@ -16,7 +16,7 @@ import numpy as np
 
 from mvpa2.base.node import Node
 from mvpa2.base.dochelpers import _str, _repr
-from mvpa2.misc.support import get_limit_filter, get_nelements_per_value
+from mvpa2.misc.support import get_limit_filter
 
 
 class Balancer(Node):
@@ -98,6 +98,10 @@ class Balancer(Node):
         else:
             limit_filter = self._limit_filter
 
+        # codes of the unique attribute values of all elements
+        codes = attr.codes
+        nuattr = len(attr.unique)
+
         # ids of elements that are part of the balanced set
         balanced_set = []
         full_limit_set = []
@@ -115,33 +119,31 @@ class Balancer(Node):
             full_limit_set += list(limit_idx)
 
             # apply the current limit to the target attribute
-            # need list to index properly
-            attr_limited = attr[list(limit_idx)]
-            uattr_limited = np.unique(attr_limited)
+            codes_limited = codes[limit_idx]
+            nelements = np.bincount(codes_limited, minlength=nuattr)
+            # unique attribute values present within the limit
+            ucodes_limited = np.flatnonzero(nelements)
 
             # handle all types of supported arguments
             if amount == 'equal':
                 # go for maximum possible number of samples provided
                 # by each label in this dataset
                 # determine the min number of samples per class
-                epa = get_nelements_per_value(attr_limited)
-                min_epa = min(epa.values())
-                for k in epa:
-                    epa[k] = min_epa
+                epa = [nelements[ucodes_limited].min()] * nuattr
             elif isinstance(amount, float):
-                epa = get_nelements_per_value(attr_limited)
-                for k in epa:
-                    epa[k] = int(round(epa[k] * amount))
+                epa = [int(round(n * amount)) for n in nelements]
             elif isinstance(amount, int):
-                epa = dict(zip(uattr_limited, [amount] * len(uattr_limited)))
+                epa = [amount] * nuattr
             else:
                 raise ValueError("Unknown type of amount argument '%s'" % amount)
 
             # select determined number of elements per unique attribute value
+            # (indices of the elements are grouped by value in ascending order)
+            order = np.argsort(codes_limited, kind='mergesort')
+            groups = np.split(order, np.cumsum(nelements)[:-1])
             selected = []
-            for ua in uattr_limited:
-                selected += random.sample(list((attr_limited == ua).nonzero()[0]),
-                                          epa[ua])
+            for ucode in ucodes_limited:
+                selected += random.sample(list(groups[ucode]), epa[ucode])
 
             # determine the final indices of selected elements and store
             # as part of the balanced set
@@ -10,11 +10,13 @@
 
 __docformat__ = 'restructuredtext'
 
+import time
 import numpy as np
 import copy
 
 from mvpa2.base.learner import Learner
 from mvpa2.base.node import ChainNode
+from mvpa2.base.state import ConditionalAttribute
 from mvpa2.base.types import is_datasetlike, accepts_dataset_as_samples
 from mvpa2.base.dochelpers import _str, _repr_attrs
 from mvpa2.base.dochelpers import borrowdoc
@@ -189,6 +191,30 @@ class Mapper(Learner):
         return mds
 
 
+    def _forward_dataset_inplace(self, dataset):
+        """Forward-map a dataset by modifying its samples in place.
+
+        This is a private method that can be implemented in derived classes
+        with element-wise, or otherwise shape-preserving, transformations to
+        avoid the allocation of new samples (see the ``fused`` mode of
+        `ChainMapper`). It is only called for trained mappers and with datasets
+        whose samples are not referenced from outside. The returned dataset
+        has to reuse the samples array of the input dataset. Attribute
+        collections of the input dataset must not be modified.
+
+        Parameters
+        ----------
+        dataset : Dataset-like
+
+        Returns
+        -------
+        Dataset or NotImplemented
+          NotImplemented if this dataset cannot be mapped in place, which is
+          the default.
+        """
+        return NotImplemented
+
+
     #
     # The following methods provide common functionality for all mappers
     # and there should be no immediate need to reimplement them
@@ -292,16 +318,115 @@ class Mapper(Learner):
 
 
 
+def _samples_nbytes(ds):
+    samples = ds.samples
+    return samples.nbytes if isinstance(samples, np.ndarray) else 0
+
+
+def _samples_share_memory(ds1, ds2):
+    s1, s2 = ds1.samples, ds2.samples
+    if not (isinstance(s1, np.ndarray) and isinstance(s2, np.ndarray)):
+        return True
+    return np.may_share_memory(s1, s2)
+
+
 class ChainMapper(ChainNode):
     """Class that amends ChainNode with a mapper-like interface.
 
     ChainMapper supports sequential training of a mapper chain, as well as
     reverse-mapping and mapping of single samples.
+
+    In ``fused`` mode, mappers that are able to modify samples in place
+    (e.g. `ZScoreMapper`, `PolyDetrendMapper`) do so whenever the samples
+    have been created within the chain (i.e. are not shared with the input
+    dataset) and are C-contiguous. Hence a chain only allocates memory for mappers that change
+    the shape of the samples (e.g. feature selection, projection).
     """
+
+    forward_profile = ConditionalAttribute(enabled=False, doc="""\
+        Profile of the last forward-mapping through the chain: a list with a
+        (mapper, seconds, bytes allocated for samples, in place) tuple for
+        each mapper.""")
+
+    # class-level default for instances reconstructed without __init__
+    # (e.g. from HDF5)
+    _fused = False
+
+    def __init__(self, nodes, fused=False, **kwargs):
+        """
+        Parameters
+        ----------
+        nodes: list
+          Mapper instances.
+        fused : bool
+          If True, mappers capable of it modify samples created within the
+          chain in place, instead of allocating new ones.
+        """
+        ChainNode.__init__(self, nodes, **kwargs)
+        self._fused = fused
+
+
+    def __copy__(self):
+        return self.__class__([copy.copy(n) for n in self], fused=self._fused)
+
+
+    def __repr__(self, prefixes=None):
+        if prefixes is None:
+            prefixes = []
+        return super(ChainMapper, self).__repr__(
+            prefixes=prefixes
+            + _repr_attrs(self, ['fused'], default=False))
+
+
     def forward(self, ds):
         return self(ds)
 
 
+    def _call(self, ds):
+        if not (self._fused or self.ca.is_enabled('forward_profile')) \
+                or not is_datasetlike(ds):
+            return super(ChainMapper, self)._call(ds)
+        profile = []
+        mp = ds
+        # whether the current samples were created within the chain
+        owned = False
+        for i, n in enumerate(self):
+            t0 = time.time()
+            mapped = NotImplemented
+            if self._fused and owned and isinstance(n, Mapper) \
+                    and n.is_trained and not n.force_train:
+                # same as a regular call, except for the actual mapping
+                n._precall(mp)
+                mapped = n._forward_dataset_inplace(mp)
+                if mapped is not NotImplemented:
+                    mapped = n._postcall(mp, mapped)
+            inplace = mapped is not NotImplemented
+            if not inplace:
+                mapped = n(mp)
+            if inplace or _samples_share_memory(mapped, mp):
+                nbytes = 0
+            else:
+                nbytes = _samples_nbytes(mapped)
+            profile.append((n, time.time() - t0, nbytes, inplace))
+            if __debug__:
+                debug('MAP', "%s: node (%i/%i) '%s' took %.3fs, %s"
+                      % (self.__class__.__name__, i + 1, len(self), n,
+                         profile[-1][1],
+                         inplace and "in place" or "%i bytes" % nbytes))
+            if self._fused:
+                samples = mapped.samples
+                # in place operations on row blocks are slow for other
+                # memory layouts (e.g. after fancy-indexing features), hence
+                # those samples rather get copied by the next mapper
+                owned = isinstance(samples, np.ndarray) \
+                        and samples.flags.writeable \
+                        and samples.flags.c_contiguous \
+                        and not _samples_share_memory(mapped, ds)
+            mp = mapped
+        self.ca.forward_profile = profile
+        return mp
+
+
     def forward1(self, data):
         """Forward data or datasets through the chain.
 
@@ -407,6 +532,8 @@ class ChainMapper(ChainNode):
     def __str__(self):
         return super(ChainMapper, self).__str__().replace('Mapper', '')
 
+    fused = property(fget=lambda self: self._fused)
+
 
 
 class CombinedMapper(Mapper):
@@ -11,6 +11,7 @@
 __docformat__ = 'restructuredtext'
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided as _as_strided
 
 from mvpa2.mappers.base import Mapper
 from mvpa2.clfs.base import accepts_dataset_as_samples
@@ -27,6 +28,13 @@ class BoxcarMapper(Mapper):
 
     This mapper is somewhat unconventional since it doesn't preserve number
     of samples (ie the size of 0-th dimension).
+
+    All boxcars are extracted with a single indexing operation. In ``lazy``
+    mode and with equally spaced startpoints, the boxcars are returned as a
+    read-only strided view of the input array instead, hence no data is
+    copied until the samples are actually processed (e.g. averaged by a
+    subsequent FxMapper). Otherwise (irregular startpoints) a copy is
+    made regardless of the ``lazy`` setting.
     """
     # TODO: extend with the possibility to provide real onset vectors and a
     #       samples attribute that is used to determine the actual sample that
@@ -35,7 +43,8 @@ class BoxcarMapper(Mapper):
     #       utility functionality (outside BoxcarMapper) could be used to merge
     #       arbitrary sample attributes into the samples matrix (with
     #       appropriate mapper adjustment, e.g. CombinedMapper).
-    def __init__(self, startpoints, boxlength, offset=0, **kwargs):
+    def __init__(self, startpoints, boxlength, offset=0, lazy=False,
+                 **kwargs):
         """
         Parameters
         ----------
@@ -47,6 +56,9 @@ class BoxcarMapper(Mapper):
         offset : int
           The offset between the provided starting point and the actual start
           of the boxcar.
+        lazy : bool
+          If True, boxcars of the samples are returned as a read-only view of
+          the input data whenever possible.
         """
         Mapper.__init__(self, **kwargs)
         self._outshape = None
@@ -68,12 +80,7 @@ class BoxcarMapper(Mapper):
 
         self.boxlength = int(boxlength)
         self.offset = offset
-        self.__selectors = None
-
-        # build a list of list where each sublist contains the indexes of to be
-        # averaged data elements
-        self.__selectors = [ slice(i + offset, i + offset + boxlength) \
-                             for i in startpoints ]
+        self.lazy = lazy
 
 
     def __reduce__(self):
@@ -106,8 +113,9 @@ class BoxcarMapper(Mapper):
 
     def __repr__(self):
         s = super(BoxcarMapper, self).__repr__()
-        return s.replace("(", "(boxlength=%d, offset=%d, startpoints=%s, " %
-                         (self.boxlength, self.offset, str(self.startpoints)),
+        return s.replace("(", "(boxlength=%d, offset=%d, startpoints=%s, %s" %
+                         (self.boxlength, self.offset, str(self.startpoints),
+                          self.lazy and 'lazy=True, ' or ''),
                          1)
 
 
@@ -145,7 +153,39 @@ class BoxcarMapper(Mapper):
         """
         # NOTE: _forward_dataset() relies on the assumption that the following
         # also works with 1D arrays and still yields sane results
-        return np.vstack([data[box][np.newaxis] for box in self.__selectors])
+        if self.lazy:
+            boxes = self._get_boxcar_view(data)
+            if boxes is not None:
+                return boxes
+        return self._gather(data)
+
+
+    def _gather(self, data):
+        """Copy all boxcars into a (#startpoints, boxlength, ...) array"""
+        idx = (self.startpoints + self.offset)[:, None] \
+              + np.arange(self.boxlength)
+        return np.asanyarray(data)[idx]
+
+
+    def _get_boxcar_view(self, data):
+        """Strided view with all boxcars, or None if it cannot be created"""
+        if not isinstance(data, np.ndarray) or not len(self.startpoints):
+            return None
+        starts = self.startpoints + self.offset
+        if starts.min() < 0 or starts.max() + self.boxlength > len(data):
+            return None
+        steps = np.diff(starts)
+        if len(steps) and not np.all(steps == steps[0]):
+            # irregular spacing cannot be expressed by strides
+            return None
+        step = steps[0] if len(steps) else 0
+        view = _as_strided(
+                    data[starts[0]:],
+                    shape=(len(starts), self.boxlength) + data.shape[1:],
+                    strides=(step * data.strides[0],) + data.strides)
+        # overlapping boxcars share memory -- prevent any modification
+        view.flags.writeable = False
+        return view
 
 
     def _forward_dataset(self, dataset):
@@ -164,9 +204,9 @@ class BoxcarMapper(Mapper):
         # map old sample attributes -- which simply get stacked into one for all
         # boxcar elements/samples
         for k in dataset.sa:
-            # using _forward_data() instead of forward(), since we know that
-            # this implementation can actually deal with 1D-arrays
-            mds.sa[k] = self._forward_data(dataset.sa[k].value)
+            # this implementation can actually deal with 1D-arrays -- attributes
+            # are always copied, even in lazy mode
+            mds.sa[k] = self._gather(dataset.sa[k].value)
         # create the box offset attribute if space name is given
         if self.get_space():
             mds.fa[self.get_space() + '_offsetidx'] = np.arange(self.boxlength,
@@ -11,7 +11,7 @@
 __docformat__ = 'restructuredtext'
 
 import numpy as np
-from mvpa2.base.types import is_sequence_type
+from mvpa2.base.types import is_sequence_type, get_float_dtype
 
 from mvpa2.base import externals
 if externals.exists('scipy', raise_=True):
@@ -68,6 +68,16 @@ class PolyDetrendMapper(Mapper):
     reverse mapping, or subsequent forward-mapping of partial datasets are
     currently not implemented.
 
+    Floating point samples are detrended in their own dtype (i.e. float32 data
+    is not upcasted), while integer samples are converted into the configured
+    float dtype (see `mvpa2.base.types.get_float_dtype`).
+
+    For chunk-wise detrending without additional regressors the design matrix
+    is block-diagonal. In this case each chunk is detrended independently by
+    projecting its samples onto an orthonormal basis of its own polynomials,
+    instead of solving the full design. Chunks with identical polynomial
+    regressors (e.g. runs of equal length) share the same basis.
+
     Examples
     --------
     >>> from mvpa2.datasets import dataset_wizard
@@ -133,6 +143,9 @@ class PolyDetrendMapper(Mapper):
         # things that come from train()
         self._polycoords = None
         self._regs = None
+        self._ntrain = None
+        # per-chunk (sample selection, basis) for block-diagonal designs
+        self._chunk_bases = None
 
         # secret switch to perform in-place detrending
         self._secret_inplace_detrend = False
@@ -199,6 +212,13 @@ class PolyDetrendMapper(Mapper):
             return polycoords, self._scale_array(polycoords.astype('float'))
 
 
+    @staticmethod
+    def _get_basis(regs):
+        # orthonormal basis of the column space of the regressors
+        # (tolerance as in np.linalg.pinv)
+        u, s, vt = np.linalg.svd(regs, full_matrices=False)
+        return u[:, s > 1e-15 * s.max()]
+
     def _train(self, ds):
         # local binding
         chunks_attr = self.params.chunks_attr
@@ -206,6 +226,8 @@ class PolyDetrendMapper(Mapper):
         opt_reg = self.params.opt_regs
         inspace = self.get_space()
         self._polycoords = None
+        self._chunk_bases = None
+        self._regs = None
 
         # global detrending is desired
         if chunks_attr is None:
@@ -243,19 +265,40 @@ class PolyDetrendMapper(Mapper):
                 # filled below -- we know that those polycoords are going to
                 # be ints
                 self._polycoords = np.empty(len(ds), dtype='int')
+            # without additional regressors chunks can be detrended
+            # independently
+            blockwise = opt_reg is None
+            chunk_bases = []
+            # bases of identical per-chunk designs
+            basis_cache = {}
+            chunks = ds.sa[chunks_attr].value
             for n, chunk in enumerate(uchunks):
                 # get the indices for that chunk
-                cinds = ds.sa[chunks_attr].value == chunk
+                cinds = chunks == chunk
 
                 # create the timespan
                 polycoords, polycoords_scaled = self._get_polycoords(ds, cinds)
                 if update_polycoords and polycoords is not None:
                     self._polycoords[cinds] = polycoords
                 # create each polyord with the value for that chunk
-                for n in range(polyord[n] + 1):
-                    newreg = np.zeros((len(ds), 1))
-                    newreg[cinds, 0] = legendre_(n, polycoords_scaled)
-                    reg.append(newreg)
+                cregs = np.array([legendre_(o, polycoords_scaled)
+                                  for o in range(polyord[n] + 1)]).T
+                if blockwise:
+                    key = (cregs.shape, cregs.tostring())
+                    if not key in basis_cache:
+                        basis_cache[key] = self._get_basis(cregs)
+                    cidx = np.flatnonzero(cinds)
+                    if len(cidx) and cidx[-1] - cidx[0] + 1 == len(cidx):
+                        # contiguous chunk -- allows for in-place updates
+                        cidx = slice(cidx[0], cidx[-1] + 1)
+                    chunk_bases.append((cidx, basis_cache[key]))
+                else:
+                    for creg in cregs.T:
+                        newreg = np.zeros((len(ds), 1))
+                        newreg[cinds, 0] = creg
+                        reg.append(newreg)
+            if blockwise:
+                self._chunk_bases = chunk_bases
 
         # if we don't handle in inspace, there is no need to store polycoords
         if inspace is None:
@@ -268,15 +311,27 @@ class PolyDetrendMapper(Mapper):
                 reg.append(ds.sa[oreg].value[np.newaxis].T)
 
         # combine the regs (time x reg)
-        self._regs = np.hstack(reg)
+        if self._chunk_bases is None:
+            self._regs = np.hstack(reg)
+        self._ntrain = len(ds)
 
 
     def _forward_dataset(self, ds):
+        return self._forward_dataset_helper(ds, self._secret_inplace_detrend)
+
+
+    def _forward_dataset_inplace(self, ds):
+        if not np.issubdtype(ds.samples.dtype, np.floating):
+            return NotImplemented
+        return self._forward_dataset_helper(ds.copy(deep=False), True)
+
+
+    def _forward_dataset_helper(self, ds, inplace):
         # auto-train the mapper if not yet done
-        if self._regs is None:
+        if self._regs is None and self._chunk_bases is None:
             self.train(ds)
 
-        if self._secret_inplace_detrend:
+        if inplace:
             mds = ds
         else:
             # shallow copy to put the new stuff in
@@ -288,14 +343,14 @@ class PolyDetrendMapper(Mapper):
         polycoords = self._polycoords
 
         # is it possible to map that dataset?
-        if inspace is None and len(regs) != len(ds):
+        if inspace is None and self._ntrain != len(ds):
             raise ValueError("Cannot detrend the dataset, since it neither "
                              "provides location information of its samples "
                              "in the space spanned by the polynomials, "
                              "nor does it match the number of samples this "
                              "this mapper has been trained on. (got: %i "
                              " and was trained on %i)."
-                             % (len(ds), len(regs)))
+                             % (len(ds), self._ntrain))
         # do we have to handle the polynomial space somehow?
         if inspace is not None:
             if inspace in ds.sa:
@@ -321,24 +376,35 @@ class PolyDetrendMapper(Mapper):
                 # let's put that information into the output dataset
                 mds.sa[inspace] = self._polycoords
 
+        # everything is computed in the dtype of the result, so floating point
+        # (e.g. float32) samples do not get upcasted on the way
+        samples = ds.samples
+        dtype = get_float_dtype(samples.dtype)
+        if samples.dtype != dtype:
+            samples = samples.astype(dtype)
+        elif not inplace:
+            samples = samples.copy()
+
+        if self._chunk_bases is not None:
+            # residualize chunk by chunk, in-place
+            for cidx, basis in self._chunk_bases:
+                basis = basis.astype(dtype)
+                csamples = samples[cidx]
+                csamples -= np.dot(basis, np.dot(basis.T, csamples))
+                if not isinstance(cidx, slice):
+                    # fancy indexing yields a copy
+                    samples[cidx] = csamples
+            mds.samples = samples
+            return mds
+
         # regression for each feature
-        fit = np.linalg.lstsq(regs, ds.samples)
-        # actually we are only interested in the solution
-        # res[0] is (nregr x nfeatures)
-        y = fit[0]
+        # (nregr x nfeatures)
+        y = np.dot(np.linalg.pinv(regs).astype(dtype), samples)
+        fit = np.dot(regs.astype(dtype), y)
         # remove all and keep only the residuals
-        if self._secret_inplace_detrend:
-            # if we are in evil mode do evil
-
-            # cast the data to float, since in-place operations below do not
-            # upcast!
-            if np.issubdtype(mds.samples.dtype, np.integer):
-                mds.samples = mds.samples.astype('float')
-
-            mds.samples -= np.dot(regs, y)
-        else:
-            # important to assign to ensure COW behavior
-            mds.samples = ds.samples - np.dot(regs, y)
+        # (samples are a copy already, unless we are in evil mode)
+        samples -= fit
+        mds.samples = samples
 
         return mds
 
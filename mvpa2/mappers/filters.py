@@ -20,13 +20,51 @@ if externals.exists('scipy', raise_=True):
 
 from mvpa2.base import warning
 from mvpa2.base.param import Parameter
-from mvpa2.base.constraints import EnsureChoice, EnsureInt, EnsureNone
+from mvpa2.base.constraints import EnsureChoice, EnsureInt, EnsureNone, \
+        EnsureRange
 from mvpa2.base.dochelpers import _str, borrowkwargs
 from mvpa2.mappers.base import Mapper
 from mvpa2.datasets import Dataset
 from mvpa2.base.dataset import vstack
 from mvpa2.generators.splitters import Splitter
 
+
+def _get_nproc(nproc):
+    if nproc is None:
+        from multiprocessing import cpu_count
+        return cpu_count()
+    return nproc
+
+
+def _thread_map(fx, jobs, nproc):
+    """Like map(), but calling `fx` concurrently in `nproc` threads
+
+    Only worth it for functions that spend most of the time outside of the
+    GIL, like SciPy's signal processing routines.
+    """
+    if nproc > 1 and len(jobs) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(nproc, len(jobs)))
+        try:
+            # map() preserves the order of the jobs
+            return pool.map(fx, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    return [fx(job) for job in jobs]
+
+
+def _get_blocks(n, block_size, nproc):
+    """Slices splitting `n` elements into blocks
+
+    Without a `block_size` the elements are evenly split across `nproc`
+    blocks.
+    """
+    if block_size is None:
+        block_size = max(int(np.ceil(float(n) / nproc)), 1)
+    return [slice(i, i + block_size) for i in xrange(0, max(n, 1), block_size)]
+
+
 class FFTResampleMapper(Mapper):
     """Mapper for FFT-based resampling.
 
@@ -38,9 +76,12 @@ class FFTResampleMapper(Mapper):
 
     Pretty much Mapper frontend for scipy.signal.resample
 
+    Chunks, or blocks of features, can be resampled concurrently in multiple
+    threads (see ``nproc``), since the FFT is computed outside of Python's
+    global interpreter lock.
     """
     def __init__(self, num, window=None, chunks_attr=None, position_attr=None,
-                 attr_strategy='remove', **kwargs):
+                 attr_strategy='remove', nproc=1, block_size=None, **kwargs):
         """
         Parameters
         ----------
@@ -65,6 +106,14 @@ class FFTResampleMapper(Mapper):
           10th), and 'resample' will also apply the actual data resampling
           procedure to the attributes as well (which might not be possible, e.g.
           for literal attributes).
+        nproc : int or None
+          Number of threads to use. Individual chunks are processed
+          concurrently, if ``chunks_attr`` is given, otherwise blocks of
+          features. If None, as many threads as CPU cores are used.
+        block_size : int or None
+          Number of features to resample at once. If None, all features are
+          processed at once, or split evenly across all threads if no
+          ``chunks_attr`` is given.
         """
         Mapper.__init__(self, **kwargs)
 
@@ -73,13 +122,16 @@ class FFTResampleMapper(Mapper):
         self.__chunks_attr = chunks_attr
         self.__position_attr = position_attr
         self.__attr_strategy = attr_strategy
+        self.__nproc = nproc
+        self.__block_size = block_size
 
 
     def __repr__(self):
-        s = super(FFTResamplemapper, self).__repr__()
+        s = super(FFTResampleMapper, self).__repr__()
         return s.replace("(",
-                         "(chunks_attr=%s, "
-                          % (repr(self.__chunks_attr),),
+                         "(chunks_attr=%s, nproc=%s, block_size=%s, "
+                          % (repr(self.__chunks_attr), repr(self.__nproc),
+                             repr(self.__block_size)),
                          1)
 
 
@@ -89,24 +141,49 @@ class FFTResampleMapper(Mapper):
 
     def _forward_data(self, data):
         # we cannot have position information without a dataset
-        return resample(data, self.__num, t=None, window=self.__window_args)
+        return self._resample(data, None, _get_nproc(self.__nproc))[0]
+
+
+    def _resample(self, samples, t, nproc):
+        """Resample blocks of features, return samples and new positions"""
+        num = self.__num
+        window = self.__window_args
+        block_size = self.__block_size
+        if samples.ndim < 2 or (block_size is None and nproc == 1):
+            blocks = [slice(None)]
+        else:
+            blocks = _get_blocks(samples.shape[1], block_size, nproc)
+        if t is None:
+            fx = lambda b: (resample(samples[:, b], num, t=None,
+                                     window=window), None)
+        else:
+            fx = lambda b: resample(samples[:, b], num, t=t, window=window)
+        mapped = _thread_map(fx, blocks, nproc)
+        pos = mapped[0][1]
+        if len(mapped) == 1:
+            return mapped[0][0], pos
+        return np.concatenate([m[0] for m in mapped], axis=1), pos
 
 
     def _forward_dataset(self, ds):
+        nproc = _get_nproc(self.__nproc)
         if self.__chunks_attr is None:
-            return self._forward_dataset_helper(ds)
+            return self._forward_dataset_helper(ds, nproc)
         else:
             # strip down dataset to speedup local processing
             if self.__attr_strategy == 'remove':
-                keep_sa = []
+                # only keep what is needed for splitting
+                keep_sa = [self.__chunks_attr]
             else:
                 keep_sa = None
             proc_ds = ds.copy(deep=False, sa=keep_sa, fa=[], a=[])
             # process all chunks individually
             # use a customsplitter to speed-up splitting
             spl = Splitter(self.__chunks_attr)
-            dses = [self._forward_dataset_helper(d)
-                        for d in spl.generate(proc_ds)]
+            # chunks are processed concurrently, features within a chunk
+            # in the same thread
+            dses = _thread_map(lambda d: self._forward_dataset_helper(d, 1),
+                               list(spl.generate(proc_ds)), nproc)
             # and merge them again
             mds = vstack(dses)
             # put back attributes
@@ -115,7 +192,7 @@ class FFTResampleMapper(Mapper):
             return mds
 
 
-    def _forward_dataset_helper(self, ds):
+    def _forward_dataset_helper(self, ds, nproc):
         # local binding
         num = self.__num
 
@@ -123,12 +200,8 @@ class FFTResampleMapper(Mapper):
         if self.__position_attr is not None:
             # we know something about sample position
             pos = ds.sa[self.__position_attr].value
-            rsamples, pos = resample(ds.samples, self.__num, t=pos,
-                                     window=self.__window_args)
-        else:
-            # we know nothing about samples position
-            rsamples = resample(ds.samples, self.__num, t=None,
-                                window=self.__window_args)
+        # pos remains None if we know nothing about samples position
+        rsamples, pos = self._resample(ds.samples, pos, nproc)
         # new dataset that reuses that feature and dataset attributes of the
         # source
         mds = Dataset(rsamples, fa=ds.fa, a=ds.a)
@@ -195,6 +268,11 @@ class IIRFilterMapper(Mapper):
     >>> b, a = signal.butter(8, 0.125)
     >>> mapper = IIRFilterMapper(b, a, padlen=150)
 
+    Data can be filtered in blocks (e.g. of features, if filtering along
+    the samples axis) that are processed concurrently in multiple threads,
+    and results can be written back into the input array (e.g. to keep
+    large float32 datasets in their original precision without a
+    temporary float64 copy of all samples).
     """
 
     axis = Parameter(0, constraints='int',
@@ -214,6 +292,22 @@ class IIRFilterMapper(Mapper):
             `x.shape[axis]-1`.  `padlen=0` implies no padding. The default
             value is 3*max(len(a),len(b))""")
 
+    nproc = Parameter(1, constraints=EnsureNone() | (EnsureInt()
+                                                      & EnsureRange(min=1)),
+            doc="""Number of threads to filter blocks of data with. If None,
+            as many threads as CPU cores are used.""")
+
+    block_size = Parameter(None, constraints=EnsureNone() | (EnsureInt()
+                                                      & EnsureRange(min=1)),
+            doc="""Number of elements along the first axis other than `axis`
+            (i.e. features, by default) to filter at once. If None, the data
+            are filtered at once, or split evenly across all threads.""")
+
+    inplace = Parameter(False, constraints='bool',
+            doc="""If True, filtered values are stored in the input array,
+            which needs to be of floating point type. This modifies the
+            samples of the input dataset.""")
+
     def __init__(self, b, a, **kwargs):
         """
         All constructor parameters are analogs of filtfilt() or are passed
@@ -231,7 +325,50 @@ class IIRFilterMapper(Mapper):
         self.__iir_num = b
         self.__iir_denom = a
 
+    def _forward_dataset_inplace(self, ds):
+        if not np.issubdtype(ds.samples.dtype, np.floating):
+            return NotImplemented
+        mds = ds.copy(deep=False)
+        mds.samples = self._filter_data(ds.samples, True)
+        return mds
+
+
     def _forward_data(self, data):
+        return self._filter_data(data, self.params.inplace)
+
+
+    def _filter_data(self, data, inplace):
+        params = self.params
+        if inplace and not np.issubdtype(data.dtype, np.floating):
+            raise TypeError("Cannot filter in place, since data is not of "
+                            "floating point type (got %s)" % data.dtype)
+        nproc = _get_nproc(params.nproc)
+        if data.ndim < 2 or (params.block_size is None and nproc == 1):
+            mapped = self._filter(data)
+            if inplace:
+                data[...] = mapped
+                return data
+            return mapped
+
+        # filter blocks along another axis than the filter axis
+        baxis = int(params.axis % data.ndim == 0)
+        def _filter_block(block):
+            idx = tuple([slice(None)] * baxis + [block])
+            mapped = self._filter(data[idx])
+            if inplace:
+                data[idx] = mapped
+                return None
+            return mapped
+        mapped = _thread_map(_filter_block,
+                             _get_blocks(data.shape[baxis], params.block_size,
+                                         nproc),
+                             nproc)
+        if inplace:
+            return data
+        return np.concatenate(mapped, axis=baxis)
+
+
+    def _filter(self, data):
         params = self.params
         try:
             mapped = filtfilt(self.__iir_num,
@@ -206,7 +206,6 @@ class FxMapper(Mapper):
 
 
     def _forward_dataset_grouped(self, ds):
-        mdata = [] # list of samples array pieces
         if self.__axis == 'samples':
             col = ds.sa
             axis = 0
@@ -216,64 +215,60 @@ class FxMapper(Mapper):
         else:
             raise RuntimeError("This should not have happened!")
 
-        attrs = dict(zip(col.keys(), [[] for i in col]))
-
-        # create a dictionary for all unique elements in all attribute this
-        # mapper should operate on
-        self.__attrcombs = dict(zip(self.__uattrs,
-                                [col[attr].unique for attr in self.__uattrs]))
-        # let it generate all combinations of unique elements in any attr
-        order = self.order
-        order_keys = []
-        for comb in _orthogonal_permutations(self.__attrcombs):
-            selector = reduce(np.multiply,
-                                [array_whereequal(col[attr].value, value)
-                                 for attr, value in comb.iteritems()])
-
-            # process the samples
+        order_idx, bounds, group_order = _get_groups(col, self.__uattrs,
+                                                     self.order, ds)
+        if np.all(order_idx[1:] > order_idx[:-1]):
+            # groups are contiguous already -- operate on views
+            samples = ds.samples
+            order_idx = None
+        else:
+            samples = ds.samples.take(order_idx, axis=axis)
+        starts = bounds[:-1]
+
+        reduceat = None
+        if axis == 1 and not len(self.__fxargs):
+            try:
+                reduceat = _REDUCEAT_FX.get(self.__fx)
+            except TypeError:
+                # unhashable fx
+                pass
+        if reduceat is not None:
+            # reduce all groups at once, along the contiguous axis
+            ufunc, is_mean = reduceat
+            mdata = ufunc.reduceat(samples, starts, axis=1)
+            if is_mean:
+                counts = np.diff(bounds)
+                counts.shape = (1, -1) + (1,) * (mdata.ndim - 2)
+                if not np.issubdtype(mdata.dtype, np.inexact):
+                    mdata = mdata.astype(np.float64)
+                mdata /= counts
+            mdata = mdata[:, group_order]
+        else:
+            mdata = []
+            for g in group_order:
+                if axis == 0:
+                    gsamples = samples[bounds[g]:bounds[g + 1]]
+                else:
+                    gsamples = samples[:, bounds[g]:bounds[g + 1]]
+                mdata.append(self.__smart_apply_along_axis(gsamples))
             if axis == 0:
-                samples = ds.samples[selector]
+                mdata = np.vstack(mdata)
             else:
-                samples = ds.samples[:, selector]
-
-            # check if there were any samples for such a combination,
-            # if not -- warning and skip the rest of the loop body
-            if not len(samples):
-                warning('There were no samples for combination %s. It might be '
-                        'a sign of a disbalanced dataset %s.' % (comb, ds))
-                continue
-
-            fxed_samples = self.__smart_apply_along_axis(samples)
-            mdata.append(fxed_samples)
-            if self.__attrfx is not None:
-                # and now all samples attributes
-                for i, attr in enumerate(col):
-                    fxed_attr = self.__attrfx(col[attr].value[selector])
-                    attrs[attr].append(fxed_attr)
-            # possibly take care about collecting information to have groups ordered
-            if order == 'uattrs':
-                # reverse order as per docstring -- most of the time we have
-                # used uattrs=['targets', 'chunks'] and did expect chunks being
-                # groupped together.
-                order_keys.append([comb[a] for a in self.__uattrs[::-1]])
-            elif order == 'occurrence':
-                # First index should be sufficient since we are dealing
-                # with unique non-overlapping groups here (AFAIK ;) )
-                order_keys.append(np.where(selector)[0][0])
-
-        if order:
-            # reorder our groups using collected "order_keys"
-            # data
-            order_idxs = argsort(order_keys)
-            mdata = [mdata[i] for i in order_idxs]
-            # and attributes
-            attrs = dict((k, [v[i] for i in order_idxs])
-                         for k,v in attrs.iteritems())
-
-        if axis == 0:
-            mdata = np.vstack(mdata)
-        else:
-            mdata = np.vstack(np.transpose(mdata))
+                mdata = np.vstack(np.transpose(mdata))
+
+        attrs = {}
+        if self.__attrfx is not None:
+            for attr in col:
+                value = col[attr].value
+                if order_idx is not None:
+                    value = value[order_idx]
+                if self.__attrfx is _uniquemerge2literal \
+                        and _is_constant_in_groups(value, starts):
+                    # nothing to merge
+                    attrs[attr] = value[starts[group_order]]
+                else:
+                    attrs[attr] = [self.__attrfx(value[bounds[g]:bounds[g + 1]])
+                                   for g in group_order]
         return mdata, attrs
 
 
@@ -553,6 +548,77 @@ def argsort(seq, reverse=False):
     # cmp was not passed through since seems to be absent in python3
     return sorted(range(len(seq)), key=seq.__getitem__, reverse=reverse)
 
+# reductions that can be applied to all groups at once via ufunc.reduceat():
+# fx -> (ufunc, whether to divide by the group size)
+_REDUCEAT_FX = {
+    np.sum: (np.add, False),
+    np.mean: (np.add, True),
+    np.max: (np.maximum, False),
+    np.min: (np.minimum, False),
+}
+
+
+def _factorize(collectable):
+    """Return integer codes for the unique values of an attribute"""
+    value = collectable.value
+    if value.ndim == 1:
+        # cached with the attribute
+        return len(collectable.unique), collectable.codes
+    # fall back on elementwise comparisons
+    uvalues = collectable.unique
+    codes = np.zeros(len(value), dtype=int)
+    for i, u in enumerate(uvalues):
+        codes[array_whereequal(value, u)] = i
+    return len(uvalues), codes
+
+
+def _get_groups(col, uattrs, order, ds):
+    """Determine groups of elements with a unique combination of attributes
+
+    Only combinations that are actually present are considered.
+
+    Returns
+    -------
+    order_idx : array
+      Indices that sort elements by group.
+    bounds : array
+      Group ``i`` consists of ``order_idx[bounds[i]:bounds[i+1]]``.
+      Groups are sorted by their values of `uattrs`, with the last one being
+      the most significant.
+    group_order : array
+      Order of groups in the output, as requested by `order`.
+    """
+    nuniques, codes = zip(*[_factorize(col[attr]) for attr in uattrs])
+    # stable sort, last key is the primary one
+    order_idx = np.lexsort(codes)
+    sorted_codes = np.array(codes)[:, order_idx]
+    changes = np.any(sorted_codes[:, 1:] != sorted_codes[:, :-1], axis=0)
+    bounds = np.r_[0, np.flatnonzero(changes) + 1, len(order_idx)]
+    ngroups = len(bounds) - 1
+    ncombs = np.prod(nuniques)
+    if ngroups < ncombs:
+        warning('There were no samples for %i out of %i combinations of %s. '
+                'It might be a sign of a disbalanced dataset %s.'
+                % (ncombs - ngroups, ncombs, uattrs, ds))
+    if order == 'occurrence':
+        # sort is stable, hence the first element of each group is its
+        # first occurrence
+        group_order = np.argsort(order_idx[bounds[:-1]], kind='mergesort')
+    else:
+        group_order = np.arange(ngroups)
+    return order_idx, bounds, group_order
+
+
+def _is_constant_in_groups(value, starts):
+    """Whether a 1D attribute has a single value within each group"""
+    if value.ndim != 1 or value.dtype == np.dtype('object') or not len(value):
+        return False
+    same = value[1:] == value[:-1]
+    # group boundaries may change their value
+    same[starts[1:] - 1] = True
+    return bool(np.all(same))
+
+
 def _orthogonal_permutations(a_dict):
     """
     Takes a dictionary with lists as values and returns all permutations
@@ -8,8 +8,8 @@
 ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Transform datasets into parameter estimates of a general linear model fit.
 
-This module provides the base class, as well as multiple implementations of a
-GLM based on different 3rd-party packages.
+This module provides the base class, a NumPy-only implementation, as well as
+implementations of a GLM based on different 3rd-party packages.
 """
 
 __docformat__ = 'restructuredtext'
@@ -42,8 +42,8 @@ class GLMMapper(Mapper):
     estimates corresponding to a design matrix column.
 
     This is a base class, thus is not supposed to be used directly by users
-    which should use specific implementations suchas NiPyGLMMapper and
-    StatsmodelsGLMMapper.
+    which should use specific implementations suchas NativeGLMMapper,
+    NiPyGLMMapper and StatsmodelsGLMMapper.
     """
     # TODO optimize design matrix generation in case no regressor comes from the
     # input dataset and everything can be precomputed
@@ -141,6 +141,9 @@ class GLMMapper(Mapper):
     #def _reverse_dataset(self, ds):
         # reconstruct timeseries from model fit
 
+from .native_glm import NativeGLMMapper
+__all__.append('NativeGLMMapper')
+
 from mvpa2 import externals
 if externals.exists('nipy'):
     from .nipy_glm import NiPyGLMMapper
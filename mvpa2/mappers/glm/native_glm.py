@@ -0,0 +1,140 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the PyMVPA package for the
+#   copyright and license terms.
+#
+### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""GLMMapper implementation based on NumPy only."""
+
+__docformat__ = 'restructuredtext'
+
+import numpy as np
+
+from mvpa2.base.param import Parameter
+from mvpa2.base.constraints import EnsureChoice, EnsureInt, EnsureRange
+from mvpa2.base.types import get_float_dtype
+from mvpa2.datasets import Dataset
+from mvpa2.mappers.glm import GLMMapper
+
+if __debug__:
+    from mvpa2.base import debug
+
+
+def _ar1_whiten(a, rho):
+    """Prewhiten the rows of `a` for an AR(1) process with coefficient `rho`
+    """
+    out = np.empty(a.shape, dtype=np.result_type(a, np.float32))
+    out[0] = a[0] * np.sqrt(1 - rho ** 2)
+    out[1:] = a[1:] - rho * a[:-1]
+    return out
+
+
+class NativeGLMMapper(GLMMapper):
+    """GLMMapper implementation without 3rd-party dependencies
+
+    Instead of fitting a model for each feature individually, the design
+    matrix is pseudo-inverted once, and parameter estimates for all features
+    are obtained by matrix multiplication. Features are processed in blocks
+    to limit the memory demand for residuals.
+
+    With ``model='ar1'`` the data are prewhitened after an initial OLS fit,
+    using the lag-1 autocorrelation of the residuals of each feature,
+    rounded to two decimals (similar to NiPy's ``GeneralLinearModel``).
+    Features sharing the same coefficient are refitted together.
+
+    The mapped dataset contains the parameter estimates. If ``return_stats``
+    is enabled, t-statistics for all parameter estimates and the residual
+    variance are available as dataset attributes ``tstats`` and
+    ``resid_var`` (both datasets with the same features as the input).
+    There is no separate model instance, hence the ``model`` attribute
+    stored with ``return_model`` is always None.
+    """
+
+    model = Parameter('ols', constraints=EnsureChoice('ols', 'ar1'), doc="""\
+            Fitting algorithm: ordinary least squares or AR(1)
+            prewhitening followed by least squares.""")
+
+    block_size = Parameter(10000,
+                           constraints=EnsureInt() & EnsureRange(min=1),
+                           doc="""\
+            Number of features to fit at once.""")
+
+    return_stats = Parameter(False, constraints='bool', doc="""\
+            If True, t-statistics and the residual variance are stored
+            as ``tstats`` and ``resid_var`` dataset attributes of the
+            mapped dataset.""")
+
+    def __init__(self, regs, **kwargs):
+        """
+        Parameters
+        ----------
+        regs : list
+          Names of sample attributes to be extracted from an input dataset and
+          used as design matrix columns.
+        """
+        GLMMapper.__init__(self, regs, **kwargs)
+
+    @staticmethod
+    def _ols(X, Y):
+        """Return parameter estimates, residual variance and the diagonal of
+        the parameter covariance (for unit residual variance)"""
+        pinvX = np.linalg.pinv(X)
+        dof = len(X) - np.linalg.matrix_rank(X)
+        betas = np.dot(pinvX.astype(Y.dtype), Y)
+        resid = Y - np.dot(X.astype(Y.dtype), betas)
+        if dof > 0:
+            resid_var = np.einsum('ij,ij->j', resid, resid) / dof
+        else:
+            resid_var = np.zeros(Y.shape[1], dtype=Y.dtype)
+            resid_var[:] = np.nan
+        return betas, resid, resid_var, (pinvX ** 2).sum(axis=1)
+
+    def _fit_block(self, X, Y):
+        betas, resid, resid_var, cov_diag = self._ols(X, Y)
+        if not self.params.model == 'ar1':
+            return betas, resid_var, np.outer(cov_diag, np.ones(Y.shape[1]))
+        # lag-1 autocorrelation of the residuals of each feature
+        ss = np.einsum('ij,ij->j', resid, resid)
+        ss[ss == 0] = 1
+        rho = np.einsum('ij,ij->j', resid[1:], resid[:-1]) / ss
+        rho = np.clip(np.round(rho, 2), -.99, .99)
+        cov_diags = np.empty(betas.shape)
+        for r in np.unique(rho):
+            fmask = rho == r
+            if __debug__:
+                debug('MAP', "AR(1) refit of %i features with rho=%.2f"
+                      % (fmask.sum(), r))
+            betas[:, fmask], _, resid_var[fmask], cd = self._ols(
+                _ar1_whiten(X, r), _ar1_whiten(Y[:, fmask], r))
+            cov_diags[:, fmask] = cd[:, None]
+        return betas, resid_var, cov_diags
+
+    def _fit_model(self, ds, X, reg_names):
+        samples = ds.samples
+        Y_dtype = get_float_dtype(samples.dtype)
+        nfeatures = samples.shape[1]
+        bs = self.params.block_size
+        betas = np.empty((X.shape[1], nfeatures), dtype=Y_dtype)
+        resid_var = np.empty(nfeatures, dtype=Y_dtype)
+        tstats = np.empty(betas.shape, dtype=Y_dtype) \
+                    if self.params.return_stats else None
+        for start in xrange(0, nfeatures, bs):
+            block = slice(start, start + bs)
+            b, rv, cd = self._fit_block(
+                X, samples[:, block].astype(Y_dtype, copy=False))
+            betas[:, block] = b
+            resid_var[block] = rv
+            if tstats is not None:
+                se = np.sqrt(cd * rv)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    tstats[:, block] = b / se
+        space = self.get_space()
+        out = Dataset(betas, sa={space: reg_names})
+        if tstats is not None:
+            out.a['tstats'] = Dataset(tstats, sa={space: reg_names},
+                                      fa=ds.fa.copy(deep=False))
+            out.a['resid_var'] = Dataset(resid_var[None],
+                                         fa=ds.fa.copy(deep=False))
+        return None, out
@@ -12,14 +12,22 @@ __docformat__ = 'restructuredtext'
 
 import numpy as np
 
+from mvpa2.base import externals
 from mvpa2.base.dochelpers import enhanced_doc_string
 from mvpa2.mappers.base import Mapper, accepts_dataset_as_samples
 
+if externals.exists('scipy'):
+    import scipy.sparse as _sps
 
 if __debug__:
     from mvpa2.base import debug
 
 
+def _issparse(a):
+    """Whether `a` is a SciPy sparse matrix"""
+    return externals.exists('scipy') and _sps.issparse(a)
+
+
 class ProjectionMapper(Mapper):
     """Linear mapping between multidimensional spaces.
 
@@ -40,6 +48,11 @@ class ProjectionMapper(Mapper):
     Forward and back-projection matrices (a.k.a. *projection* and
     *reconstruction*) are available via the `proj` and `recon`
     properties.
+
+    Projection matrices can also be SciPy sparse matrices, which are never
+    converted into dense ones. As the pseudo-inverse of a sparse matrix is
+    dense in general, reverse mapping without an explicit reconstruction
+    matrix solves a sparse least-squares problem for each sample instead.
     """
 
     _DEV__doc__ = """Think about renaming `demean`, may be `translation`?"""
@@ -133,7 +146,10 @@ class ProjectionMapper(Mapper):
             d = d - self._offset_out
 
         # Do reverse projection
-        res = (d * self.recon).A
+        if self._recon is None and _issparse(self._proj):
+            res = self._lstsq_reverse(d.A)
+        else:
+            res = (d * self.recon).A
 
         # Add offset in input space
         if self._demean and self._offset_in is not None:
@@ -142,12 +158,34 @@ class ProjectionMapper(Mapper):
         return res
 
 
+    def _lstsq_reverse(self, data):
+        """Reverse project through a sparse projection matrix
+
+        Equivalent to a multiplication with the pseudo-inverse of the
+        projection matrix, i.e. yields the minimum-norm least-squares
+        solution for each sample.
+        """
+        from scipy.sparse.linalg import lsqr
+        projT = _sps.csr_matrix(self._proj.T)
+        res = np.empty((len(data), projT.shape[1]),
+                       dtype=np.result_type(data, projT.dtype, np.float32))
+        for i, d in enumerate(data):
+            res[i] = lsqr(projT, d, atol=1e-12, btol=1e-12)[0]
+        return res
+
+
     ##REF: Name was automagically refactored
     def _compute_recon(self):
         """Given that a projection is present -- compute reconstruction matrix.
         By default -- pseudoinverse of projection matrix.  Might be overridden
         in derived classes for efficiency.
         """
+        if _issparse(self._proj):
+            raise ValueError(
+                "Pseudo-inverse of sparse projection matrices is not computed, "
+                "since it is dense in general. Provide a reconstruction matrix "
+                "or use reverse(), which solves a least-squares problem for "
+                "every sample.")
         return np.linalg.pinv(self._proj)
 
 
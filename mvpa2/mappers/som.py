@@ -28,9 +28,19 @@ class SimpleSOMMapper(Mapper):
     This SOM implementation uses squared Euclidean distance to determine
     the best matching Kohonen unit and a Gaussian neighborhood influence
     kernel.
+
+    Two training algorithms are available. In 'online' mode the Kohonen layer
+    is updated after each training sample. In 'batch' mode the best matching
+    units of all samples are determined at once in each iteration, and each
+    unit weight vector is replaced by the average of all samples weighted by
+    their neighborhood influence on this unit. Batch training does not
+    depend on the order of the samples, and is much faster for large
+    datasets. As the influence weights are normalized, the learning rate
+    has no effect in batch mode.
     """
     def __init__(self, kshape, niter, learning_rate=0.005,
-                 iradius=None, distance_metric=None, initialization_func=None):
+                 iradius=None, distance_metric=None, initialization_func=None,
+                 mode='online'):
         """
         Parameters
         ----------
@@ -58,6 +68,9 @@ class SimpleSOMMapper(Mapper):
             argument with training samples and return an numpy array. If None,
             then values in the returned array are taken from a standard normal
             distribution.
+        mode : {'online', 'batch'}
+            Training algorithm: update the Kohonen layer after each sample
+            ('online'), or once per iteration using all samples ('batch').
         """
         # init base class
         Mapper.__init__(self)
@@ -80,6 +93,10 @@ class SimpleSOMMapper(Mapper):
         # number of training iterations
         self.niter = niter
 
+        if not mode in ('online', 'batch'):
+            raise ValueError("Unknown training mode '%s'." % mode)
+        self.mode = mode
+
         # precompute whatever can be done
         # scalar for decay of learning rate and radius across all iterations
         self.iter_scale = self.niter / np.log(self.radius)
@@ -143,6 +160,10 @@ class SimpleSOMMapper(Mapper):
         if dqd is None:
             raise ValueError("This should not happen - was _pretrain called?")
 
+        if self.mode == 'batch':
+            self._train_batch(samples, dqd)
+            return
+
         # units weight vector deltas for batch training
         # (height x width x #features)
         unit_deltas = np.zeros(self._K.shape, dtype='float')
@@ -151,22 +172,8 @@ class SimpleSOMMapper(Mapper):
         for it in xrange(1, self.niter + 1):
             # compute the neighborhood impact kernel for this iteration
             # has to be recomputed since kernel shrinks over time
-            k = self._compute_influence_kernel(it, dqd)
-
-            # form the influence kernel from unfolding the kernel (from the
-            # single quadrant that is precomputed), then cutting to the right shape
-            infl = np.vstack((
-                    np.hstack((
-                        # upper left
-                        k[self._dqdshape[0]:0:-1, self._dqdshape[1]:0:-1],
-                        # upper right
-                        k[self._dqdshape[0]:0:-1, :self._dqdshape[3]])),
-                    np.hstack((
-                        # lower left
-                        k[:self._dqdshape[2], self._dqdshape[1]:0:-1],
-                        # lower right
-                        k[:self._dqdshape[2], :self._dqdshape[3]]))
-                            ))
+            infl = self._unfold_influence_kernel(
+                        self._compute_influence_kernel(it, dqd))
 
             # for all training vectors
             for s in samples:
@@ -189,6 +196,82 @@ class SimpleSOMMapper(Mapper):
                       (it, self.niter, np.sqrt(np.sum(unit_deltas ** 2))))
 
 
+    _batch_block_elements = 2 ** 20
+    """Maximal number of elements of the influence matrix in batch training"""
+
+    def _train_batch(self, samples, dqd):
+        """Batch training: one Kohonen layer update per iteration"""
+        samples = np.asanyarray(samples)
+        nunits = np.prod(self.kshape)
+        nrows, ncols = self.kshape
+        # unit coordinates and the indices of the influence kernel elements
+        # that need to be combined for the neighborhood of each unit, i.e.
+        # the equivalent of rolling the kernel peak to any unit location
+        urows, ucols = np.divmod(np.arange(nunits), ncols)
+        krows = (np.arange(nrows) - self._dqdshape[2]
+                 - urows[:, None]) % nrows
+        kcols = (np.arange(ncols) - self._dqdshape[3]
+                 - ucols[:, None]) % ncols
+        K = self._K.reshape(nunits, -1)
+        # limit the size of the influence matrix computed at once
+        blocksize = max(1, self._batch_block_elements // nunits)
+        for it in xrange(1, self.niter + 1):
+            infl = self._unfold_influence_kernel(
+                        self._compute_influence_kernel(it, dqd))
+            bmus = self._get_bmus(samples)
+            # sum of samples per best matching unit (only units that are the
+            # best match of any sample), with the number of samples as last
+            # column to obtain the normalizing weights in the same product
+            hits = np.bincount(bmus, minlength=nunits)
+            hit = np.flatnonzero(hits)
+            order = np.argsort(bmus, kind='mergesort')
+            sums = np.empty((len(hit), K.shape[1] + 1),
+                            dtype=np.result_type(samples, float))
+            sums[:, :-1] = np.add.reduceat(samples[order],
+                                           np.cumsum(hits)[hit] - hits[hit])
+            sums[:, -1] = hits[hit]
+            # apply the neighborhood kernel, i.e. the influence of each
+            # best matching unit on all units, to the sums
+            updates = np.zeros((nunits, K.shape[1] + 1), dtype=sums.dtype)
+            for start in xrange(0, len(hit), blocksize):
+                block = hit[start:start + blocksize]
+                neighborhood = infl[krows[block][:, :, None],
+                                    kcols[block][:, None, :]
+                                   ].reshape(len(block), nunits)
+                updates += np.dot(neighborhood.T,
+                                  sums[start:start + blocksize])
+            weights = updates[:, -1]
+            updates = updates[:, :-1]
+            # units without any influencing sample remain as they are
+            active = weights > 0
+            updates[active] /= weights[active][:, None]
+            if __debug__:
+                debug("SOM", "Iteration %d/%d done: ||unit_deltas||=%g" %
+                      (it, self.niter,
+                       np.sqrt(np.sum((updates[active] - K[active]) ** 2))))
+            K[active] = updates[active]
+        self._K = K.reshape(self._K.shape)
+
+
+    def _unfold_influence_kernel(self, k):
+        """Form the influence kernel for the full Kohonen layer
+
+        The kernel is unfolded from the single quadrant that is precomputed,
+        and then cut to the right shape.
+        """
+        return np.vstack((
+                    np.hstack((
+                        # upper left
+                        k[self._dqdshape[0]:0:-1, self._dqdshape[1]:0:-1],
+                        # upper right
+                        k[self._dqdshape[0]:0:-1, :self._dqdshape[3]])),
+                    np.hstack((
+                        # lower left
+                        k[:self._dqdshape[2], self._dqdshape[1]:0:-1],
+                        # lower right
+                        k[:self._dqdshape[2], :self._dqdshape[3]]))
+                            ))
+
 
     ##REF: Name was automagically refactored
     def _compute_influence_kernel(self, iter, dqd):
@@ -241,13 +324,26 @@ class SimpleSOMMapper(Mapper):
         return (np.divide(loc, self.kshape[1]).astype('int'), loc % self.kshape[1])
 
 
+    def _get_bmus(self, samples):
+        """Returns the flat indices of the best matching units of all samples.
+
+        The squared Euclidean distances of all samples to all units are
+        computed at once (up to the constant norm of each sample) by a single
+        matrix product.
+        """
+        K = self.K.reshape(-1, self.K.shape[-1])
+        dist = np.dot(np.asanyarray(samples), -2 * K.T)
+        dist += (K ** 2).sum(axis=1)
+        return np.argmin(dist, axis=1)
+
+
     def _forward_data(self, data):
         """Map data from the IN dataspace into OUT space.
 
         Mapping is performs by simple determining the best matching Kohonen
         unit for each data sample.
         """
-        return np.array([self._get_bmu(d) for d in data])
+        return np.array(np.divmod(self._get_bmus(data), self.kshape[1])).T
 
 
     def _reverse_data(self, data):
@@ -266,6 +362,8 @@ class SimpleSOMMapper(Mapper):
         s += 'kshape=%s, niter=%i, learning_rate=%f, iradius=%f)' \
                 % (str(tuple(self.kshape)), self.niter, self.lrate,
                    self.radius)
+        if self.mode != 'online':
+            s = s[:-1] + ", mode=%r)" % self.mode
         return s
 
 
@@ -12,7 +12,7 @@ __docformat__ = 'restructuredtext'
 
 import numpy as np
 from mvpa2.base.dochelpers import borrowdoc
-from mvpa2.mappers.projection import ProjectionMapper
+from mvpa2.mappers.projection import ProjectionMapper, _issparse
 
 if __debug__:
     from mvpa2.base import debug
@@ -21,6 +21,9 @@ if __debug__:
 class StaticProjectionMapper(ProjectionMapper):
     """Mapper to project data onto arbitrary space using transformation given as input.
        Both forward and reverse projections can be provided.
+
+       Projection matrices can be dense arrays or SciPy sparse matrices
+       (see :class:`~mvpa2.mappers.projection.ProjectionMapper`).
     """
 
     def __init__(self, proj, recon=None, **kwargs):
@@ -28,12 +31,13 @@ class StaticProjectionMapper(ProjectionMapper):
 
         Parameters
         ----------
-        proj : 2-D array
+        proj : 2-D array or sparse matrix
           Projection matrix to be used for forward projection.
-        recon: 2-D array
+        recon: 2-D array or sparse matrix
           Projection matrix to be used for reverse projection.
           If this is not given, `numpy.linalg.pinv` of proj
-          will be used by default.
+          will be used by default (or a least-squares solution
+          for sparse projections).
         **kwargs:
           All keyword arguments are passed to the ProjectionMapper
           constructor.
@@ -45,9 +49,75 @@ class StaticProjectionMapper(ProjectionMapper):
     def _train(self, dummyds):
         """Do Nothing
         """
-        if __debug__:
+        if __debug__ and "MAP_" in debug.active:
+            if _issparse(self._proj):
+                norm = np.sqrt(abs(self._proj.multiply(self._proj)).sum())
+            else:
+                norm = np.linalg.norm(self._proj)
             debug("MAP_", "Mixing matrix has %s shape and norm=%f" %
-                  (self._proj.shape, np.linalg.norm(self._proj)))
+                  (self._proj.shape, norm))
+
+
+def _dot(a, b):
+    """Matrix product that keeps sparse matrices sparse"""
+    if _issparse(a) or _issparse(b):
+        return a * b
+    return np.dot(a, b)
+
 
+def chain_projections(mappers):
+    """Combine consecutive projections into a single StaticProjectionMapper
+
+    Projection matrices (and reconstruction matrices, if all mappers have
+    one) are multiplied, hence a chain of sparse projections yields a sparse
+    projection again, and mapping data through the chain requires only a
+    single matrix product.
+
+    Parameters
+    ----------
+    mappers : sequence of ProjectionMapper
+      Mappers in the order of forward mapping. Either all or none of them
+      must be trained. Trained mappers may only have offsets in the input
+      space of the first, and the output space of the last mapper (offsets
+      of intermediate spaces must be zero, e.g. if a mapper was trained on
+      demeaned data).
+
+    Returns
+    -------
+    StaticProjectionMapper
+    """
+    if not len(mappers):
+        raise ValueError("Need at least one mapper to chain.")
+    if any([m.proj is None for m in mappers]):
+        raise ValueError("All mappers need to have a projection matrix.")
+    proj = reduce(_dot, [m.proj for m in mappers])
+    recons = [m._recon for m in mappers]
+    if any([r is None for r in recons]):
+        recon = None
+    else:
+        recon = reduce(_dot, recons[::-1])
 
+    trained = [m.is_trained for m in mappers]
+    if not any(trained):
+        # demeaning in any space is equivalent to demeaning the input, since
+        # the projections are linear
+        return StaticProjectionMapper(
+            proj, recon=recon, demean=any([m._demean for m in mappers]))
+    if not all(trained):
+        raise ValueError("Either all or none of the mappers must be trained.")
 
+    offsets_in = [m._offset_in if m._demean else None for m in mappers]
+    offsets_out = [m._offset_out if m._demean else None for m in mappers]
+    for offset in offsets_in[1:] + offsets_out[:-1]:
+        if offset is not None and not np.allclose(offset, 0):
+            raise ValueError("Cannot chain projections with offsets in "
+                             "intermediate spaces.")
+    offset_in, offset_out = offsets_in[0], offsets_out[-1]
+    cm = StaticProjectionMapper(
+        proj, recon=recon,
+        demean=not (offset_in is None and offset_out is None),
+        auto_train=False)
+    cm._offset_in = offset_in
+    cm._offset_out = offset_out
+    cm._set_trained()
+    return cm
@@ -13,6 +13,7 @@ __docformat__ = 'restructuredtext'
 import numpy as np
 
 from mvpa2.base import warning
+from mvpa2.base.types import get_float_dtype
 from mvpa2.base.dochelpers import _str, borrowkwargs, _repr_attrs
 from mvpa2.mappers.base import accepts_dataset_as_samples, Mapper
 from mvpa2.datasets.base import Dataset
@@ -34,8 +35,15 @@ class ZScoreMapper(Mapper):
     per-chunk definitions), or to select a specific subset of samples from
     which these parameters should be estimated.
 
-    If necessary, data is upcasted into a configurable datatype to prevent
-    information loss.
+    If necessary, integer data is upcasted into a configurable datatype to
+    prevent information loss.  Floating point data keeps its dtype, i.e.
+    float32 samples are Z-scored in float32.
+
+    Statistics for all chunks are estimated at once, and Z-scoring is applied
+    to contiguous chunks in-place on views of the samples array. Optionally,
+    samples can be processed in blocks of a fixed number of samples (see
+    ``block_size``), which together with ``inplace`` allows for Z-scoring
+    memory-mapped samples without loading them into memory at once.
 
     Notes
     -----
@@ -49,7 +57,7 @@ class ZScoreMapper(Mapper):
     Reverse-mapping is currently not implemented.
     """
     def __init__(self, params=None, param_est=None, chunks_attr='chunks',
-                 dtype='float64', **kwargs):
+                 dtype=None, inplace=False, block_size=None, **kwargs):
         """
         Parameters
         ----------
@@ -72,7 +80,17 @@ class ZScoreMapper(Mapper):
           samples, and to perform individual Z-scoring within them.
         dtype : Numpy dtype, optional
           Target dtype that is used for upcasting, in case integer data is to be
-          Z-scored.
+          Z-scored.  If None, the globally configured one (float64 by default,
+          see ``float dtype`` option in the ``datasets`` section of the
+          configuration) is used.
+        inplace : bool
+          If True, the samples of a forward-mapped dataset (or array) are
+          Z-scored in-place, instead of operating on a copy. Integer samples
+          of datasets are still converted into a floating point copy.
+        block_size : int or None
+          If not None, parameter estimation and Z-scoring operate on blocks of
+          at most this many samples at a time. Temporary memory demands are
+          then limited by the block size, rather than the dataset size.
         """
         Mapper.__init__(self, **kwargs)
 
@@ -81,9 +99,10 @@ class ZScoreMapper(Mapper):
         self.__param_est = param_est
         self.__params_dict = None
         self.__dtype = dtype
+        self.__block_size = block_size
 
-        # secret switch to perform in-place z-scoring
-        self._secret_inplace_zscore = False
+        # switch to perform in-place z-scoring
+        self._secret_inplace_zscore = inplace
 
 
     def __repr__(self, prefixes=None):
@@ -92,7 +111,8 @@ class ZScoreMapper(Mapper):
         return super(ZScoreMapper, self).__repr__(
             prefixes=prefixes
             + _repr_attrs(self, ['params', 'param_est', 'chunks_attr'])
-            + _repr_attrs(self, ['dtype'], default='float64'))
+            + _repr_attrs(self, ['dtype', 'block_size'], default=None)
+            + _repr_attrs(self, ['inplace'], default=False))
 
 
     def __str__(self):
@@ -123,29 +143,43 @@ class ZScoreMapper(Mapper):
             else:
                 est_ids = slice(None)
 
+            if isinstance(est_ids, set):
+                est_mask = np.zeros(len(ds), dtype=bool)
+                est_mask[list(est_ids)] = True
+            else:
+                est_mask = None
+
             # now we can either do it one for all, or per chunk
             if chunks_attr is not None:
                 # per chunk estimate
-                params = {}
-                for c in ds.sa[chunks_attr].unique:
-                    slicer = np.where(ds.sa[chunks_attr].value == c)[0]
-                    if not isinstance(est_ids, slice):
-                        slicer = list(est_ids.intersection(set(slicer)))
-                    params[c] = self._compute_params(ds.samples[slicer])
+                chunks = ds.sa[chunks_attr]
+                uchunks = chunks.unique
+                means, stds = self._compute_params(
+                    ds.samples, chunks.codes, len(uchunks), est_mask)
+                params = dict([(c, (means[i], stds[i]))
+                               for i, c in enumerate(uchunks)])
             else:
                 # global estimate
-                if isinstance(est_ids, set):
-                    est_ids = list(est_ids)
-                params = {'__all__': self._compute_params(ds.samples[est_ids])}
-
+                means, stds = self._compute_params(
+                    ds.samples, np.zeros(len(ds), dtype=int), 1, est_mask)
+                params = {'__all__': (means[0], stds[0])}
 
         self.__params_dict = params
 
 
     def _forward_dataset(self, ds):
+        return self._forward_dataset_helper(ds, self._secret_inplace_zscore)
+
+
+    def _forward_dataset_inplace(self, ds):
+        if not np.issubdtype(ds.samples.dtype, np.floating):
+            return NotImplemented
+        return self._forward_dataset_helper(ds.copy(deep=False), True)
+
+
+    def _forward_dataset_helper(self, ds, inplace):
         # local binding
         chunks_attr = self.__chunks_attr
-        dtype = self.__dtype
 
         if __debug__ and chunks_attr is not None:
             nsamples_per_chunk = get_nsamples_per_attr(ds, chunks_attr)
@@ -168,33 +202,39 @@ class ZScoreMapper(Mapper):
             raise RuntimeError, \
                   "ZScoreMapper needs to be trained before call to forward"
 
-        if self._secret_inplace_zscore:
+        if inplace:
             mds = ds
         else:
             # shallow copy to put the new stuff in
             mds = ds.copy(deep=False)
-            # but deepcopy the samples since _zscore would modify inplace
-            mds.samples = mds.samples.copy()
 
+        samples = mds.samples
         # cast the data to float, since in-place operations below do not upcast!
-        if np.issubdtype(mds.samples.dtype, np.integer):
-            mds.samples = mds.samples.astype(dtype)
+        if np.issubdtype(samples.dtype, np.integer):
+            samples = samples.astype(self._get_dtype(samples))
+        elif not inplace or not isinstance(samples, np.ndarray):
+            # deepcopy the samples since _zscore would modify inplace
+            # (out-of-core samples are read into memory)
+            samples = samples.copy()
 
         if '__all__' in params:
             # we have a global parameter set
-            mds.samples = self._zscore(mds.samples, *params['__all__'])
+            self._zscore_rows(samples, slice(0, samples.shape[0]),
+                              *params['__all__'])
         else:
             # per chunk z-scoring
-            for c in mds.sa[chunks_attr].unique:
+            chunks = mds.sa[chunks_attr]
+            uchunks = chunks.unique
+            for c in uchunks:
                 if not c in params:
                     raise RuntimeError(
                         "%s has no parameters for chunk '%s'. It probably "
                         "wasn't present in the training dataset!?"
                         % (self.__class__.__name__, c))
-                slicer = np.where(mds.sa[chunks_attr].value == c)[0]
-                mds.samples[slicer] = self._zscore(mds.samples[slicer],
-                                                   *params[c])
+            for i, rows in _iter_groups(chunks.group_indices):
+                self._zscore_rows(samples, rows, *params[uchunks[i]])
 
+        mds.samples = samples
         return mds
 
 
@@ -220,7 +260,7 @@ class ZScoreMapper(Mapper):
                 raise TypeError(
                     "Cannot perform inplace z-scoring since data is of integer "
                     "type. Please convert to float before calling zscore")
-            mdata = data.astype(self.__dtype)
+            mdata = data.astype(self._get_dtype(data))
         elif self._secret_inplace_zscore:
             mdata = data
         else:
@@ -231,8 +271,91 @@ class ZScoreMapper(Mapper):
         return mdata
 
 
-    def _compute_params(self, samples):
-        return (np.mean(samples, axis=0), np.std(samples, axis=0))
+    def _get_dtype(self, samples):
+        if self.__dtype is None:
+            return get_float_dtype(samples.dtype)
+        return self.__dtype
+
+
+    def _compute_params(self, samples, groups, ngroups, mask=None):
+        """Estimate mean and standard deviation for groups of samples
+
+        Samples of each block are sorted by group (if necessary) to compute
+        statistics on contiguous views, which are accumulated across blocks
+        using the pairwise update formula of Chan et al. (1979).
+
+        Parameters
+        ----------
+        samples : array
+        groups : array
+          Group index (0..ngroups-1) for each sample.
+        ngroups : int
+        mask : boolean array or None
+          Selection of samples to consider.
+
+        Returns
+        -------
+        tuple
+          (mean, std) arrays (ngroups x nfeatures). Groups without any
+          selected sample have NaN parameters.
+        """
+        nfeatures = samples.shape[1]
+        # group statistics are computed in the floating point dtype of the
+        # samples, but accumulated in float64
+        dtype = samples.dtype \
+                if np.issubdtype(samples.dtype, np.inexact) else np.float64
+        counts = np.zeros(ngroups, dtype=int)
+        means = np.zeros((ngroups, nfeatures))
+        m2 = np.zeros((ngroups, nfeatures))
+        nsamples = samples.shape[0]
+        block_size = self.__block_size or max(nsamples, 1)
+        for start in xrange(0, nsamples, block_size):
+            block = slice(start, start + block_size)
+            bgroups = groups[block]
+            bsamples = np.asanyarray(samples[block])
+            if mask is not None:
+                bmask = mask[block]
+                bgroups = bgroups[bmask]
+                bsamples = bsamples[bmask]
+            if not len(bgroups):
+                continue
+            if np.any(bgroups[1:] < bgroups[:-1]):
+                # sort samples by group to get contiguous groups
+                order = np.argsort(bgroups, kind='mergesort')
+                bgroups = bgroups[order]
+                bsamples = bsamples[order]
+            bounds = np.r_[0, np.flatnonzero(np.diff(bgroups)) + 1,
+                           len(bgroups)]
+            for gstart, gstop in zip(bounds[:-1], bounds[1:]):
+                g = bgroups[gstart]
+                gsamples = bsamples[gstart:gstop]
+                n = gstop - gstart
+                gmean = gsamples.mean(axis=0, dtype=dtype)
+                dev = gsamples - gmean
+                gm2 = np.einsum('ij,ij->j', dev, dev)
+                # merge with the statistics of previous blocks
+                nprev = counts[g]
+                ntotal = float(nprev + n)
+                delta = gmean - means[g]
+                means[g] += delta * (n / ntotal)
+                m2[g] += gm2 + delta ** 2 * (nprev * n / ntotal)
+                counts[g] += n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[counts == 0] = np.nan
+            stds = np.sqrt(m2 / counts[:, None])
+        return means.astype(dtype), stds.astype(dtype)
+
+
+    def _zscore_rows(self, samples, rows, mean, std):
+        """Z-score selected rows of samples in-place, block-wise"""
+        if not isinstance(rows, slice):
+            # fancy indexing yields a copy
+            samples[rows] = self._zscore(samples[rows], mean, std)
+            return
+        block_size = self.__block_size or max(rows.stop - rows.start, 1)
+        for start in xrange(rows.start, rows.stop, block_size):
+            self._zscore(samples[start:min(start + block_size, rows.stop)],
+                         mean, std)
 
 
     def _zscore(self, samples, mean, std):
@@ -255,15 +378,33 @@ class ZScoreMapper(Mapper):
             if samples.shape[1] != len(std):
                 raise RuntimeError("std should be a per-feature vector.")
             else:
-                # check for invariant features
-                std_nz = std != 0
-                samples[:, std_nz] /= np.asanyarray(std)[std_nz]
+                # leave invariant features as they are
+                if np.any(std == 0):
+                    std = np.where(std != 0, std, 1)
+                samples /= std
         return samples
 
     params = property(fget=lambda self:self.__params)
     param_est = property(fget=lambda self:self.__param_est)
     chunks_attr = property(fget=lambda self:self.__chunks_attr)
     dtype = property(fget=lambda self:self.__dtype)
+    inplace = property(fget=lambda self:self._secret_inplace_zscore)
+    block_size = property(fget=lambda self:self.__block_size)
+
+
+def _iter_groups(group_indices):
+    """Yield (group index, rows) for all non-empty groups of samples
+
+    Rows are given as a slice for groups of contiguous samples, and as an
+    index array otherwise.
+    """
+    for i, rows in enumerate(group_indices):
+        if not len(rows):
+            continue
+        if rows[-1] - rows[0] + 1 == len(rows):
+            yield i, slice(rows[0], rows[-1] + 1)
+        else:
+            yield i, rows
 
 
 @borrowkwargs(ZScoreMapper, '__init__')
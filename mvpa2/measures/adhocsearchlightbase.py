@@ -19,6 +19,7 @@ from mvpa2.misc.errorfx import mean_mismatch_error
 from mvpa2.measures.searchlight import BaseSearchlight
 from mvpa2.base import externals, warning
 from mvpa2.base.dochelpers import borrowkwargs, _repr_attrs
+from mvpa2.base.types import get_float_dtype
 from mvpa2.generators.splitters import Splitter
 
 #from mvpa2.base.param import Parameter
@@ -222,6 +223,8 @@ class SimpleStatBaseSearchlight(BaseSearchlight):
         pb = self.__pb = _STATS()
 
         # sums and sums of squares per each block
+        # (always accumulated in float64, even for float32 data, since
+        # variances get computed from them)
         pb.sums = np.zeros(shape)
         # sums of squares
         pb.sums2 = np.zeros(shape)
@@ -233,7 +236,7 @@ class SimpleStatBaseSearchlight(BaseSearchlight):
             # might result in overflow e.g. while taking .square which
             # would result in negative variances etc, thus to be on a
             # safe side -- convert to float
-            X = X.astype(float)
+            X = X.astype(get_float_dtype(X.dtype))
 
         X2 = np.square(X)
         # silly way for now
@@ -320,9 +323,8 @@ class SimpleStatBaseSearchlight(BaseSearchlight):
         labels = targets_sa.value
         ulabels = targets_sa.unique
         nlabels = len(ulabels)
-        label2index = dict((l, il) for il, l in enumerate(ulabels))
-        labels_numeric = np.array([label2index[l] for l in labels])
-        self._ulabels_numeric = [label2index[l] for l in ulabels]
+        labels_numeric = targets_sa.codes
+        self._ulabels_numeric = range(nlabels)
         # set the feature dimensions
         nsamples = len(X)
         nrois = len(roi_ids)
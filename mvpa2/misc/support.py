@@ -778,9 +778,13 @@ def get_limit_filter(limit, collection):
         # individually
         lattr = collection[limit]
         lattr_data = lattr.value
-        limit_filter = np.zeros(attr_length, dtype='int')
-        for i, uv in enumerate(lattr.unique):
-            limit_filter[lattr_data == uv] = i
+        if lattr_data.ndim == 1:
+            # codes of the unique values are cached with the attribute
+            limit_filter = np.array(lattr.codes, dtype='int')
+        else:
+            limit_filter = np.zeros(attr_length, dtype='int')
+            for i, uv in enumerate(lattr.unique):
+                limit_filter[lattr_data == uv] = i
     elif isinstance(limit, list):
         limit = list(set(limit))  # so if someone insane specified the same attr twice
         limit_filter = np.zeros(attr_length, dtype='int')
@@ -826,6 +830,11 @@ def get_nelements_per_value(data):
         # values
         uniquevalues = data.unique
         values = data.value
+        if np.ndim(values) == 1:
+            # and the pre-cached codes of the unique values
+            return dict(zip(uniquevalues,
+                            np.bincount(data.codes,
+                                        minlength=len(uniquevalues)).tolist()))
     else:
         uniquevalues = np.unique(data)
         values = data
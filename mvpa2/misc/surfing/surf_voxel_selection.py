@@ -110,6 +110,88 @@ class VoxelSelector(object):
         self._surf = distance_surf                     # } save input
         self._n2v = n2v                       # }
         self._outside_node_margin = outside_node_margin
+        self._n2v_arrays = None # n2v in CSR layout, computed when needed
+        self._visit_order = None
+        self._visit_positions = None
+        self._distance_block = None
+
+    def set_visit_order(self, srcs):
+        '''
+        Announce the order in which center nodes will be visited
+
+        Parameters
+        ----------
+        srcs: list of int
+            Indices of center nodes, in the order in which they are going
+            to be passed to disc_voxel_attributes.
+
+        Notes
+        -----
+        With the Dijkstra distance metric (and scipy available) this allows
+        distances for blocks of upcoming center nodes to be computed at
+        once, using surf.Surface.dijkstra_distance_matrix.
+        '''
+        positions = dict()
+        for i, src in enumerate(srcs):
+            positions.setdefault(src, i)
+        self._visit_order = list(srcs)
+        self._visit_positions = positions
+        self._distance_block = None
+
+    def _get_n2v_arrays(self):
+        if self._n2v_arrays is None:
+            self._n2v_arrays = _node2voxels_arrays(self._n2v)
+        return self._n2v_arrays
+
+    def _center_distances(self, src, radius_mm):
+        '''
+        Nodes (and their distances) within radius_mm of a center node
+
+        Returns
+        -------
+        nodes, distances: tuple of np.ndarray
+            Indices of nodes around the center node, and their distance
+            to the center node.
+        '''
+        if radius_mm == 0:
+            # only the node itself.
+            # this should work except for very strange surfaces where
+            # multiple nodes occupy exactly the same spatial location
+            if isinstance(src, tuple):
+                # coordinates rather than a node
+                return np.zeros(0, dtype=np.int), np.zeros(0)
+            return np.asarray([src]), np.zeros(1)
+
+        metric = self._distance_metric.lower()[0]
+        if metric == 'e':
+            return self._surf.euclidean_neighborhood(src, radius_mm)
+
+        if metric == 'd' and radius_mm == self._initradius_mm \
+                and self._visit_positions is not None \
+                and surf._has_csgraph_dijkstra():
+            # only the initial radius is used for most center nodes, hence
+            # only that one is worth computing for blocks of center nodes
+            block = self._distance_block
+            if block is None or not src in block[0]:
+                pos = self._visit_positions.get(src)
+                if pos is not None:
+                    srcs = self._visit_order[
+                            pos:pos + self._surf._dijkstra_block_size()]
+                    block = self._distance_block = \
+                            (dict((s, i) for i, s in enumerate(srcs)),
+                             self._surf.dijkstra_distance_matrix(radius_mm,
+                                                                 srcs))
+            if block is not None and src in block[0]:
+                i = block[0][src]
+                n2d = block[1]
+                start, stop = n2d.indptr[i], n2d.indptr[i + 1]
+                return n2d.indices[start:stop], n2d.data[start:stop]
+
+        n2d = self._surf.circlearound_n2d(src, radius_mm,
+                                          self._distance_metric)
+        return (np.fromiter(n2d.iterkeys(), dtype=np.int, count=len(n2d)),
+                np.fromiter(n2d.itervalues(), dtype=np.float,
+                            count=len(n2d)))
 
     def _select_approx(self, voxprops, count=None):
         '''
@@ -262,31 +344,23 @@ class VoxelSelector(object):
 
         radius_mm = optimizer.get_start()
         radius = self._targetradius
+        n2v_arrays = self._get_n2v_arrays()
 
         maxiter = 100
         for counter in xrange(maxiter):
-            if radius_mm == 0:
-                # only the node itself.
-                # this should work except for very strange surfaces where
-                # multiple nodes occupy exactly the same spatial location
-                around_n2d = {src:0.}
-            else:
-                around_n2d = dist_surf.circlearound_n2d(src, radius_mm,
-                                               self._distance_metric)
-
-            allvxdist = self.nodes2voxel_attributes(around_n2d, n2v)
-
-            if not allvxdist:
-                voxel_attributes = []
+            nodes, distances = self._center_distances(src, radius_mm)
+            voxels = _min_distance_voxels(
+                            *_gather_node_voxels(n2v_arrays, nodes, distances))
 
             if self._fixedradius:
                 # select all voxels
-                voxel_attributes = self._select_approx(allvxdist, count=None)
+                selection = slice(None)
             else:
                 # select only certain number
-                voxel_attributes = self._select_approx(allvxdist, count=radius)
+                selection = _select_nearest(voxels[1].astype(np.float32),
+                                            radius)
 
-            if voxel_attributes is None:
+            if selection is None:
                 # coult not find enough voxels, stay in loop and try again
                 # with bigger radius
                 radius_mm = optimizer.get_next()
@@ -297,6 +371,9 @@ class VoxelSelector(object):
             raise ValueError("Failure to increase radius to get %d voxels for "
                              " node #%d" % (radius, src))
 
+        voxel_attributes = _sorted_voxel_attributes(
+                                    *[v[selection] for v in voxels])
+
         if voxel_attributes and len(voxel_attributes[CENTER_DISTANCES]):
             # found at least one voxel; update our optimizer
             maxradius = voxel_attributes[CENTER_DISTANCES][-1]
@@ -349,6 +426,29 @@ class VoxelSelector(object):
             center node along the cortex)  and 'gmpositions' (relative position in
             the gray matter)
 
+        Notes
+        -----
+        Voxels are sorted by distance, and by voxel index for voxels at the
+        same distance. For a distancesummary other than min, the slower
+        nodes2voxel_attributes_slow is used.
+        '''
+        if distancesummary is not min:
+            return self.nodes2voxel_attributes_slow(n2d, n2v, distancesummary)
+
+        n2v_arrays = self._get_n2v_arrays() if n2v is self._n2v \
+                                    else _node2voxels_arrays(n2v)
+        nodes = np.fromiter(n2d.iterkeys(), dtype=np.int, count=len(n2d))
+        distances = np.fromiter(n2d.itervalues(), dtype=np.float,
+                                count=len(n2d))
+        return _sorted_voxel_attributes(*_min_distance_voxels(
+                            *_gather_node_voxels(n2v_arrays, nodes, distances)))
+
+    def nodes2voxel_attributes_slow(self, n2d, n2v, distancesummary=min):
+        '''
+        Computes voxel distances (dictionary-based implementation)
+
+        See nodes2voxel_attributes for a description of the parameters and
+        output.
         '''
 
         # mapping from voxel indices to all distances
@@ -390,6 +490,106 @@ class VoxelSelector(object):
 
         return voxel_attributes
 
+def _node2voxels_arrays(n2v):
+    '''
+    Converts a mapping from nodes to voxels into arrays in CSR layout
+
+    Returns
+    -------
+    indptr, voxel_indices, positions: tuple of np.ndarray
+        The voxels associated with node i have linear indices
+        voxel_indices[indptr[i]:indptr[i+1]], and grey matter positions
+        positions[indptr[i]:indptr[i+1]].
+    '''
+    nnodes = max(n2v) + 1 if n2v else 0
+    counts = np.zeros(nnodes, dtype=np.int)
+    voxel_indices = []
+    positions = []
+    for nd in sorted(n2v):
+        vps = n2v[nd]
+        if vps:
+            counts[nd] = len(vps)
+            voxel_indices.extend(vps.iterkeys())
+            positions.extend(vps.itervalues())
+
+    indptr = np.hstack(([0], np.cumsum(counts)))
+    return (indptr, np.asarray(voxel_indices, dtype=np.int),
+            np.asarray(positions, dtype=np.float))
+
+def _gather_node_voxels(n2v_arrays, nodes, distances):
+    '''
+    Voxels associated with nodes, with the distance of their node
+
+    Returns
+    -------
+    voxel_indices, distances, positions: tuple of np.ndarray
+        One element for each pair of a node and an associated voxel.
+    '''
+    indptr, voxel_indices, positions = n2v_arrays
+    inside = nodes < len(indptr) - 1
+    nodes, distances = nodes[inside], distances[inside]
+
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    offsets = np.cumsum(counts) - counts
+    idxs = np.arange(np.sum(counts)) + np.repeat(starts - offsets, counts)
+    return voxel_indices[idxs], np.repeat(distances, counts), positions[idxs]
+
+def _min_distance_voxels(voxel_indices, distances, positions):
+    '''
+    Minimum distance (and corresponding position) for each unique voxel
+
+    For a voxel associated with multiple nodes, the pair of distance and
+    grey matter position is the minimum across all pairs (as for
+    min(set([(d0,p0),(d1,p1),...])). Voxels are returned sorted by index.
+    '''
+    order = np.lexsort((positions, distances, voxel_indices))
+    sorted_indices = voxel_indices[order]
+    first = np.ones(len(order), dtype=np.bool_)
+    first[1:] = sorted_indices[1:] != sorted_indices[:-1]
+    order = order[first]
+    return sorted_indices[first], distances[order], positions[order]
+
+def _select_nearest(distances, count):
+    '''
+    Select approximately a certain number of voxels nearest to the center
+
+    Voxels are selected in chunks of equal distance, exactly as in
+    VoxelSelector._select_approx, but without sorting all distances.
+
+    Returns
+    -------
+    selection: np.ndarray (boolean) or None
+        Mask of the selected voxels, or None if there are fewer than count
+        voxels.
+    '''
+    n = len(distances)
+    if n < count or n == 0:
+        return None
+
+    # the chunk of voxels with the same distance as the count-th voxel
+    threshold = np.partition(distances, max(count - 1, 0))[max(count - 1, 0)]
+    below = distances < threshold
+    upto = distances <= threshold
+    firstpos = np.sum(below)
+    lastpos = np.sum(upto) - 1
+    chunkcount = len(np.unique(distances[upto]))
+
+    # difference in distance between desired count and positions
+    delta = (count - firstpos) - (lastpos - count)
+    if delta > 0 or (delta == 0 and chunkcount % 2 != 0):
+        # lastpos is closer to count (or a tie, chosen quasi-randomly
+        # based on chunkcount)
+        return upto
+    return below
+
+def _sorted_voxel_attributes(voxel_indices, distances, positions):
+    '''Voxel attributes as returned by nodes2voxel_attributes'''
+    order = np.argsort(distances, kind='mergesort')
+    return {LINEAR_VOXEL_INDICES: voxel_indices[order].astype(np.int32),
+            CENTER_DISTANCES: distances[order].astype(np.float32),
+            GREY_MATTER_POSITION: positions[order].astype(np.float32)}
+
 def voxel_selection(vol_surf_mapping, radius, source_surf=None, source_surf_nodes=None,
                     distance_metric='dijkstra',
                     eta_step=10, nproc=None,
@@ -515,6 +715,9 @@ def voxel_selection(vol_surf_mapping, radius, source_surf=None, source_surf_node
     srcs_order = [source_surf_nodes[node] for node in visitorder]
     src_trg_nodes = [(src, src2intermediate[src]) for src in srcs_order]
 
+    if distance_metric[0].lower() == 'd':
+        voxel_selector.set_visit_order([trg for _, trg in src_trg_nodes])
+
     if nproc is not None and nproc > 1 and not externals.exists('pprocess'):
         raise RuntimeError("The 'pprocess' module is required for "
                            "multiprocess searchlights. Please either "
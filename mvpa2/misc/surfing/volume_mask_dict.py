@@ -22,6 +22,9 @@ and __getstate__ - have to flag somehow whether this mapping was present.
 __docformat__ = 'restructuredtext'
 
 from collections import Mapping
+import cPickle
+import struct
+import zipfile
 
 import numpy as np
 
@@ -712,7 +715,7 @@ class VolumeMaskDictionary(Mapping):
             True iff the other instance has the same volume geometry
             and source as the current instance
         '''
-        if not isinstance(other, self.__class__):
+        if not isinstance(other, VolumeMaskDictionary):
             return False
 
         return self.volgeom == other.volgeom and self.source == other.source
@@ -921,6 +924,469 @@ class VolumeMaskDictionary(Mapping):
         return trgs[i / src_xyz.shape[0]]
 
 
+class CSRVolumeMaskDictionary(VolumeMaskDictionary):
+    """VolumeMaskDictionary that stores all masks in flat arrays.
+
+    Rather than a dictionary with an array for each mask, the linear voxel
+    indices of all masks are stored in a single array, with the masks
+    delimited by an array of offsets (``indptr``), as in the compressed
+    sparse row (CSR) format of scipy.sparse. Auxiliary properties are
+    stored in the same way. This avoids the Python overhead of per-mask
+    objects, so that instances for full-cortex voxel selection remain
+    small and can be stored with h5save without any conversion. Instances
+    can also be stored with save_npz and loaded memory-mapped with
+    load_npz.
+
+    Masks are added as for VolumeMaskDictionary; they are incorporated
+    in the flat arrays upon the next access. Keys have to be of the same
+    type (either all int or all str), and either all masks or none have
+    auxiliary properties.
+
+    The inverse mapping from voxels to masks (see target2sources) is
+    derived from the flat arrays when needed, by sorting all voxel
+    indices once.
+    """
+    def __init__(self, vg, source, meta=None, src2nbr=None, src2aux=None):
+        """Initialize a CSRVolumeMaskDictionary
+
+        Parameters
+        ----------
+        vg: volgeom.VolGeom or fmri_dataset-like or str
+            data structure that contains volume geometry information.
+        source: Surface.surf or numpy.ndarray or None
+            structure that contains the geometric information of
+            (the centers of) each mask.
+        meta: dict or None
+            Optional meta data stored with this instance.
+        src2nbr: dict or None
+            Mapping from mask keys to lists of voxel indices, which are
+            added to this instance.
+        src2aux: dict or None
+            Mapping from labels to dicts with auxiliary information for
+            each key in src2nbr.
+        """
+        self._volgeom = volgeom.from_any(vg)
+        self._source = source
+        self._meta = meta
+
+        self._set_arrays(np.zeros((0,), dtype=np.int),
+                         np.zeros((1,), dtype=np.int),
+                         np.zeros((0,), dtype=np.int), dict())
+
+        if src2nbr is not None:
+            for src in src2nbr:
+                aux = None
+                if src2aux:
+                    aux = dict((k, v[src]) for k, v in src2aux.iteritems())
+                self.add(src, src2nbr[src], aux)
+
+    @classmethod
+    def from_volume_mask_dictionary(cls, other):
+        """Make a CSRVolumeMaskDictionary with the masks of another instance
+
+        Parameters
+        ----------
+        other: VolumeMaskDictionary
+            instance with the masks (and auxiliary properties) to store.
+        """
+        if isinstance(other, CSRVolumeMaskDictionary):
+            csr = cls(other.volgeom, other.source, meta=other._meta)
+            csr.__setstate__(other.__getstate__())
+            return csr
+
+        # use the arrays of other directly to keep their data types
+        return cls(other.volgeom, other.source, meta=other._meta,
+                   src2nbr=other._src2nbr, src2aux=other._src2aux)
+
+    def _set_arrays(self, keys, indptr, indices, aux):
+        self._keys = keys
+        self._indptr = indptr
+        self._indices = indices
+        self._aux = aux # label -> (indptr, data)
+
+        # masks that have been added but are not yet in the arrays
+        self._pending = []
+        self._pending_keys = set()
+
+        # lookup and inverse mapping, computed when needed
+        self._key_order = None
+        self._lazy_nbr2src = None
+
+    def _consolidate(self):
+        '''Helper function to incorporate added masks in the arrays'''
+        if not self._pending:
+            return
+
+        pending = self._pending
+        keys = self._keys.tolist() + [src for src, _, _ in pending]
+        counts = [len(nbrs) for _, nbrs, _ in pending]
+        indptr = np.hstack((self._indptr,
+                            self._indptr[-1] + np.cumsum(counts)))
+        indices = np.hstack([self._indices] + [nbrs for _, nbrs, _ in pending])
+
+        aux = dict()
+        for label in pending[0][2]:
+            aux_indptr, aux_data = self._aux.get(label, (self._indptr, None))
+            values = [a[label] for _, _, a in pending]
+            if aux_data is not None:
+                values.insert(0, aux_data)
+            aux_counts = [len(a[label]) for _, _, a in pending]
+            aux[label] = (np.hstack((aux_indptr, aux_indptr[-1]
+                                                + np.cumsum(aux_counts))),
+                          np.hstack(values))
+
+        self._set_arrays(np.asarray(keys), indptr, indices, aux)
+
+    def add(self, src, nbrs, aux=None):
+        """Add a volume mask
+
+        Parameters
+        ----------
+        src: int or str
+            index or name of volume mask. src should not be already
+            present in this dictionary
+        nbrs: list of int
+            linear voxel indices of the voxels in the mask
+        aux: dict or None
+            auxiliary properties associated with (the voxels in) the volume
+            mask. The set of keys should be the same as for other masks,
+            and the length of each value in aux should be either the number
+            of elements in nbrs or one.
+        """
+        if not isinstance(src, (int, basestring)):
+            # for now to avoid unhasbable type
+            raise TypeError("src should be int or str")
+
+        # masks are only incorporated in the arrays when accessed, hence
+        # the arrays and the pending masks are checked separately
+        if src in self._pending_keys or self._find_row(src) is not None:
+            raise ValueError('%s already in %s' % (src, self))
+
+        nbrs = np.asarray(nbrs, dtype=np.int).ravel()
+        n = len(nbrs)
+
+        if self._pending:
+            expected_keys = set(self._pending[0][2])
+        elif len(self._keys):
+            expected_keys = set(self._aux)
+        else:
+            expected_keys = None
+        if expected_keys is not None and set(aux or ()) != expected_keys:
+            raise ValueError("aux label mismatch: %s != %s" %
+                             (set(aux or ()), expected_keys))
+
+        aux_arrs = dict()
+        for k, v in (aux or dict()).iteritems():
+            # ensure that values have the same datatype for different keys
+            if k in self._aux:
+                v_dtype = self._aux[k][1].dtype
+            elif self._pending:
+                v_dtype = self._pending[0][2][k].dtype
+            else:
+                v_dtype = None
+
+            if isinstance(v, (list, tuple, int, float, np.ndarray)):
+                v_arr = np.asanyarray(v, dtype=v_dtype).ravel()
+            else:
+                raise ValueError('illegal type %s for %s' % (type(v), v))
+
+            if len(v_arr) not in (n, 1):
+                raise ValueError('size mismatch: size %d != %d or 1' %
+                                    (len(v_arr), n))
+            aux_arrs[k] = v_arr
+
+        self._pending.append((src, nbrs, aux_arrs))
+        self._pending_keys.add(src)
+
+    def _find(self, src):
+        '''Helper function: row of the mask src, or None if not present'''
+        self._consolidate()
+        return self._find_row(src)
+
+    def _find_row(self, src):
+        keys = self._keys
+        if not len(keys):
+            return None
+        if self._key_order is None:
+            self._key_order = np.argsort(keys, kind='mergesort')
+        order = self._key_order
+        try:
+            i = np.searchsorted(keys, src, sorter=order)
+        except TypeError:
+            # incompatible key type
+            return None
+        if i == len(keys) or keys[order[i]] != src:
+            return None
+        return order[i]
+
+    def _row(self, src):
+        row = self._find(src)
+        if row is None:
+            raise KeyError(src)
+        return row
+
+    def get(self, src):
+        """Return the linear voxel indices of a mask
+
+        Parameters
+        ----------
+        src: int
+            index of mask
+
+        Returns
+        -------
+        idxs: list of int
+            linear voxel indices indexed by src
+        """
+        row = self._row(src)
+        return self._indices[self._indptr[row]:self._indptr[row + 1]].tolist()
+
+    def get_aux(self, src, label):
+        '''Auxiliary information of a mask
+
+        Parameters
+        ----------
+        src: int
+            index of mask
+        label: str
+            label of auxiliary information
+
+        Returns
+        -------
+        vals: list
+            auxiliary information labelled label for mask src
+        '''
+        labels = self.aux_keys()
+        if not label in labels:
+            raise ValueError("%s not in %r" % (label, labels))
+        row = self._find(src)
+        if row is None:
+            raise ValueError('Unknown key %r, label %r' % (src, label))
+        indptr, data = self._aux[label]
+        return data[indptr[row]:indptr[row + 1]].tolist()
+
+    def aux_keys(self):
+        '''Names of auxiliary labels
+
+        Returns
+        -------
+        keys: list of str
+            Names of auxiliary labels that are supported by get_aux
+        '''
+        self._consolidate()
+        return self._aux.keys()
+
+    def _ensure_has_target2sources(self):
+        '''Helper function to ensure that inverse mapping is set properly'''
+        self._consolidate()
+        if self._lazy_nbr2src is None:
+            indices = self._indices
+            contains = self.volgeom.contains_lin(indices)
+            if not np.all(contains):
+                raise ValueError("Target not in volume: %s" %
+                                 indices[np.logical_not(contains)][0])
+            order = np.argsort(indices)
+            rows = np.repeat(np.arange(len(self._keys)),
+                             np.diff(self._indptr))
+            self._lazy_nbr2src = (indices[order], rows[order])
+
+    def target2sources(self, nbr):
+        """Find the indices of masks that map to a linear voxel index
+
+        Parameters
+        ----------
+        nbr: int
+            Linear voxel index
+
+        Returns
+        -------
+        srcs: set of int
+            Indices i for which get(i) contains nbr
+        """
+        if type(nbr) in (list, tuple):
+            return map(self.target2sources, nbr)
+
+        self._ensure_has_target2sources()
+
+        targets, rows = self._lazy_nbr2src
+        start, stop = np.searchsorted(targets, [nbr, nbr + 1])
+        if start == stop:
+            return None
+
+        return set(self._keys[rows[start:stop]].tolist())
+
+    def get_targets(self):
+        """Return list of voxels that are in one or more masks
+
+        Returns
+        -------
+        idxs: list of int
+            Linear indices of voxels in one or more masks
+        """
+        self._ensure_has_target2sources()
+
+        return np.unique(self._indices).tolist()
+
+    def get_mask(self, keys=None):
+        """Return a mask for voxels that are included in one or more masks
+
+        Parameters
+        ----------
+        keys: list or None
+            Indices of center ids for which the associated masks must be
+            used. If None, all keys are used.
+
+        Returns
+        -------
+        msk: np.ndarray
+            Three-dimensional array with True for voxels that are
+            included in one or more masks, and False elsewhere
+        """
+        self._check_has_keys(keys)
+        self._ensure_has_target2sources()
+        m_lin = np.zeros((self.volgeom.nvoxels,), dtype=np.int8)
+
+        if keys is None:
+            m_lin[self._indices] = 1
+        else:
+            for key in keys:
+                row = self._row(key)
+                m_lin[self._indices[self._indptr[row]:
+                                    self._indptr[row + 1]]] = 1
+
+        return np.reshape(m_lin, self.volgeom.shape[:3])
+
+    def __len__(self):
+        self._consolidate()
+        return len(self._keys)
+
+    def __keys__(self):
+        self._consolidate()
+        return self._keys.tolist()
+
+    def __repr__(self, prefixes=None):
+        if prefixes is None:
+            prefixes = []
+        prefixes_ = ['vg=%r' % self._volgeom,
+                    'source=%r' % self._source] + prefixes
+
+        if self._meta is not None:
+            prefixes_.append('meta=%r' % self._meta)
+
+        return "%s(%s)" % (self.__class__.__name__, ','.join(prefixes_))
+
+    def __str__(self):
+        return '%s(%d centers, volgeom=%s)' % (self.__class__.__name__,
+                                               len(self), self._volgeom)
+
+    def _getstate(self):
+        self._consolidate()
+        return (self._volgeom, self._source, self._meta,
+                self._keys, self._indptr, self._indices, self._aux)
+
+    def __getstate__(self):
+        # the arrays are stored as they are
+        return self._getstate()
+
+    def __setstate__(self, s):
+        self._volgeom, self._source, self._meta = s[:3]
+        self._set_arrays(*s[3:])
+
+    def save_npz(self, fn):
+        """Store this instance in a (uncompressed) NumPy npz file
+
+        Parameters
+        ----------
+        fn: str
+            Filename. The arrays can be loaded memory-mapped with
+            load_npz.
+        """
+        self._consolidate()
+        labels = self.aux_keys()
+        # volume geometry, source and meta data are pickled
+        header = cPickle.dumps((self._volgeom, self._source, self._meta,
+                                labels), cPickle.HIGHEST_PROTOCOL)
+        arrays = dict(header=np.frombuffer(header, dtype=np.uint8),
+                      keys=self._keys,
+                      indptr=self._indptr,
+                      indices=self._indices)
+        for i, label in enumerate(labels):
+            arrays['aux%d_indptr' % i], arrays['aux%d_data' % i] = \
+                                                        self._aux[label]
+        np.savez(fn, **arrays)
+
+    @classmethod
+    def load_npz(cls, fn, mmap_mode=None):
+        """Load an instance stored with save_npz
+
+        Parameters
+        ----------
+        fn: str
+            Filename.
+        mmap_mode: None or str
+            If not None, the arrays are memory-mapped (see numpy.memmap)
+            rather than read into memory; typically 'r'.
+
+        Returns
+        -------
+        vmd: CSRVolumeMaskDictionary
+        """
+        arrays = _load_npz_arrays(fn, mmap_mode=mmap_mode)
+        vg, source, meta, labels = cPickle.loads(arrays['header'].tostring())
+        aux = dict((label, (arrays['aux%d_indptr' % i],
+                            arrays['aux%d_data' % i]))
+                   for i, label in enumerate(labels))
+        vmd = cls(vg, source, meta=meta)
+        vmd._set_arrays(arrays['keys'], arrays['indptr'], arrays['indices'],
+                        aux)
+        return vmd
+
+
+def _load_npz_arrays(fn, mmap_mode=None):
+    '''Helper: load all arrays from a npz file, optionally memory-mapped
+
+    Memory-mapping is only possible for arrays that are stored
+    uncompressed (as done by np.savez); other arrays are read.
+    '''
+    if mmap_mode is None:
+        npz = np.load(fn)
+        try:
+            return dict((name, npz[name]) for name in npz.files)
+        finally:
+            npz.close()
+
+    arrays = dict()
+    with open(fn, 'rb') as f:
+        zf = zipfile.ZipFile(f)
+        for info in zf.infolist():
+            name = info.filename
+            if name.endswith('.npy'):
+                name = name[:-4]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.lib.format.read_array(zf.open(info))
+                continue
+
+            # skip the local file header to get to the array data
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_len, extra_len = struct.unpack('<HH', local_header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            else:
+                header = np.lib.format.read_array_header_2_0(f)
+            shape, fortran_order, dtype = header
+
+            if not np.prod(shape):
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(fn, dtype=dtype, mode=mmap_mode,
+                                         shape=shape, offset=f.tell(),
+                                         order='F' if fortran_order else 'C')
+    return arrays
+
+
 def _dict_with_arrays2array_tuple(d):
     '''Helper: converts to a more efficient tuple-based representation
 
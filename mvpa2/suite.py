@@ -17,10 +17,19 @@ or
 
   import mvpa2.suite
 
+The latter does not import all of PyMVPA at once: modules are imported
+(and optional dependencies are probed) only as their functionality gets
+accessed, e.g. as ``mvpa2.suite.Dataset``.  ``from mvpa2.suite import *``
+and ``dir(mvpa2.suite)`` still load everything.
 """
 
 __docformat__ = 'restructuredtext'
 
+import os
+import re as _re
+import sys
+import types as _types
+import importlib as _importlib
 
 from mvpa2 import *
 
@@ -30,256 +39,350 @@ else:
     __sdebug = lambda *args: None
 __sdebug.__doc__ = "Shortcut to output debug messages for suite imports"
 
-__sdebug('base')
-from mvpa2.base import *
-from mvpa2.base.attributes import *
-from mvpa2.base.collections import *
-from mvpa2.base.constraints import *
-from mvpa2.base.config import *
-from mvpa2.base.dataset import *
-from mvpa2.base.externals import *
-from mvpa2.base.info import *
-from mvpa2.base.types import *
-from mvpa2.base.verbosity import *
-from mvpa2.base.param import *
-from mvpa2.base.state import *
-from mvpa2.base.node import *
-from mvpa2.base.learner import *
-from mvpa2.base.progress import *
-
-__sdebug('h5py')
-if externals.exists('h5py'):
-    from mvpa2.base.hdf5 import *
-
-__sdebug('reportlab')
-if externals.exists('reportlab'):
-    from mvpa2.base.report import *
-else:
-    from mvpa2.base.report_dummy import Report
 
-__sdebug('algorithms')
-from mvpa2.algorithms.hyperalignment import *
-if externals.exists('scipy'):
+def _skl_new():
+    return externals.exists('skl') and externals.versions['skl'] >= '0.9'
+
+def _skl_old():
+    return externals.exists('skl') and not _skl_new()
+
+def _no_reportlab():
+    return not externals.exists('reportlab')
+
+# Everything the suite provides, in the order of import.  Each entry is
+# (condition, module, names): the module is imported only if the
+# condition (None, a callable or anything accepted by externals.exists)
+# holds.  names is None for all (public) names of the module (as
+# ``from module import *``), or a dict which maps names in the suite
+# to attributes of the module (None for the module itself).
+_ENTRIES = [
+    # base
+    (None, 'mvpa2.base', None),
+    (None, 'mvpa2.base.attributes', None),
+    (None, 'mvpa2.base.collections', None),
+    (None, 'mvpa2.base.constraints', None),
+    (None, 'mvpa2.base.config', None),
+    (None, 'mvpa2.base.dataset', None),
+    (None, 'mvpa2.base.externals', None),
+    (None, 'mvpa2.base.info', None),
+    (None, 'mvpa2.base.types', None),
+    (None, 'mvpa2.base.verbosity', None),
+    (None, 'mvpa2.base.param', None),
+    (None, 'mvpa2.base.state', None),
+    (None, 'mvpa2.base.node', None),
+    (None, 'mvpa2.base.learner', None),
+    (None, 'mvpa2.base.progress', None),
+    ('h5py', 'mvpa2.base.hdf5', None),
+    ('reportlab', 'mvpa2.base.report', None),
+    (_no_reportlab, 'mvpa2.base.report_dummy', {'Report': 'Report'}),
+    # algorithms
+    (None, 'mvpa2.algorithms.hyperalignment', None),
     # Some pieces do not demand scipy, but for now let's just do this way
-    from mvpa2.algorithms.searchlight_hyperalignment import *
-    from mvpa2.algorithms.group_clusterthr import *
-
-__sdebug('clfs')
-from mvpa2 import clfs
-__sdebug('clfs distance')
-from mvpa2.clfs.distance import *
-__sdebug('clfs base')
-from mvpa2.clfs.base import *
-__sdebug('clfs meta')
-from mvpa2.clfs.meta import *
-__sdebug('clfs kNN')
-from mvpa2.clfs.knn import *
-__sdebug('clfs lars')
-if externals.exists('lars'):
-    from mvpa2.clfs.lars import *
-__sdebug('clfs enet')
-if externals.exists('elasticnet'):
-    from mvpa2.clfs.enet import *
-__sdebug('clfs glmnet')
-if externals.exists('glmnet'):
-    from mvpa2.clfs.glmnet import *
-__sdebug('clfs skl')
-if externals.exists('skl'):
-    if externals.versions['skl'] >= '0.9':
-        import sklearn as skl
-    else:
-        import scikits.learn as skl
-    from mvpa2.clfs.skl import *
-__sdebug('clfs smlr')
-from mvpa2.clfs.smlr import *
-from mvpa2.clfs.blr import *
-from mvpa2.clfs.gnb import *
-from mvpa2.clfs.stats import *
-from mvpa2.clfs.similarity import *
-if externals.exists('libsvm') or externals.exists('shogun'):
-    __sdebug('clfs svm')
-    from mvpa2.clfs.svm import *
-from mvpa2.clfs.transerror import *
-__sdebug('clfs warehouse')
-from mvpa2.clfs.warehouse import *
-
-__sdebug('kernels')
-from mvpa2 import kernels
-from mvpa2.kernels.base import *
-from mvpa2.kernels.np import *
-if externals.exists('libsvm'):
-    from mvpa2.kernels.libsvm import *
-if externals.exists('shogun'):
-    from mvpa2.kernels.sg import *
-
-__sdebug('datasets')
-from mvpa2 import datasets
-from mvpa2.datasets import *
-# just to make testsuite happy
-from mvpa2.datasets.base import *
-from mvpa2.datasets.formats import *
-from mvpa2.datasets.miscfx import *
-from mvpa2.datasets.eep import *
-from mvpa2.datasets.eventrelated import *
-if externals.exists('nibabel') :
-    from mvpa2.datasets.mri import *
-    from mvpa2.datasets.gifti import map2gifti, gifti_dataset
-from mvpa2.datasets.sources import *
-from mvpa2.datasets.sources.native import *
-from mvpa2.datasets.sources.bids import *
-from mvpa2.datasets.sources.openfmri import *
-from mvpa2.datasets import niml
-from mvpa2.datasets.niml import from_niml, to_niml
-from mvpa2.datasets import eeglab
-from mvpa2.datasets.eeglab import eeglab_dataset
-if externals.exists('scipy') :
-    from mvpa2.datasets import cosmo
-    from mvpa2.datasets.cosmo import map2cosmo, cosmo_dataset, \
-                                     CosmoQueryEngine, CosmoSearchlight
-
-
-__sdebug('generators')
-from mvpa2.generators.base import *
-from mvpa2.generators.partition import *
-from mvpa2.generators.splitters import *
-from mvpa2.generators.permutation import *
-from mvpa2.generators.resampling import *
-
-__sdebug('featsel')
-from mvpa2 import featsel
-from mvpa2.featsel.base import *
-from mvpa2.featsel.helpers import *
-from mvpa2.featsel.ifs import *
-from mvpa2.featsel.rfe import *
-
-__sdebug('mappers')
-from mvpa2 import mappers
-#from mvpa2.mappers import *
-from mvpa2.mappers.base import *
-from mvpa2.mappers.slicing import *
-from mvpa2.mappers.flatten import *
-from mvpa2.mappers.shape import *
-from mvpa2.mappers.prototype import *
-from mvpa2.mappers.projection import *
-from mvpa2.mappers.staticprojection import *
-from mvpa2.mappers.svd import *
-from mvpa2.mappers.procrustean import *
-from mvpa2.mappers.boxcar import *
-from mvpa2.mappers.fx import *
-from mvpa2.mappers.fxy import *
-from mvpa2.mappers.som import *
-from mvpa2.mappers.zscore import *
-if externals.exists('scipy'):
-    from mvpa2.mappers.detrend import *
-    from mvpa2.mappers.filters import *
-if externals.exists('mdp'):
-    from mvpa2.mappers.mdp_adaptor import *
-if externals.exists('mdp ge 2.4'):
-    from mvpa2.mappers.lle import *
-from mvpa2.mappers.glm import *
-from mvpa2.mappers.skl_adaptor import *
-
-__sdebug('measures')
-from mvpa2 import measures
-from mvpa2.measures.anova import *
-if externals.exists('statsmodels'):
-    from mvpa2.measures.statsmodels_adaptor import *
-from mvpa2.measures.irelief import *
-from mvpa2.measures.base import *
-from mvpa2.measures.fx import *
-from mvpa2.measures.noiseperturbation import *
-from mvpa2.misc.neighborhood import *
-from mvpa2.measures.searchlight import *
-from mvpa2.measures.gnbsearchlight import *
-from mvpa2.measures.nnsearchlight import *
-from mvpa2.measures.corrstability import *
-from mvpa2.measures.winner import *
-
-__sdebug('misc')
-from mvpa2.support.copy import *
-from mvpa2.misc.fx import *
-from mvpa2.misc.attrmap import *
-from mvpa2.misc.errorfx import *
-from mvpa2.misc.cmdline import *
-from mvpa2.misc.data_generators import *
-from mvpa2.misc.exceptions import *
-from mvpa2.misc import *
-from mvpa2.misc.io import *
-from mvpa2.misc.io.base import *
-from mvpa2.misc.io.meg import *
-from mvpa2.misc.fsl import *
-from mvpa2.misc.bv import *
-from mvpa2.misc.bv.base import *
-from mvpa2.misc.support import *
-from mvpa2.misc.transformers import *
-from mvpa2.misc.dcov import dCOV, dcorcoef
-
-__sdebug("nibabel")
-if externals.exists("nibabel"):
-    from mvpa2.misc.fsl.melodic import *
-
-if externals.exists("pylab"):
-    from mvpa2.viz import *
-    from mvpa2.misc.plot import *
-    from mvpa2.misc.plot.erp import *
-    if externals.exists(['griddata', 'scipy']):
-        from mvpa2.misc.plot.topo import *
-    from mvpa2.misc.plot.lightbox import plot_lightbox
-
-    if externals.exists(['matplotlib', 'griddata']):
-        from mvpa2.misc.plot.flat_surf import \
-                FlatSurfacePlotter, curvature_from_any
-
-__sdebug("scipy dependents")
-if externals.exists("scipy"):
-    from mvpa2.support.scipy.stats import scipy
-    from mvpa2.measures.corrcoef import *
-    from mvpa2.measures.rsa import *
-    from mvpa2.clfs.ridge import *
-    from mvpa2.clfs.plr import *
-    from mvpa2.misc.stats import *
-    from mvpa2.clfs.gpr import *
-    from mvpa2.support.nipy import *
-
-__sdebug("mappers wavelet")
-if externals.exists("pywt"):
-    from mvpa2.mappers.wavelet import *
-
-__sdebug("pylab")
-if externals.exists("pylab"):
-    import pylab as pl
-
-__sdebug("atlases")
-if externals.exists("lxml") and externals.exists("nibabel"):
-    from mvpa2.atlases import *
-
-__sdebug("surface searchlight")
-from mvpa2.misc.surfing.queryengine import SurfaceVerticesQueryEngine, \
-                                           SurfaceVoxelsQueryEngine, \
-                                           SurfaceQueryEngine, \
-                                           disc_surface_queryengine
-
-from mvpa2.misc.surfing import surf_voxel_selection, volgeom, \
-                                volsurf, volume_mask_dict
-
-from mvpa2.misc.surfing.volume_mask_dict import VolumeMaskDictionary
-
-__sdebug("nibabel afni")
-from mvpa2.support.nibabel import afni_niml_dset, afni_suma_1d, \
-                                  afni_suma_spec, surf_fs_asc, surf, \
-				                  surf_caret, \
-                                  afni_niml_roi, afni_niml_annot
-if externals.exists('nibabel'):
-    from mvpa2.support.nibabel import surf_gifti
+    ('scipy', 'mvpa2.algorithms.searchlight_hyperalignment', None),
+    ('scipy', 'mvpa2.algorithms.group_clusterthr', None),
+    # clfs
+    (None, 'mvpa2.clfs', {'clfs': None}),
+    (None, 'mvpa2.clfs.distance', None),
+    (None, 'mvpa2.clfs.base', None),
+    (None, 'mvpa2.clfs.meta', None),
+    (None, 'mvpa2.clfs.knn', None),
+    ('lars', 'mvpa2.clfs.lars', None),
+    ('elasticnet', 'mvpa2.clfs.enet', None),
+    ('glmnet', 'mvpa2.clfs.glmnet', None),
+    (_skl_new, 'sklearn', {'skl': None}),
+    (_skl_old, 'scikits.learn', {'skl': None}),
+    ('skl', 'mvpa2.clfs.skl', None),
+    (None, 'mvpa2.clfs.smlr', None),
+    (None, 'mvpa2.clfs.blr', None),
+    (None, 'mvpa2.clfs.gnb', None),
+    (None, 'mvpa2.clfs.stats', None),
+    (None, 'mvpa2.clfs.similarity', None),
+    (lambda: externals.exists('libsvm') or externals.exists('shogun'),
+     'mvpa2.clfs.svm', None),
+    (None, 'mvpa2.clfs.transerror', None),
+    (None, 'mvpa2.clfs.warehouse', None),
+    # kernels
+    (None, 'mvpa2.kernels', {'kernels': None}),
+    (None, 'mvpa2.kernels.base', None),
+    (None, 'mvpa2.kernels.np', None),
+    ('libsvm', 'mvpa2.kernels.libsvm', None),
+    ('shogun', 'mvpa2.kernels.sg', None),
+    # datasets
+    (None, 'mvpa2.datasets', {'datasets': None}),
+    (None, 'mvpa2.datasets', None),
+    # just to make testsuite happy
+    (None, 'mvpa2.datasets.base', None),
+    (None, 'mvpa2.datasets.formats', None),
+    (None, 'mvpa2.datasets.miscfx', None),
+    (None, 'mvpa2.datasets.eep', None),
+    (None, 'mvpa2.datasets.eventrelated', None),
+    ('nibabel', 'mvpa2.datasets.mri', None),
+    ('nibabel', 'mvpa2.datasets.gifti', {'map2gifti': 'map2gifti',
+                                         'gifti_dataset': 'gifti_dataset'}),
+    (None, 'mvpa2.datasets.sources', None),
+    (None, 'mvpa2.datasets.sources.native', None),
+    (None, 'mvpa2.datasets.sources.bids', None),
+    (None, 'mvpa2.datasets.sources.openfmri', None),
+    (None, 'mvpa2.datasets.niml', {'niml': None,
+                                   'from_niml': 'from_niml',
+                                   'to_niml': 'to_niml'}),
+    (None, 'mvpa2.datasets.eeglab', {'eeglab': None,
+                                     'eeglab_dataset': 'eeglab_dataset'}),
+    ('scipy', 'mvpa2.datasets.cosmo', {'cosmo': None,
+                                       'map2cosmo': 'map2cosmo',
+                                       'cosmo_dataset': 'cosmo_dataset',
+                                       'CosmoQueryEngine': 'CosmoQueryEngine',
+                                       'CosmoSearchlight': 'CosmoSearchlight'}),
+    # generators
+    (None, 'mvpa2.generators.base', None),
+    (None, 'mvpa2.generators.partition', None),
+    (None, 'mvpa2.generators.splitters', None),
+    (None, 'mvpa2.generators.permutation', None),
+    (None, 'mvpa2.generators.resampling', None),
+    # featsel
+    (None, 'mvpa2.featsel', {'featsel': None}),
+    (None, 'mvpa2.featsel.base', None),
+    (None, 'mvpa2.featsel.helpers', None),
+    (None, 'mvpa2.featsel.ifs', None),
+    (None, 'mvpa2.featsel.rfe', None),
+    # mappers
+    (None, 'mvpa2.mappers', {'mappers': None}),
+    (None, 'mvpa2.mappers.base', None),
+    (None, 'mvpa2.mappers.slicing', None),
+    (None, 'mvpa2.mappers.flatten', None),
+    (None, 'mvpa2.mappers.shape', None),
+    (None, 'mvpa2.mappers.prototype', None),
+    (None, 'mvpa2.mappers.projection', None),
+    (None, 'mvpa2.mappers.staticprojection', None),
+    (None, 'mvpa2.mappers.svd', None),
+    (None, 'mvpa2.mappers.procrustean', None),
+    (None, 'mvpa2.mappers.boxcar', None),
+    (None, 'mvpa2.mappers.fx', None),
+    (None, 'mvpa2.mappers.fxy', None),
+    (None, 'mvpa2.mappers.som', None),
+    (None, 'mvpa2.mappers.zscore', None),
+    ('scipy', 'mvpa2.mappers.detrend', None),
+    ('scipy', 'mvpa2.mappers.filters', None),
+    ('mdp', 'mvpa2.mappers.mdp_adaptor', None),
+    ('mdp ge 2.4', 'mvpa2.mappers.lle', None),
+    (None, 'mvpa2.mappers.glm', None),
+    (None, 'mvpa2.mappers.skl_adaptor', None),
+    # measures
+    (None, 'mvpa2.measures', {'measures': None}),
+    (None, 'mvpa2.measures.anova', None),
+    ('statsmodels', 'mvpa2.measures.statsmodels_adaptor', None),
+    (None, 'mvpa2.measures.irelief', None),
+    (None, 'mvpa2.measures.base', None),
+    (None, 'mvpa2.measures.fx', None),
+    (None, 'mvpa2.measures.noiseperturbation', None),
+    (None, 'mvpa2.misc.neighborhood', None),
+    (None, 'mvpa2.measures.searchlight', None),
+    (None, 'mvpa2.measures.gnbsearchlight', None),
+    (None, 'mvpa2.measures.nnsearchlight', None),
+    (None, 'mvpa2.measures.corrstability', None),
+    (None, 'mvpa2.measures.winner', None),
+    # misc
+    (None, 'mvpa2.support.copy', None),
+    (None, 'mvpa2.misc.fx', None),
+    (None, 'mvpa2.misc.attrmap', None),
+    (None, 'mvpa2.misc.errorfx', None),
+    (None, 'mvpa2.misc.cmdline', None),
+    (None, 'mvpa2.misc.data_generators', None),
+    (None, 'mvpa2.misc.exceptions', None),
+    (None, 'mvpa2.misc', None),
+    (None, 'mvpa2.misc.io', None),
+    (None, 'mvpa2.misc.io.base', None),
+    (None, 'mvpa2.misc.io.meg', None),
+    (None, 'mvpa2.misc.fsl', None),
+    (None, 'mvpa2.misc.bv', None),
+    (None, 'mvpa2.misc.bv.base', None),
+    (None, 'mvpa2.misc.support', None),
+    (None, 'mvpa2.misc.transformers', None),
+    (None, 'mvpa2.misc.dcov', {'dCOV': 'dCOV', 'dcorcoef': 'dcorcoef'}),
+    ('nibabel', 'mvpa2.misc.fsl.melodic', None),
+    # plotting
+    ('pylab', 'mvpa2.viz', None),
+    ('pylab', 'mvpa2.misc.plot', None),
+    ('pylab', 'mvpa2.misc.plot.erp', None),
+    (['pylab', 'griddata', 'scipy'], 'mvpa2.misc.plot.topo', None),
+    ('pylab', 'mvpa2.misc.plot.lightbox', {'plot_lightbox': 'plot_lightbox'}),
+    (['pylab', 'matplotlib', 'griddata'], 'mvpa2.misc.plot.flat_surf',
+     {'FlatSurfacePlotter': 'FlatSurfacePlotter',
+      'curvature_from_any': 'curvature_from_any'}),
+    # scipy dependents
+    ('scipy', 'mvpa2.support.scipy.stats', {'scipy': 'scipy'}),
+    ('scipy', 'mvpa2.measures.corrcoef', None),
+    ('scipy', 'mvpa2.measures.rsa', None),
+    ('scipy', 'mvpa2.clfs.ridge', None),
+    ('scipy', 'mvpa2.clfs.plr', None),
+    ('scipy', 'mvpa2.misc.stats', None),
+    ('scipy', 'mvpa2.clfs.gpr', None),
+    ('scipy', 'mvpa2.support.nipy', None),
+    # mappers wavelet
+    ('pywt', 'mvpa2.mappers.wavelet', None),
+    # pylab
+    ('pylab', 'pylab', {'pl': None}),
+    # atlases
+    (['lxml', 'nibabel'], 'mvpa2.atlases', None),
+    # surface searchlight
+    (None, 'mvpa2.misc.surfing.queryengine',
+     dict((n, n) for n in ('SurfaceVerticesQueryEngine',
+                           'SurfaceVoxelsQueryEngine', 'SurfaceQueryEngine',
+                           'disc_surface_queryengine'))),
+    (None, 'mvpa2.misc.surfing.surf_voxel_selection',
+     {'surf_voxel_selection': None}),
+    (None, 'mvpa2.misc.surfing.volgeom', {'volgeom': None}),
+    (None, 'mvpa2.misc.surfing.volsurf', {'volsurf': None}),
+    (None, 'mvpa2.misc.surfing.volume_mask_dict',
+     {'volume_mask_dict': None,
+      'VolumeMaskDictionary': 'VolumeMaskDictionary',
+      'CSRVolumeMaskDictionary': 'CSRVolumeMaskDictionary'}),
+    # nibabel afni
+    ] + list((None, 'mvpa2.support.nibabel.' + n, {n: None})
+             for n in ('afni_niml_dset', 'afni_suma_1d', 'afni_suma_spec',
+                       'surf_fs_asc', 'surf', 'surf_caret', 'afni_niml_roi',
+                       'afni_niml_annot')) + [
+    ('nibabel', 'mvpa2.support.nibabel.surf_gifti', {'surf_gifti': None}),
+    ]
+
+# names provided by several parts of the suite with different values.
+# The suite provides the last of them, hence resolving those requires
+# importing everything
+_AMBIGUOUS = frozenset(('Collection', 'base', 'copy', 'nanmean'))
+
+_definition_re = _re.compile(r'^(?:class\s+|def\s+)?([A-Za-z]\w*)\s*[(:=]',
+                             _re.M)
+
+
+def _condition_holds(condition):
+    if condition is None:
+        return True
+    if callable(condition):
+        return condition()
+    return externals.exists(condition)
+
+
+def _import_module(modname):
+    __sdebug(modname)
+    return _importlib.import_module(modname)
+
+
+def _defined_names(modname):
+    """Names which are (likely) defined by a module of PyMVPA
+
+    The source of the module is scanned for top-level definitions and
+    assignments, without importing it.
+    """
+    if not modname.startswith('mvpa2.'):
+        return frozenset()
+    path = os.path.join(os.path.dirname(__file__), *modname.split('.')[1:])
+    for fn in (path + '.py', os.path.join(path, '__init__.py')):
+        if os.path.exists(fn):
+            with open(fn) as f:
+                return frozenset(_definition_re.findall(f.read()))
+    return frozenset()
+
+
+def _entry_names(module, names):
+    """Names (in the suite) and values provided by an imported module"""
+    if names is not None:
+        return [(name, module if attr is None else getattr(module, attr))
+                for name, attr in names.iteritems()]
+    public = getattr(module, '__all__', None)
+    if public is None:
+        public = [n for n in module.__dict__ if not n.startswith('_')]
+    return [(name, getattr(module, name)) for name in public]
+
+
+class _LazySuite(_types.ModuleType):
+    """Module providing the suite, importing its parts on demand
+
+    Attribute lookups of names which were not accessed yet import only
+    the modules of the suite which are needed to provide them: first
+    those which were imported already, then the remaining ones in the
+    order of `_ENTRIES`.
+    """
 
+    def __init__(self, module):
+        _types.ModuleType.__init__(self, module.__name__, module.__doc__)
+        # keep the original module (and thereby its globals) alive
+        self._module = module
+        self._pending = list(_ENTRIES)
+        # names and values provided by each imported entry (by id), as
+        # determined at the time of its import, like ``import *`` would
+        self._provided = {}
+        self._complete = False
+        self.__dict__.update((k, v) for k, v in module.__dict__.iteritems()
+                             if not k.startswith('_') or k in
+                             ('__file__', '__docformat__', '__package__'))
+
+    def _load_entry(self, entry):
+        """Import the module of an entry and provide its names"""
+        self._pending.remove(entry)
+        condition, modname, names = entry
+        if not _condition_holds(condition):
+            return
+        module = _import_module(modname)
+        provided = self._provided[id(entry)] = _entry_names(module, names)
+        # ambiguous names are provided only once everything is imported
+        self.__dict__.update((k, v) for k, v in provided
+                             if not k in _AMBIGUOUS)
+
+    def _provides(self, entry, name):
+        modname, names = entry[1:]
+        if names is not None:
+            return name in names
+        module = sys.modules[modname]
+        public = getattr(module, '__all__', None)
+        if public is None:
+            return not name.startswith('_') and name in module.__dict__
+        return name in public
+
+    def _load_all(self):
+        """Import all parts of the suite"""
+        if not self._complete:
+            for entry in list(self._pending):
+                self._load_entry(entry)
+            # parts might have been imported in a different order, but
+            # the names provided should be those of the last part.  Modules
+            # without __all__ might have gained attributes (e.g. submodules)
+            # since their import, hence the names are not determined again
+            for entry in _ENTRIES:
+                if id(entry) in self._provided:
+                    self.__dict__.update(self._provided[id(entry)])
+            self._complete = True
+        return self.__dict__
+
+    def __getattr__(self, name):
+        if name == '__all__':
+            return [k for k in self._load_all() if not k.startswith('_')]
+        if name.startswith('_'):
+            # the suite provides no private names
+            raise AttributeError(name)
+        if name in _AMBIGUOUS:
+            return self._load_all()[name]
+        # first look among the modules which are imported already, then
+        # among those defining the name in their source
+        for entry in list(self._pending):
+            if entry[1] in sys.modules and self._provides(entry, name):
+                self._load_entry(entry)
+                if name in self.__dict__:
+                    return self.__dict__[name]
+        for entry in list(self._pending):
+            if entry[1] not in sys.modules \
+                    and name in _defined_names(entry[1]):
+                self._load_entry(entry)
+                if name in self.__dict__:
+                    return self.__dict__[name]
+        for entry in list(self._pending):
+            self._load_entry(entry)
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError("'module' object has no attribute %r" % name)
+
+    def __dir__(self):
+        return sorted(self._load_all())
 
-__sdebug("ipython goodies")
-if externals.exists("running ipython env"):
-    try:
-        from mvpa2.support.ipython import *
-        ipy_activate_pymvpa_goodies()
-    except Exception, e:
-        warning("Failed to activate custom IPython completions due to %s" % e)
 
 def suite_stats(scope_dict=None):
     """Return cruel dict of things which evil suite provides
@@ -287,7 +390,7 @@ def suite_stats(scope_dict=None):
     if scope_dict is None:
         scope_dict = {}
 
-    scope_dict = scope_dict or globals()
+    scope_dict = scope_dict or sys.modules[__name__]._load_all()
     import types
     # Compatibility layer for Python3
     try:
@@ -379,4 +482,13 @@ def suite_stats(scope_dict=None):
 
     return EnvironmentStatistics(scope_dict)
 
-__sdebug("THE END of mvpa2.suite imports")
+__sdebug("ipython goodies")
+if externals.exists("running ipython env"):
+    try:
+        from mvpa2.support.ipython import *
+        ipy_activate_pymvpa_goodies()
+    except Exception, e:
+        warning("Failed to activate custom IPython completions due to %s" % e)
+
+sys.modules[__name__] = _LazySuite(sys.modules[__name__])
+
@@ -21,6 +21,25 @@ import numpy as np
 _COORD_EPS = 1e-14 # maximum allowed difference between coordinates
                    # in order to be considered equal
 
+_DIJKSTRA_BLOCK_ELEMENTS = 2 ** 22 # maximum number of elements of the
+                                   # (dense) distance arrays computed at once
+_DIJKSTRA_MAX_BLOCKS = 4 # number of maximum distances with cached blocks
+
+_has_csgraph = [] # cached result of _has_csgraph_dijkstra
+
+def _has_kdtree():
+    '''Whether scipy.spatial.cKDTree is available'''
+    from mvpa2.base import externals
+    return externals.exists('scipy')
+
+def _has_csgraph_dijkstra():
+    '''Whether scipy provides Dijkstra with a distance limit'''
+    if not _has_csgraph:
+        from mvpa2.base import externals
+        _has_csgraph.append(externals.exists('scipy')
+                            and externals.versions['scipy'] >= '0.14')
+    return _has_csgraph[0]
+
 class Surface(object):
     '''Cortical surface mesh
 
@@ -279,6 +298,44 @@ class Surface(object):
 
         return dict(self._nbrs) # make a copy
 
+    @property
+    def adjacency_matrix(self):
+        '''Sparse matrix with the (Euclidean) length of each edge
+
+        Returns
+        -------
+        adj : scipy.sparse.csr_matrix
+            PxP symmetric matrix so that adj[i,j]=d means that nodes i and
+            j are connected by an edge of length d. Edges between nodes at
+            the same location are stored as explicit zeros.
+
+        Note
+        ----
+        This function computes adj if called for the first time, otherwise
+        it caches the results and returns these immediately on the next call'''
+
+        return self._adjacency.copy()
+
+    @property
+    def _adjacency(self):
+        if not hasattr(self, '_adj'):
+            import scipy.sparse as sps
+
+            f = self._f
+            edges = np.sort(np.vstack((f[:, [0, 1]], f[:, [1, 2]],
+                                       f[:, [2, 0]])), axis=1)
+            edges = edges[edges[:, 0] != edges[:, 1]]
+            # each edge is shared by two faces
+            keys = edges[:, 0].astype(np.int64) * self._nv + edges[:, 1]
+            p, q = edges[np.unique(keys, return_index=True)[1]].T
+
+            d = np.sqrt(np.sum((self._v[p] - self._v[q]) ** 2, axis=1))
+            self._adj = sps.csr_matrix((np.hstack((d, d)),
+                                        (np.hstack((p, q)),
+                                         np.hstack((q, p)))),
+                                       shape=(self._nv, self._nv))
+        return self._adj
+
     def circlearound_n2d(self, src, radius, metric='euclidean'):
         '''Finds the distances from a center node to surrounding nodes.
 
@@ -303,9 +360,8 @@ class Surface(object):
         shortmetric = metric.lower()[0] # only take first letter - for now
 
         if shortmetric == 'e':
-            ds = self.euclidean_distance(src)
-            c = dict((nd, d) for (nd, d) in zip(xrange(self._nv), ds)
-                                            if d <= radius)
+            idxs, ds = self.euclidean_neighborhood(src, radius)
+            c = dict(zip(idxs.tolist(), ds.tolist()))
 
         elif shortmetric == 'd':
             c = self.dijkstra_distance(src, maxdistance=radius)
@@ -338,8 +394,16 @@ class Surface(object):
         ----
         Preliminary analyses show that the Dijkstra distance gives very similar
         results to geodesic distances (unpublished results, NNO)
+
+        If scipy is available and nodes are queried sequentially with the
+        same maxdistance, distances are computed in blocks by
+        dijkstra_distance_matrix and cached.
         '''
 
+        if maxdistance is not None and _has_csgraph_dijkstra():
+            n2d = self._cached_dijkstra_distance(src, maxdistance)
+            if n2d is not None:
+                return n2d
 
         tdist = {src:0} # tentative distances
         fdist = dict()  # final distances
@@ -376,6 +440,105 @@ class Surface(object):
 
         return fdist
 
+    def dijkstra_distance_matrix(self, maxdistance=None, src=None,
+                                 block_size=None):
+        '''Computes Dijkstra distances from many nodes to surrounding nodes
+
+        Parameters
+        ----------
+        maxdistance: float (default: None)
+            Maximum distance for a node to qualify as a 'surrounding' node.
+            If 'maxdistance is None' then the distances to all nodes are
+            returned.
+        src : array of int or None (default: None)
+            Indices of center (source) nodes. If None, all nodes are used.
+        block_size: int or None
+            Number of center nodes processed at once. This limits the
+            memory needed for intermediate (dense) distance arrays, of
+            block_size x nvertices elements. If None, it is chosen so that
+            these have at most about 4 million elements (32 MB).
+
+        Returns
+        -------
+        n2d : scipy.sparse.csr_matrix
+            SxP matrix for S center nodes, so that n2d[i,j]=d means that
+            the distance from node src[i] to node j is d. Nodes further
+            away than maxdistance are not stored; the distance of each
+            center node to itself is stored as an explicit zero.
+
+        Note
+        ----
+        Requires scipy. Distances are the same as for dijkstra_distance,
+        but all neighborhoods are computed by a compiled implementation
+        operating on the adjacency_matrix.
+        '''
+        import scipy.sparse as sps
+        from scipy.sparse.csgraph import dijkstra
+
+        if src is None:
+            src = np.arange(self._nv)
+        src = np.asarray(src, dtype=np.int).ravel()
+        if block_size is None:
+            block_size = self._dijkstra_block_size()
+
+        kwargs = dict()
+        if maxdistance is not None:
+            kwargs['limit'] = maxdistance
+
+        # the adjacency matrix is symmetric, so treating it as directed
+        # saves a transposition for each call
+        adj = self._adjacency
+        data, indices = [np.zeros(0)], [np.zeros(0, dtype=np.int)]
+        counts = [np.zeros(0, dtype=np.int)]
+        for start in xrange(0, len(src), block_size):
+            ds = dijkstra(adj, directed=True,
+                          indices=src[start:start + block_size], **kwargs)
+            rows, cols = np.nonzero(np.isfinite(ds))
+            data.append(ds[rows, cols])
+            indices.append(cols)
+            counts.append(np.bincount(rows, minlength=len(ds)))
+
+        indptr = np.hstack(([0], np.cumsum(np.hstack(counts))))
+        return sps.csr_matrix((np.hstack(data), np.hstack(indices), indptr),
+                              shape=(len(src), self._nv))
+
+    def _dijkstra_block_size(self):
+        '''Number of center nodes for which distances are computed at once'''
+        return max(1, _DIJKSTRA_BLOCK_ELEMENTS // self._nv)
+
+    def _cached_dijkstra_distance(self, src, maxdistance):
+        '''Dijkstra distances from precomputed blocks of neighborhoods
+
+        When nodes are queried in sequential order (as by searchlights),
+        neighborhoods for a block of subsequent nodes are computed at once.
+        Returns None for nodes that are neither cached nor part of a
+        sequence.'''
+        if not hasattr(self, '_dijkstra_blocks'):
+            self._dijkstra_blocks = dict()
+            self._dijkstra_last = dict()
+
+        blocks = self._dijkstra_blocks
+        last = self._dijkstra_last.get(maxdistance)
+        self._dijkstra_last[maxdistance] = src
+
+        block = blocks.get(maxdistance)
+        if block is None or not 0 <= src - block[0] < block[1].shape[0]:
+            if last is None or src != last + 1:
+                return None
+            if not maxdistance in blocks \
+                    and len(blocks) >= _DIJKSTRA_MAX_BLOCKS:
+                del blocks[blocks.keys()[0]]
+            stop = min(src + self._dijkstra_block_size(), self._nv)
+            block = (src, self.dijkstra_distance_matrix(
+                            maxdistance, np.arange(src, stop)))
+            blocks[maxdistance] = block
+
+        offset, n2d = block
+        i = src - offset
+        start, stop = n2d.indptr[i], n2d.indptr[i + 1]
+        return dict(zip(n2d.indices[start:stop].tolist(),
+                        n2d.data[start:stop].tolist()))
+
     def dijkstra_shortest_path(self, src, maxdistance=None):
         '''Computes Dijkstra shortest path from one node to surrounding nodes.
 
@@ -555,6 +718,71 @@ class Surface(object):
         d = np.power(ss, .5)
         return d
 
+    @property
+    def _kdtree(self):
+        '''KD-tree with the coordinates of all nodes (except those with
+        NaN coordinates), and the indices of those nodes
+
+        Note
+        ----
+        This function computes the tree if called for the first time,
+        otherwise it caches the results and returns these immediately on
+        the next call. It requires scipy.'''
+
+        if not hasattr(self, '_kdt'):
+            from scipy.spatial import cKDTree
+
+            idxs = np.nonzero(np.all(np.isfinite(self._v), axis=1))[0]
+            self._kdt = cKDTree(self._v[idxs]), idxs
+        return self._kdt
+
+    def euclidean_neighborhood(self, src, radius):
+        '''Computes the nodes within a Euclidean distance from a center
+
+        Parameters
+        ----------
+        src : int or numpy.ndarray
+            Index of center (source) node, or a 1x3 array with coordinates
+            of the center (source) node.
+        radius : float
+            Maximum distance for a node to qualify as a 'surrounding' node.
+
+        Returns
+        -------
+        idxs : numpy.ndarray (int)
+            Indices of nodes within distance radius, in ascending order.
+        ds : numpy.ndarray (float)
+            Distances from src to the nodes in idxs.
+
+        Note
+        ----
+        If scipy is available, candidate nodes are found using a KD-tree
+        (see scipy.spatial.cKDTree) so that only distances to nearby nodes
+        are computed.
+        '''
+
+        if not _has_kdtree():
+            ds = self.euclidean_distance(src)
+            idxs = np.nonzero(ds <= radius)[0]
+            return idxs, ds[idxs]
+
+        if type(src) is tuple and len(src) == 3:
+            src = np.asarray(src)
+
+        if isinstance(src, np.ndarray):
+            src_coord = np.reshape(src, (3,))
+        else:
+            src_coord = self._v[src]
+
+        tree, tree_idxs = self._kdtree
+        # slightly larger radius for the query, so that the distances below
+        # decide on nodes at the border (consistent with euclidean_distance)
+        candidates = tree.query_ball_point(src_coord, radius * (1 + 1e-9))
+        idxs = np.sort(tree_idxs[np.asarray(candidates, dtype=np.int)])
+        ds = self.euclidean_distance(src, idxs)
+        keep = ds <= radius
+        return idxs[keep], ds[keep]
+
     def nearest_node_index(self, src_coords, node_mask_indices=None):
         '''Computes index of nearest node to src
 
@@ -589,6 +817,17 @@ class Surface(object):
         all_idxs = np.arange(self.nvertices)
         masked_idxs = all_idxs[node_mask_indices] if use_mask else all_idxs
 
+        if _has_kdtree() and np.all(np.isfinite(src_coords)):
+            if use_mask:
+                from scipy.spatial import cKDTree
+                finite = np.all(np.isfinite(v), axis=1)
+                tree = cKDTree(v[finite])
+                tree_idxs = masked_idxs[finite]
+            else:
+                tree, tree_idxs = self._kdtree
+            if len(tree_idxs):
+                return tree_idxs[tree.query(src_coords)[1]]
+
         n = src_coords.shape[0]
         idxs = np.zeros((n,), dtype=np.int)
         for i in xrange(n):
@@ -883,10 +1122,8 @@ class Surface(object):
         '''
         n2f = self.node2faces
 
-        msk = self.euclidean_distance(src) <= radius
-
         # node indices of those within distance r
-        vidxs = [i for i, m in enumerate(msk) if m]
+        vidxs = self.euclidean_neighborhood(src, radius)[0].tolist()
 
         # unique face indices that contain nodes within that distance
         funq = list(set.union(*[set(n2f[vidx]) for vidx in vidxs]))
@@ -1412,6 +1649,17 @@ class Surface(object):
             raise ValueError("Other surface has fewer nodes (%d) than "
                              "this one (%d)" % (nx, ny))
 
+        if _has_kdtree():
+            # find the nearest node in the high-res surface directly
+            tree, tree_idxs = highres._kdtree
+            x_idxs = np.nonzero(np.all(np.isfinite(x), axis=1))[0]
+            ds, nearest = tree.query(x[x_idxs])
+            for i, d, j in zip(x_idxs, ds, tree_idxs[nearest]):
+                if epsilon is not None and not (d < epsilon):
+                    raise ValueError("Not found for node %i: %s > %s" %
+                                            (i, d, epsilon))
+                mapping[i] = j
+            return mapping
 
         # use a fast approach
         # slice up the high and low res in smaller boxes
@@ -169,3 +169,31 @@ def test_datasetmapping():
     # feature axis should match
     assert_equal(ds.shape[1:], bflatrev.shape[1:])
 
+
+
+def test_lazy_boxcars():
+    data = np.arange(120).reshape(20, 3, 2)
+    ds = Dataset(data, sa={'timepoints': np.arange(20)})
+    for sp, regular in (([1, 4, 7, 10], True),
+                        ([10, 7, 4, 1], True),
+                        ([3], True),
+                        ([0, 1, 4], False)):
+        bm = BoxcarMapper(sp, 3, offset=1)
+        lbm = BoxcarMapper(sp, 3, offset=1, lazy=True, space='boxy')
+        assert_true('lazy=True' in repr(lbm))
+        bm.train(ds)
+        lbm.train(ds)
+        expected = np.array([data[s + 1:s + 4] for s in sp])
+        mds = bm.forward(ds)
+        lmds = lbm.forward(ds)
+        assert_array_equal(mds.samples, expected)
+        assert_array_equal(lmds.samples, expected)
+        assert_array_equal(lmds.sa.timepoints, mds.sa.timepoints)
+        assert_array_equal(lmds.sa.boxy_onsetidx, sp)
+        # regular boxcars do not copy the data, but cannot be modified
+        assert_equal(np.may_share_memory(lmds.samples, data), regular)
+        assert_equal(lmds.samples.flags.writeable, not regular)
+        assert_false(np.may_share_memory(mds.samples, data))
+        # attributes are always copied
+        assert_false(np.may_share_memory(lmds.sa.timepoints,
+                                         ds.sa.timepoints))
@@ -10,6 +10,7 @@
 
 import numpy as np
 import copy
+import pickle
 import sys
 
 from mvpa2.testing.tools import assert_raises, assert_false, assert_equal, \
@@ -17,7 +18,7 @@ from mvpa2.testing.tools import assert_raises, assert_false, assert_equal, \
 from mvpa2.testing import sweepargs
 
 from mvpa2.base.collections import Collectable, ArrayCollectable, \
-        SampleAttributesCollection
+        SampleAttribute, SampleAttributesCollection
 
 from mvpa2.base.attributes import ConditionalAttribute
 from mvpa2.base.node import Node
@@ -142,6 +143,64 @@ def test_array_collectable_unique(a):
     assert_equal(len(c2.unique), len(c.unique) + 1)
 
 
+def test_array_collectable_compact():
+    c = SampleAttribute(np.array([1, 2, 2]), name='targets',
+                        doc="Some\n   targets")
+    # no per-instance dictionary, docs are normalized and shared
+    assert_false(hasattr(c, '__dict__'))
+    assert_equal(c.__doc__, "Some targets")
+    assert_true(c.__doc__ is SampleAttribute(doc="Some\n   targets").__doc__)
+    # class docstring is not affected
+    assert_equal(SampleAttribute.__doc__, "Per sample attribute in a dataset")
+    assert_equal(SampleAttributesCollection(length=3).__dict__, {})
+
+    # unique values are cached for the current version of the value
+    version = c.version
+    u = c.unique
+    assert_array_equal(u, [1, 2])
+    assert_true(c.unique is u)
+    c.value = np.array([3, 3, 4])
+    assert_true(c.version != version)
+    assert_array_equal(c.unique, [3, 4])
+    # in-place modifications need explicit invalidation
+    c.value[:] = 5
+    c._reset_unique()
+    assert_array_equal(c.unique, [5])
+
+    # copies and pickles preserve everything
+    for c_ in (copy.copy(c), copy.deepcopy(c),
+               pickle.loads(pickle.dumps(c))):
+        assert_equal(c_.name, 'targets')
+        assert_equal(c_.__doc__, "Some targets")
+        assert_array_equal(c_.value, c.value)
+        assert_array_equal(c_.unique, [5])
+
+
+def test_array_collectable_codes():
+    c = SampleAttribute(['b', 'a', 'b', 'c', 'a'], name='targets')
+    assert_array_equal(c.unique, ['a', 'b', 'c'])
+    assert_array_equal(c.codes, [1, 0, 1, 2, 0])
+    assert_array_equal(c.unique[c.codes], c.value)
+    assert_equal([list(g) for g in c.group_indices], [[1, 4], [0, 2], [3]])
+    # computed once, and shared as read-only
+    assert_true(c.codes is c.codes)
+    assert_true(c.group_indices is c.group_indices)
+    assert_raises(ValueError, c.codes.__setitem__, 0, 1)
+    # shallow copies (views) share them
+    assert_true(copy.copy(c).codes is c.codes)
+    # but a new value invalidates them
+    c.value = np.array([3, 1, 3])
+    assert_array_equal(c.codes, [1, 0, 1])
+    assert_equal([list(g) for g in c.group_indices], [[1], [0, 2]])
+    # mixed types which cannot be sorted
+    c.value = np.array([1, 'x', None, 1], dtype=object)
+    assert_array_equal(c.unique[c.codes], c.value)
+    # only for 1D attributes
+    c = SampleAttribute(np.arange(6).reshape(3, 2))
+    assert_raises(ValueError, lambda: c.codes)
+    assert_equal(ArrayCollectable().codes, None)
+
+
 def test_collections():
     sa = SampleAttributesCollection()
     assert_equal(len(sa), 0)
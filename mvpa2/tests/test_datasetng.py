@@ -13,6 +13,7 @@ from mvpa2.testing.datasets import datasets
 
 import numpy as np
 import shutil
+import time
 import tempfile
 import os
 
@@ -23,10 +24,12 @@ from mvpa2.base.types import is_datasetlike
 from mvpa2.base.dataset import DatasetError, vstack, hstack, all_equal, \
                                 stack_by_unique_feature_attribute, \
                                 stack_by_unique_sample_attribute
-from mvpa2.datasets.base import dataset_wizard, Dataset, HollowSamples
+from mvpa2.datasets.base import dataset_wizard, Dataset, HollowSamples, \
+                               OutOfCoreSamples
 from mvpa2.misc.data_generators import normal_feature_dataset
 from mvpa2.testing import reseed_rng
 import mvpa2.support.copy as copy
+import cPickle as pickle
 from mvpa2.base.collections import \
      SampleAttributesCollection, FeatureAttributesCollection, \
      DatasetAttributesCollection, ArrayCollectable, SampleAttribute, \
@@ -300,6 +303,19 @@ def test_ds_shallowcopy():
     #ok_(np.any(ds.uniquechunks != ds_.uniquechunks))
 
 
+def test_getitem_reuses_unique_cache():
+    ds = Dataset(np.arange(12).reshape((4, -1)),
+                 sa=dict(targets=['b', 'a', 'b', 'a']))
+    codes = ds.sa['targets'].codes
+    # selecting features only shares the values, hence derived ones too
+    assert_true(ds[:, [0, 2]].sa['targets'].codes is codes)
+    # but it cannot be reused for a selection of samples
+    ds_ = ds[[1, 2]]
+    assert_array_equal(ds_.sa['targets'].codes, [0, 1])
+    # and the original is left alone
+    assert_array_equal(ds.sa['targets'].codes, [1, 0, 1, 0])
+
+
 def test_ds_deepcopy():
     # lets use some instance of somewhat evolved dataset
     ds = normal_feature_dataset()
@@ -468,6 +484,74 @@ def test_stack_add_dataset_attributes():
                 assert_array_equal(r.a.array, np.arange(10))
 
 
+def test_stack_add_dataset_attributes_identity():
+    from mvpa2.mappers.flatten import FlattenMapper
+    shared = FlattenMapper(shape=(5,))
+    dss = [Dataset.from_wizard(np.ones((2, 5)), targets=1) for i in range(3)]
+    for i, ds in enumerate(dss):
+        ds.a['shared'] = shared
+        ds.a['own'] = FlattenMapper(shape=(5,))
+        ds.a['nan'] = float('nan')
+        ds.a['num'] = [1, 1.0, np.int16(2)][i]
+    r = vstack(dss, a='uniques')
+    assert_true(r.a.shared[0] is shared)
+    assert_equal(len(r.a.shared), 1)
+    # mappers without comparison operator are only equal to themselves
+    assert_equal(len(r.a.own), 3)
+    # distinct nan objects are never equal
+    assert_equal(len(r.a.nan), 3)
+    assert_equal(r.a.num, (1, 2))
+    r = vstack(dss, a='drop_nonunique')
+    assert_true(r.a.shared is shared)
+    assert_false('own' in r.a)
+    assert_false('num' in r.a)
+
+
+def test_stack_add_dataset_attributes_0d_arrays():
+    # scalars and 0-d arrays holding the same value are equal
+    a = Dataset(np.ones((1, 2)), a=dict(x=1, y='y', z=np.array([1])))
+    b = Dataset(np.ones((1, 2)), a=dict(x=np.array(1), y=np.array('y'),
+                                        z=1))
+    r = vstack([a, b], a='uniques')
+    assert_equal(r.a.x, (1,))
+    assert_equal(r.a.y, ('y',))
+    assert_equal(len(r.a.z), 2)
+    r = vstack([b, a], a='uniques')
+    assert_equal(len(r.a.x), 1)
+    assert_array_equal(r.a.x[0], 1)
+    r = vstack([a, b], a='drop_nonunique')
+    assert_equal(sorted(r.a.keys()), ['x', 'y'])
+    del a.a['z'], b.a['z']
+    assert_equal(vstack([a, b], a='unique').a.x, 1)
+    assert_equal(vstack([b, a], a='unique').a.y, 'y')
+
+
+@labile(3, 1)
+def test_vstack_scaling():
+    from mvpa2.mappers.flatten import FlattenMapper
+    # stacking must scale linearly with the number of datasets, also when
+    # collecting unique dataset attributes among many distinct values
+    n = 10000 if cfg.getboolean('tests', 'quick', False) else 100000
+    shared = FlattenMapper(shape=(4,))
+    timings = []
+    for n_ in (n // 10, n):
+        dss = [Dataset(np.ones((1, 4)), sa=dict(targets=[i % 3]),
+                       fa=dict(center=[i] * 4),
+                       a=dict(mapper=FlattenMapper(shape=(4,)), roi=i % 7,
+                              shared=shared))
+               for i in xrange(n_)]
+        t0 = time.time()
+        ds = vstack(dss, a='uniques')
+        timings.append(time.time() - t0)
+        assert_equal(ds.shape, (n_, 4))
+        assert_array_equal(ds.fa.center, [n_ - 1] * 4)
+        assert_equal(len(ds.a.mapper), n_)
+        assert_equal(ds.a.roi, tuple(range(7)))
+        assert_true(ds.a.shared[0] is shared)
+    # linear would be 10x, quadratic 100x
+    assert_true(timings[1] < 30 * timings[0])
+
+
 def test_unique_stack():
     data = Dataset(np.reshape(np.arange(24), (4, 6)),
                         sa=dict(x=[0, 1, 0, 1]),
@@ -1072,6 +1156,81 @@ def test_hollow_samples():
     assert_equal(ds.samples.dtype, int)
     assert_equal(ds.shape, sshape)
 
+
+@with_tempfile(suffix='.hdf5')
+def test_outofcore_samples(fname):
+    skip_if_no_external('h5py')
+    import h5py
+    from mvpa2.mappers.zscore import ZScoreMapper
+    data = np.random.randn(20, 12).astype('float32')
+    with h5py.File(fname, 'w') as hf:
+        hf.create_dataset('samples', data=data)
+    npyfname = fname + '.npy'
+    np.save(npyfname, data)
+    try:
+        for samples in (OutOfCoreSamples.from_hdf5(fname, 'samples'),
+                        OutOfCoreSamples.from_npy(npyfname)):
+            ds = Dataset(samples, sa={'chunks': np.arange(20) % 2})
+            assert_equal(ds.shape, data.shape)
+            assert_equal(ds.samples.dtype, data.dtype)
+            assert_array_equal(ds, data)
+            # selections do not read the data
+            for sel in ((slice(None), [11, 3, 3]),
+                        ([5, 2, 9], slice(2, 6)),
+                        (ds.sa.chunks == 1, [4, 1]),
+                        (slice(3, 7), slice(None)),
+                        ([], [0])):
+                sds = ds[sel]
+                assert_true(isinstance(sds.samples, OutOfCoreSamples))
+                assert_array_equal(sds.samples, data[sel[0]][:, sel[1]])
+            # copies share the backend
+            for c in (ds.copy(deep=True), ds.copy(deep=False),
+                      copy.deepcopy(ds[:, 2:5])):
+                assert_true(c.samples._data is samples._data)
+            assert_array_equal(copy.deepcopy(ds[:, 2:5]).samples,
+                               data[:, 2:5])
+            # integer indices yield in-memory arrays, like for ndarrays
+            assert_array_equal(samples[3], data[3])
+            assert_array_equal(samples[[3, 1], 2], data[[3, 1], 2])
+            assert_array_equal(list(samples), list(data))
+            # in-memory copies
+            assert_true(isinstance(ds.samples.copy(), np.ndarray))
+            assert_equal(ds.samples.astype(float).dtype, float)
+            assert_array_equal(
+                np.vstack(list(ds[::-1].samples.iter_blocks(7))), data[::-1])
+            # streaming z-scoring yields the same result as in memory
+            zsm = ZScoreMapper(block_size=3)
+            zsm.train(ds)
+            zds = zsm.forward(ds)
+            assert_true(isinstance(zds.samples, np.ndarray))
+            mds = Dataset(data, sa=ds.sa.copy())
+            ref = ZScoreMapper()
+            ref.train(mds)
+            assert_array_almost_equal(zds.samples, ref.forward(mds).samples)
+            # the original remains on disk
+            assert_true(isinstance(ds.samples, OutOfCoreSamples))
+            # pickling re-opens the backend
+            pds = pickle.loads(pickle.dumps(ds[::2, [1, 7]]))
+            assert_array_equal(pds.samples, data[::2][:, [1, 7]])
+            assert_raises(ValueError, OutOfCoreSamples, data[0])
+            samples.close()
+        # views of a memory-mapped file are pickled as such
+        mapped = np.load(npyfname, mmap_mode='r')
+        for view in (mapped[5:], mapped[3:15:2, 2:], mapped[::-1].T):
+            samples = OutOfCoreSamples(view)[1:, 2:4]
+            for i in xrange(2):
+                samples = pickle.loads(pickle.dumps(samples))
+                assert_true(isinstance(samples._data, np.memmap))
+                assert_array_equal(samples, np.asarray(view)[1:, 2:4])
+        del mapped, view, samples
+        # the HDF5 file is owned by the container and its selections
+        samples = OutOfCoreSamples.from_hdf5(fname, 'samples')
+        assert_array_equal(samples[2:][0], data[2])
+        samples[2:].close()
+        assert_false(samples._data.id.valid)
+    finally:
+        os.unlink(npyfname)
+
 def test_assign_sa():
     # https://github.com/PyMVPA/PyMVPA/issues/149
     ds = Dataset(np.arange(6).reshape((2,-1)), sa=dict(targets=range(2)))
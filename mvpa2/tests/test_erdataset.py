@@ -14,7 +14,7 @@ from mvpa2.mappers.flatten import FlattenMapper
 from mvpa2.mappers.boxcar import BoxcarMapper
 from mvpa2.mappers.fx import FxMapper
 from mvpa2.datasets.eventrelated import find_events, eventrelated_dataset, \
-        extract_boxcar_event_samples
+        extract_boxcar_event_samples, fit_event_hrf_model
 from mvpa2.datasets.sources import load_example_fmri_dataset
 from mvpa2.mappers.zscore import zscore
 
@@ -117,6 +117,13 @@ def test_erdataset():
                                         event_duration=1)
     assert_equal(evds.shape, (len(evs), 1 * ds.nfeatures))
     assert_equal(np.unique(evds.samples[1]), 68)
+    # lazy extraction yields the same samples, also with an event mapper
+    evs = [dict(onset=o, duration=3) for o in range(10, 60, 7)]
+    for em in (None, FxMapper('features', np.mean)):
+        evds = extract_boxcar_event_samples(ds, evs, event_mapper=em)
+        levds = extract_boxcar_event_samples(ds, evs, event_mapper=em,
+                                             lazy=True)
+        assert_datasets_equal(evds, levds, ignore_a=['mapper'])
 
 def test_hrf_modeling():
     skip_if_no_external('nibabel')
@@ -261,3 +268,31 @@ def test_hrf_modeling():
     #pass
     #i = 1
 
+
+def test_hrf_modeling_native_backend():
+    skip_if_no_external('nipy')
+    ds = load_example_fmri_dataset('25mm', literal=True)[{'chunks': [0, 1]}, :3]
+    events = find_events(targets=ds.sa.targets, chunks=ds.sa.chunks)
+    tr = ds.a.imghdr['pixdim'][4]
+    for ev in events:
+        for a in ('onset', 'duration'):
+            ev[a] = ev[a] * tr
+    kwargs = dict(time_attr='time_coords', condition_attr='targets',
+                  design_kwargs=dict(drift_model='blank'))
+    nipy = fit_event_hrf_model(ds, events, glmfit_kwargs=dict(model='ols'),
+                               **kwargs)
+    native = fit_event_hrf_model(ds, events, glm_backend='native',
+                                 glmfit_kwargs=dict(model='ols'), **kwargs)
+    assert_array_equal(nipy.sa.targets, native.sa.targets)
+    assert_array_almost_equal(nipy.samples, native.samples, decimal=3)
+    # like NiPy, AR(1) is the default fitting algorithm
+    native_ar1 = fit_event_hrf_model(ds, events, glm_backend='native',
+                                     glmfit_kwargs=dict(model='ar1'),
+                                     **kwargs)
+    assert_array_equal(
+        fit_event_hrf_model(ds, events, glm_backend='native', **kwargs),
+        native_ar1)
+    # NiPy-only arguments are rejected
+    assert_raises(ValueError, fit_event_hrf_model, ds, events,
+                  glm_backend='native', glmfit_kwargs=dict(steps=10),
+                  **kwargs)
@@ -8,12 +8,14 @@
 ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Test externals checking"""
 
+import os
 import unittest
 
 from mvpa2 import cfg
 from mvpa2.base import externals
 from mvpa2.support import copy
 from mvpa2.testing import SkipTest
+from mvpa2.testing.tools import with_tempfile
 
 class TestExternals(unittest.TestCase):
 
@@ -85,6 +87,55 @@ class TestExternals(unittest.TestCase):
 
         externals._KNOWN.pop('checker2')
 
+    @with_tempfile()
+    def test_externals_persistent_cache(self, cache_dir):
+        cfg.add_section('externals')
+        cfg.set('externals', 'cache dir', cache_dir)
+        externals._persistent_cache.clear()
+        try:
+            self.assertTrue(externals.exists('gzip'))
+            filename = externals._get_persistent_cache_filename()
+            self.assertTrue(os.path.exists(filename))
+            # other processes (here: with a fresh config) use stored result
+            orig_check = externals._KNOWN['gzip']
+            externals._KNOWN['gzip'] = 'raise ImportError'
+            try:
+                cfg.remove_option('externals', 'have gzip')
+                self.assertTrue(externals.exists('gzip'))
+                # unless forced to check again
+                self.assertFalse(externals.exists('gzip', force=True))
+                cfg.remove_option('externals', 'have gzip')
+                externals._persistent_cache.clear()
+                self.assertFalse(externals.exists('gzip'))
+            finally:
+                externals._KNOWN['gzip'] = orig_check
+            # results of another environment are replaced in the same file
+            self.assertTrue(externals.exists('gzip', force=True))
+            externals._persistent_cache.clear()
+            orig_key = externals._persistent_cache_key
+            externals._persistent_cache_key = lambda: 'other'
+            try:
+                self.assertEqual(externals._load_persistent_cache(), {})
+                self.assertTrue(externals.exists('gzip', force=True))
+                self.assertEqual(os.listdir(cache_dir),
+                                 [os.path.basename(filename)])
+                externals._persistent_cache.clear()
+                self.assertTrue(externals._load_persistent_cache()['gzip'])
+            finally:
+                externals._persistent_cache_key = orig_key
+                externals._persistent_cache.clear()
+            self.assertFalse('gzip' in externals._load_persistent_cache())
+            # never cached are results depending on the running process
+            externals.exists('running ipython env')
+            self.assertFalse('running ipython env'
+                             in externals._load_persistent_cache())
+            self.assertEqual(externals.clear_persistent_cache(), filename)
+            self.assertFalse(os.path.exists(filename))
+            self.assertTrue(externals.exists('gzip', force=True))
+        finally:
+            cfg.remove_option('externals', 'cache dir')
+            externals._persistent_cache.clear()
+
     def test_absent_external_version(self):
         # should not blow, just return None
         if externals.exists('shogun'):
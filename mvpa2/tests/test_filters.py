@@ -15,7 +15,8 @@ skip_if_no_external('scipy')
 import numpy as np
 
 from mvpa2.datasets import Dataset, vstack
-from mvpa2.mappers.filters import FFTResampleMapper, iir_filter
+from mvpa2.mappers.filters import FFTResampleMapper, IIRFilterMapper, \
+        iir_filter
 
 def test_resample():
     time = np.linspace(0, 2*np.pi, 100)
@@ -76,3 +77,51 @@ def test_iirfilter():
     assert_equal(len(ds.fa), len(mds.fa))
     assert_array_equal(ds.fa.fid, mds.fa.fid)
     assert_array_equal(ds.sa.sid, mds.sa.sid)
+
+
+def test_blockwise_filtering():
+    from scipy import signal
+    t = np.linspace(0, 1.0, 501)
+    x = np.array([np.sin(2 * np.pi * f * t) for f in (5, 50, 100, 150, 250)]).T
+    ds = Dataset(x, sa={'chunks': np.repeat([0, 1, 2], 167)[:len(x)],
+                        'time': t})
+
+    # FFT resampling of chunks and blocks of features in multiple threads
+    for kwargs in (dict(), dict(chunks_attr='chunks'),
+                   dict(position_attr='time', attr_strategy='sample')):
+        target = FFTResampleMapper(50, **kwargs).forward(ds)
+        for nproc, block_size in ((2, None), (1, 2), (3, 1), (None, None)):
+            rm = FFTResampleMapper(50, nproc=nproc, block_size=block_size,
+                                   **kwargs)
+            assert_true('nproc=%r' % nproc in repr(rm))
+            mds = rm.forward(ds)
+            assert_array_almost_equal(mds.samples, target.samples)
+            assert_equal(sorted(mds.sa.keys()), sorted(target.sa.keys()))
+            for k in mds.sa:
+                assert_array_almost_equal(mds.sa[k].value, target.sa[k].value)
+
+    b, a = signal.butter(8, 0.125)
+    target = iir_filter(ds, b, a, padlen=150)
+    for nproc, block_size in ((2, None), (1, 2), (3, 1), (None, None)):
+        mds = iir_filter(ds, b, a, padlen=150, nproc=nproc,
+                         block_size=block_size)
+        assert_array_almost_equal(mds.samples, target.samples)
+        # filtering along the other axis is done in blocks of samples
+        assert_array_almost_equal(
+            IIRFilterMapper(b, a, axis=1, padlen=2, nproc=nproc,
+                            block_size=block_size).forward(ds.samples),
+            IIRFilterMapper(b, a, axis=1, padlen=2).forward(ds.samples))
+
+    # in place filtering keeps float32 data in its precision
+    for block_size in (None, 2):
+        ds32 = ds.copy(deep=True)
+        ds32.samples = ds32.samples.astype('float32')
+        orig = ds32.samples
+        mds = iir_filter(ds32, b, a, padlen=150, inplace=True,
+                         block_size=block_size)
+        assert_true(mds.samples is orig)
+        assert_equal(mds.samples.dtype, np.float32)
+        assert_array_almost_equal(mds.samples, target.samples, decimal=5)
+    # cannot do that with integers
+    assert_raises(TypeError, iir_filter, Dataset(np.ones((20, 2), dtype=int)),
+                  b, a, padlen=5, inplace=True)
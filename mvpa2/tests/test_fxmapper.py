@@ -325,3 +325,54 @@ def test_mean_removal():
     nan_arr_dm[2] = np.nan
     assert_array_equal(mr.forward1(nan_arr), nan_arr_dm)
     # same handling applies to np.inf
+
+
+def test_fxmapper_float32():
+    ds = datasets['uni2small'].copy()
+    ds.samples = ds.samples.astype(np.float32)
+    for m in (mean_group_sample(['targets', 'chunks']),
+              mean_group_feature(['nonbogus_targets']),
+              mean_sample()):
+        mds = m.forward(ds)
+        # no hidden upcast
+        assert_equal(mds.samples.dtype, np.float32)
+
+
+def test_grouped_fxmapper_engine():
+    # interleaved groups, with some combinations missing
+    targets = np.array([3, 1, 2] * 10 + [5] * 4)
+    chunks = np.arange(len(targets)) % 4
+    chunks[targets == 5] = 0
+    samples = np.random.normal(size=(len(targets), 5))
+    ds = Dataset(samples, sa=dict(targets=targets, chunks=chunks,
+                                  idx=np.arange(len(targets))))
+    ds.fa['roi'] = ['b', 'a', 'b', 'c', 'a']
+    combs = sorted(set(zip(chunks, targets)))
+    for fx in (np.mean, np.max, np.median):
+        mds = FxMapper('samples', fx, uattrs=['targets', 'chunks'])(ds)
+        assert_equal(len(mds), len(combs))
+        for i, (c, t) in enumerate(combs):
+            mask = (chunks == c) & (targets == t)
+            assert_array_almost_equal(mds.samples[i], fx(samples[mask], axis=0))
+            assert_equal(mds.sa.targets[i], t)
+            assert_equal(mds.sa.chunks[i], c)
+            # merged attribute
+            assert_equal(mds.sa.idx[i],
+                         '+'.join([str(j) for j in np.flatnonzero(mask)]))
+    # order of occurrence
+    mds = mean_group_sample(['targets', 'chunks'], order='occurrence')(ds)
+    first = [np.flatnonzero((chunks == c) & (targets == t))[0]
+             for c, t in combs]
+    assert_array_equal(mds.sa.targets, [combs[i][1] for i in np.argsort(first)])
+    # features: reduced at once, and via a generic function
+    for fx in (np.sum, np.mean, np.min, np.ptp):
+        mds = FxMapper('features', fx, uattrs=['roi'])(ds)
+        assert_array_equal(mds.fa.roi, ['a', 'b', 'c'])
+        for i, roi in enumerate('abc'):
+            assert_array_almost_equal(
+                mds.samples[:, i],
+                fx(samples[:, ds.fa.roi == roi], axis=1))
+    # integer mean is not truncated
+    dsint = Dataset(np.arange(6).reshape(2, 3), fa=dict(roi=[0, 1, 0]))
+    assert_array_equal(mean_group_feature(['roi'])(dsint).samples,
+                       [[1, 1], [4, 4]])
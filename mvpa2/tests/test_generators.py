@@ -378,6 +378,57 @@ def test_exclude_targets_combinations_subjectchunks():
     assert_equal(testing_pairs, set(zip(*np.where(np.ones((3,3))))))
 
 
+@reseed_rng()
+def test_generate_indices():
+    ds = give_data()
+    # partitions as index arrays match the generated datasets
+    for part in (NFoldPartitioner(), NFoldPartitioner(cvtype=2, count=3),
+                 OddEvenPartitioner()):
+        pdss = list(part.generate(ds))
+        pidxs = list(part.generate_indices(ds))
+        assert_equal(len(pdss), len(pidxs))
+        for pds, pidx in zip(pdss, pidxs):
+            assert_equal(len(pidx), 2)
+            for i, idx in enumerate(pidx):
+                assert_array_equal(
+                    idx, np.flatnonzero(pds.sa.partitions == i + 1))
+    # also for partitioners that override generate()
+    ds.sa['superord'] = ds.sa.chunks % 2
+    part = FactorialPartitioner(NFoldPartitioner(attr='chunks'),
+                                attr='superord')
+    pdss = list(part.generate(ds))
+    pidxs = list(part.generate_indices(ds))
+    assert_equal(len(pdss), 25)
+    assert_equal(len(pdss), len(pidxs))
+    for pds, pidx in zip(pdss, pidxs):
+        assert_equal(len(pidx), 2)
+        for i, idx in enumerate(pidx):
+            assert_array_equal(
+                idx, np.flatnonzero(pds.sa.partitions == i + 1))
+
+    # permutations as index arrays match the permuted datasets
+    ds.sa['ids'] = range(len(ds))
+    for kwargs in (dict(attr='ids'),
+                   dict(attr='ids', limit='chunks', assure=True),
+                   dict(attr=['targets', 'ids'], limit={'chunks': [3, 4]}),
+                   dict(attr='targets', limit='chunks', strategy='uattrs'),
+                   dict(attr='ids', strategy='chunks', chunk_attr='chunks')):
+        pdss = list(AttributePermutator(
+            count=3, rng=np.random.RandomState(3), **kwargs).generate(ds))
+        perms = list(AttributePermutator(
+            count=3, rng=np.random.RandomState(3), **kwargs).generate_indices(ds))
+        assert_equal(len(pdss), len(perms))
+        attrs = kwargs['attr']
+        if isinstance(attrs, str):
+            attrs, perms = [attrs], [[p] for p in perms]
+        for pds, perm in zip(pdss, perms):
+            assert_equal(len(perm), len(attrs))
+            for attr, p in zip(attrs, perm):
+                assert_array_equal(pds.sa[attr].value, ds.sa[attr].value[p])
+    # the attributes of the dataset are not modified
+    assert_array_equal(ds.sa.ids, range(len(ds)))
+
+
 def test_permute_chunks():
 
     def is_sorted(x):
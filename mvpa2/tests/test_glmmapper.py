@@ -54,14 +54,12 @@ def test_glm_mapper():
     assert_equal(bold.nfeatures, 2)
     assert('model' in bold.sa)
     reg_names = ['model']
-    implementations = []
+    implementations = [NativeGLMMapper]
     if externals.exists('nipy'):
         implementations.append(NiPyGLMMapper)
     if externals.exists('statsmodels'):
         implementations.append(StatsmodelsGLMMapper)
     results = []
-    if not len(implementations):
-        raise SkipTest
     for klass in implementations:
         pest = klass(reg_names)(bold)
         assert_equal(pest.shape, (len(reg_names), bold.nfeatures))
@@ -102,3 +100,52 @@ def test_glm_mapper():
     # should really have very similar results, independent of actual model fit details
     assert(np.corrcoef(ds1.samples.ravel(), ds2.samples.ravel())[0,1] > 0.99)
 
+
+
+@reseed_rng()
+def test_native_glm_mapper():
+    bold = get_bold()
+    trend = np.linspace(-1, 1, len(bold))
+    X = np.array([bold.sa.model, trend, np.ones(len(bold))]).T
+    # more features to exercise blocking
+    bold = Dataset(np.hstack([bold.samples] * 5)
+                   + np.random.randn(len(bold), 10),
+                   sa=bold.sa.copy())
+    bold.fa['idx'] = np.arange(bold.nfeatures)
+    betas_ref = np.linalg.lstsq(X, bold.samples)[0]
+    resid = bold.samples - np.dot(X, betas_ref)
+    resid_var_ref = (resid ** 2).sum(axis=0) / (len(X) - X.shape[1])
+    se = np.sqrt(np.outer(np.diag(np.linalg.inv(np.dot(X.T, X))),
+                          resid_var_ref))
+    for bs in (1, 3, 10000):
+        pest = NativeGLMMapper(['model'], add_regs=(('trend', trend),),
+                               add_constant=True, block_size=bs,
+                               return_stats=True)(bold)
+        assert_array_almost_equal(pest.samples, betas_ref)
+        assert_array_equal(pest.fa.idx, bold.fa.idx)
+        assert_array_almost_equal(pest.a.resid_var.samples[0], resid_var_ref)
+        assert_array_almost_equal(pest.a.tstats.samples, betas_ref / se)
+        assert_array_equal(pest.a.tstats.sa.regressor_names,
+                           ['model', 'trend', 'constant'])
+        assert_array_equal(pest.a.tstats.fa.idx, bold.fa.idx)
+    # float32 data is fitted in float32
+    pest32 = NativeGLMMapper(['model'], add_constant=True)(
+        Dataset(bold.samples.astype('float32'), sa=bold.sa.copy()))
+    assert_equal(pest32.samples.dtype, np.float32)
+    # AR(1): estimates remain close to the OLS ones for white noise
+    pest_ar1 = NativeGLMMapper(['model'], add_regs=(('trend', trend),),
+                               add_constant=True, model='ar1',
+                               return_stats=True)(bold)
+    assert_equal(pest_ar1.shape, pest.shape)
+    assert_true(np.corrcoef(pest_ar1.samples[0], pest.samples[0])[0, 1] > 0.9)
+    # strongly autocorrelated noise is whitened
+    noise = np.cumsum(np.random.randn(len(bold), 4), axis=0) * 0.5
+    ds = Dataset(np.outer(bold.sa.model, np.ones(4)) * 8 + noise,
+                 sa=bold.sa.copy())
+    pest_ols = NativeGLMMapper(['model'], add_constant=True,
+                               return_stats=True)(ds)
+    pest_ar1 = NativeGLMMapper(['model'], add_constant=True, model='ar1',
+                               return_stats=True)(ds)
+    assert_true(np.all(pest_ar1.a.resid_var.samples
+                       < pest_ols.a.resid_var.samples))
+    assert_raises(ValueError, NativeGLMMapper, ['model'], model='ar2')
@@ -384,6 +384,57 @@ def test_chainmapper():
     assert_equal(repr(tail_sfs), 'StaticFeatureSelection(slicearg=array([14]))')
 
 
+def test_fused_chainmapper():
+    from mvpa2.mappers.detrend import PolyDetrendMapper
+    from mvpa2.mappers.zscore import ZScoreMapper
+    from mvpa2.mappers.staticprojection import StaticProjectionMapper
+    ds = Dataset(np.random.randn(20, 3, 4),
+                 sa={'chunks': np.repeat([0, 1], 10)})
+    orig = ds.samples.copy()
+    nodes = [FlattenMapper(),
+             StaticFeatureSelection([0, 2, 3, 5, 7, 11]),
+             PolyDetrendMapper(polyord=1, chunks_attr='chunks'),
+             ZScoreMapper(chunks_attr='chunks'),
+             StaticProjectionMapper(np.random.randn(6, 2), demean=False)]
+    cm = ChainMapper(nodes, enable_ca=['forward_profile'])
+    cm.train(ds)
+    target = cm.forward(ds)
+    # profile is also available without fusing
+    assert_equal([p[0] for p in cm.ca.forward_profile], nodes)
+    assert_false(any([p[3] for p in cm.ca.forward_profile]))
+
+    fcm = ChainMapper(nodes, fused=True, enable_ca=['forward_profile'])
+    assert_true('fused=True' in repr(fcm))
+    assert_true(copy(fcm).fused)
+    mds = fcm.forward(ds)
+    assert_array_equal(mds.samples, target.samples)
+    # input is untouched
+    assert_array_equal(ds.samples, orig)
+    # flattening creates a view of the input. Feature selection creates a
+    # new buffer, but in Fortran order -- detrending creates a C-ordered
+    # working buffer, which is z-scored in place
+    profile = fcm.ca.forward_profile
+    assert_equal([p[3] for p in profile], [False, False, False, True, False])
+    assert_equal([p[2] for p in profile],
+                 [0, 20 * 6 * 8, 20 * 6 * 8, 0, 20 * 2 * 8])
+    # plain data are forwarded normally
+    assert_array_equal(ChainMapper(nodes[:2], fused=True).forward(ds.samples),
+                       ds.samples.reshape(20, -1)[:, [0, 2, 3, 5, 7, 11]])
+    # any number of mappers can work on the same buffer
+    nodes = [FlattenMapper(),
+             PolyDetrendMapper(polyord=1, chunks_attr='chunks'),
+             ZScoreMapper(chunks_attr='chunks'),
+             PolyDetrendMapper(polyord=0)]
+    cm = ChainMapper(nodes)
+    cm.train(ds)
+    target = cm.forward(ds)
+    fcm = ChainMapper(nodes, fused=True, enable_ca=['forward_profile'])
+    assert_array_equal(fcm.forward(ds).samples, target.samples)
+    assert_equal([p[3] for p in fcm.ca.forward_profile],
+                 [False, False, True, True])
+    assert_array_equal(ds.samples, orig)
+
+
 def test_sampleslicemapper():
     # this does nothing but Dataset.__getitem__ which is tested elsewhere -- but
     # at least we run it
@@ -122,3 +122,54 @@ def test_polydetrend():
     # but if done inplace that is no longer true
     poly_detrend(ds, chunks_attr='chunks', polyord=1, space='time')
     assert_array_equal(ds, mds)
+
+
+def test_polydetrend_blockwise():
+    # interleaved chunks of different length and polyord
+    chunks = np.array([0] * 20 + [1] * 30 + [2] * 20 + [0] * 5)
+    samples = np.random.normal(size=(len(chunks), 4)) \
+              + np.arange(len(chunks))[:, None] ** 2
+    ds = Dataset(samples, sa=dict(chunks=chunks, zeros=np.zeros(len(chunks))))
+    polyord = [2, 1, 2]
+    dm = PolyDetrendMapper(chunks_attr='chunks', polyord=polyord)
+    mds = dm.forward(ds)
+    # runs of identical length and polyord share the basis
+    assert_equal(len(dm._chunk_bases), 3)
+    assert_true(dm._chunk_bases[0][1] is not dm._chunk_bases[2][1])
+    # the full design is solved when there are additional regressors
+    # (a zero regressor doesn't change anything)
+    dm_full = PolyDetrendMapper(chunks_attr='chunks', polyord=polyord,
+                                opt_regs=['zeros'])
+    mds_full = dm_full.forward(ds)
+    assert_true(dm_full._chunk_bases is None)
+    assert_array_almost_equal(mds.samples, mds_full.samples)
+    # input is untouched
+    assert_array_equal(ds.samples, samples)
+    # runs of equal length
+    ds = Dataset(samples[:60], sa=dict(chunks=np.repeat(range(3), 20)))
+    dm = PolyDetrendMapper(chunks_attr='chunks', polyord=2)
+    dm.train(ds)
+    assert_true(dm._chunk_bases[0][1] is dm._chunk_bases[2][1])
+    assert_equal(dm._chunk_bases[0][0], slice(0, 20))
+
+
+def test_polydetrend_float32():
+    samples = np.random.normal(size=(60, 5)) + np.arange(60)[:, None]
+    chunks = np.repeat(range(3), 20)
+    ds64 = Dataset(samples, sa=dict(chunks=chunks))
+    ds32 = Dataset(samples.astype(np.float32), sa=dict(chunks=chunks))
+    mds32 = PolyDetrendMapper(chunks_attr='chunks', polyord=2).forward(ds32)
+    mds64 = PolyDetrendMapper(chunks_attr='chunks', polyord=2).forward(ds64)
+    # no hidden upcast
+    assert_equal(mds32.samples.dtype, np.float32)
+    assert_equal(mds64.samples.dtype, np.float64)
+    # float32 agrees up to ~1e-5 relative to float64
+    assert_array_almost_equal(mds32.samples, mds64.samples, decimal=4)
+    # same in-place
+    poly_detrend(ds32, chunks_attr='chunks', polyord=2)
+    assert_equal(ds32.samples.dtype, np.float32)
+    assert_array_almost_equal(ds32.samples, mds64.samples, decimal=4)
+    # integers are converted into float64 by default
+    dsint = Dataset(np.round(samples).astype(np.int16), sa=dict(chunks=chunks))
+    assert_equal(PolyDetrendMapper(chunks_attr='chunks').forward(dsint)
+                 .samples.dtype, np.float64)
@@ -462,3 +462,67 @@ def test_4d_mask():
     bold2 = fmri_dataset(bold, mask=mask4d)
     assert_equal(bold1.shape, bold2.shape)
     assert_raises(ValueError, fmri_dataset, bold, mask=mask4df)
+
+
+def test_fmri_dataset_lazy():
+    import nibabel
+    bold = pathjoin(pymvpa_dataroot, 'bold.nii.gz')
+    mask = pathjoin(pymvpa_dataroot, 'mask.nii.gz')
+    for m in (mask, pathjoin(pymvpa_dataroot, 'mask4d.nii.gz'), None):
+        ds = fmri_dataset(bold, mask=m, targets=1, chunks=2,
+                          add_fa={'mask': mask})
+        ds_lazy = fmri_dataset(bold, mask=m, targets=1, chunks=2,
+                               add_fa={'mask': mask}, lazy=True)
+        assert_equal(ds_lazy.samples.dtype, np.float32)
+        assert_datasets_almost_equal(ds, ds_lazy)
+        assert_equal(repr(ds.a.mapper), repr(ds_lazy.a.mapper))
+    # mapping back works
+    assert_array_equal(map2nifti(ds_lazy).get_data(),
+                       map2nifti(ds).get_data())
+    # list of 3D volumes
+    img = nibabel.load(pathjoin(pymvpa_dataroot, 'example4d.nii.gz'))
+    vols = [nibabel.Nifti1Image(img.get_data()[..., i], img.affine)
+            for i in range(img.shape[-1])]
+    volmask = np.zeros(img.shape[:3], dtype='bool')
+    volmask[40:50, 20:30, 12] = True
+    assert_datasets_almost_equal(fmri_dataset(vols, mask=volmask, lazy=True),
+                                 fmri_dataset(vols, mask=volmask))
+    assert_raises(ValueError, fmri_dataset, bold, lazy=True,
+                  mask=pathjoin(pymvpa_dataroot, 'mask4dfail.nii.gz'))
+    assert_raises(ValueError, fmri_dataset, np.zeros((2, 3, 4, 5)),
+                  lazy=True)
+
+
+@with_tempfile(suffix='.nii')
+def test_fmri_dataset_lazy_memory(filename):
+    import os
+    import sys
+    import subprocess
+    import nibabel
+    import mvpa2
+    if not sys.platform.startswith('linux'):
+        raise SkipTest("ru_maxrss is reported in KB only on Linux")
+    # ~40MB of int16
+    data = np.ones((64, 64, 32, 150), dtype='int16')
+    nibabel.save(nibabel.Nifti1Image(data, np.eye(4)), filename)
+    del data
+    # measure the peak RSS increase of the loading only in a fresh process
+    script = """
+import resource
+import numpy as np
+import mvpa2.datasets.mri as mri
+mri._LAZY_BLOCK_BYTES = 2 ** 20
+mask = np.zeros((64, 64, 32), dtype='bool')
+mask[10:20, 10:20, 10:20] = True
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+ds = mri.fmri_dataset(%r, mask=mask, lazy=True)
+assert ds.shape == (150, 1000)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+""" % filename
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(mvpa2.__file__))]
+        + env.get('PYTHONPATH', '').split(os.pathsep))
+    out = subprocess.check_output([sys.executable, '-c', script], env=env)
+    # far less than the ~40MB (40960 KB) of the full image
+    assert_true(int(out.strip().split()[-1]) < 10 * 1024)
@@ -130,6 +130,26 @@ def test_openfmri_dataset():
     assert_equal([(len(m),) + m[1].shape for m in motion], [(1, 121, 6)] * 12)
 
 
+def test_openfmri_parallel_loading():
+    skip_if_no_external('nibabel')
+
+    of = ofm.OpenFMRIDataset(pathjoin(pymvpa_dataroot, 'haxby2001'))
+    kwargs = dict(flavor='1slice', run_ids=[1, 2, 3, 4],
+                  mask=pathjoin(pymvpa_dataroot, 'mask.nii.gz'))
+    ds_serial = of.get_model_bold_dataset(1, 1, **kwargs)
+    assert_equal([t[:3] for t in of.load_timings],
+                 [(1, 1, run, ) for run in (1, 2, 3, 4)])
+    ds_parallel = of.get_model_bold_dataset(1, 1, nproc=3, **kwargs)
+    assert_equal(len(of.load_timings), 4)
+    assert_true(all(t[3] >= 0 for t in of.load_timings))
+    # same order, same content
+    assert_datasets_equal(ds_serial, ds_parallel)
+    assert_array_equal(ds_parallel.sa.run, np.repeat([1, 2, 3, 4], 121))
+    # unstacked too
+    dss = of.get_model_bold_dataset(1, 1, nproc=None, stack=False, **kwargs)
+    assert_equal([d.sa.chunks[0] for d in dss], range(4))
+
+
 def test_tutorialdata_loader_masking():
     skip_if_no_external('nibabel')
 
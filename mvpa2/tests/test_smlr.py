@@ -14,6 +14,7 @@ from mvpa2.testing import *
 from mvpa2.testing.datasets import datasets
 
 from mvpa2.clfs.smlr import SMLR
+from mvpa2.datasets.base import Dataset
 from mvpa2.misc.data_generators import normal_feature_dataset
 
 
@@ -64,3 +65,33 @@ def test_smlr_sensitivities(clf):
     # again
     sens = clf.get_sensitivity_analyzer(force_train=False)(None)
     assert_equal(sens.shape, (len(data.UT) - 1, data.nfeatures))
+
+
+def test_smlr_c_strided_float32():
+    if not SMLR().params.implementation == 'C':
+        raise SkipTest("C implementation of SMLR is not available")
+    data = normal_feature_dataset(perlabel=20, nlabels=3, nfeatures=12)
+    # non-contiguous float32 view
+    samples = np.asfortranarray(data.samples, dtype=np.float32)[:, ::2]
+    assert_false(samples.flags['C_CONTIGUOUS'])
+    ds_view = Dataset(samples, sa=data.sa)
+    ds_copy = Dataset(np.array(samples, dtype=np.double, order='C'),
+                      sa=data.sa)
+    # no bias, so no copy is made on the Python side
+    weights = []
+    for ds in (ds_view, ds_copy):
+        clf = SMLR(has_bias=False, seed=1)
+        clf.train(ds)
+        weights.append(clf.weights)
+    assert_array_almost_equal(weights[0], weights[1])
+
+
+def test_smlr_nthreads():
+    data = normal_feature_dataset(perlabel=400, nlabels=2, nfeatures=10,
+                                  snr=3)
+    clfs = [SMLR(nthreads=n, seed=1) for n in (1, 2, 0)]
+    for clf in clfs:
+        clf.train(data)
+    for clf in clfs[1:]:
+        assert_array_almost_equal(clf.weights, clfs[0].weights)
+        assert_array_equal(clf.predict(data), clfs[0].predict(data))
@@ -67,6 +67,28 @@ class SOMMapperTests(unittest.TestCase):
                 # with bad initialization
                 self.assertTrue((np.round(rmapped) == colors).all())
 
+    def test_batch_som(self):
+        self.assertRaises(ValueError, SimpleSOMMapper, (10, 5), 20,
+                          mode='bogus')
+        colors = np.array([[0., 0., 0.], [0., 0., 1.], [0., 1., 0.],
+                          [1., 0., 0.], [0., 1., 1.], [1., 0., 1.],
+                          [1., 1., 0.], [1., 1., 1.]])
+        samples = np.repeat(colors, 10, axis=0)
+        som = SimpleSOMMapper((10, 5), 50, mode='batch')
+        self.assertTrue("mode='batch'" in repr(som))
+        som.train(samples)
+        self.assertEqual(som.K.shape, (10, 5, 3))
+
+        # batched BMU search matches the search for individual samples
+        fmapped = som.forward(colors)
+        self.assertTrue(fmapped.shape == (8, 2))
+        self.assertTrue((fmapped == [som._get_bmu(c) for c in colors]).all())
+
+        if cfg.getboolean('tests', 'labile', default='yes'):
+            # averaging of all assigned samples approximately restores
+            # the input
+            self.assertTrue((np.round(som.reverse(fmapped)) == colors).all())
+
 
 def suite():  # pragma: no cover
     return unittest.makeSuite(SOMMapperTests)
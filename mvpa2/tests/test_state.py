@@ -332,6 +332,31 @@ class StateTests(unittest.TestCase):
             self.assertEqual(sv.name, sv_dc.name)
             self.assertEqual(sv._instance_index, sv_dc._instance_index)
 
+    def test_assignment_shortcut(self):
+        # values get assigned directly, bypassing the value property, and
+        # the outcome must not depend on it
+        proper = TestClassProper()
+        proper.ca.state2 = 1
+        self.assertTrue(proper.ca.is_set('state2'))
+        self.assertEqual(proper.ca.state2, 1)
+        if not (__debug__ and 'ENFORCE_CA_ENABLED' in debug.active):
+            proper.ca.state1 = 2
+            self.assertFalse(proper.ca.is_set('state1'))
+            self.assertFalse(proper.ca.is_enabled('state1'))
+        # (dis)abling takes effect immediately
+        proper.ca.enable('state1')
+        self.assertTrue(proper.ca.is_enabled('state1'))
+        proper.ca.state1 = 3
+        self.assertEqual(proper.ca.state1, 3)
+        proper.ca.disable('state2')
+        proper.ca.reset('state2')
+        proper.ca.state2 = 4
+        self.assertFalse(proper.ca.is_set('state2'))
+        # unknown names are not enabled, and plain attributes still work
+        self.assertFalse(proper.ca.is_enabled('bogus'))
+        proper.ca.bogus = 5
+        self.assertEqual(proper.ca.bogus, 5)
+
 def suite():  # pragma: no cover
     return unittest.makeSuite(StateTests)
 
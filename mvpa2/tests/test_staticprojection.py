@@ -31,3 +31,72 @@ def test_staticprojection_reverse_fa():
     assert_equal(dsfr.nfeatures, 6)
     assert_equal(dsfr.fa.attr_length, 6)   # .fa knows about them again
     dsfr.fa['new'] = np.arange(6)
+
+
+def test_sparse_staticprojection():
+    skip_if_no_external('scipy')
+    import scipy.sparse as sps
+    from mvpa2.mappers.staticprojection import chain_projections
+    ds = datasets['uni2small']
+    nf = ds.nfeatures
+    # local "neighborhood" projections
+    proj = sps.csc_matrix(np.eye(nf) + np.diag(np.arange(1, nf), 1) * 0.1)
+    proj2 = sps.csr_matrix(np.eye(nf)[:, ::-1] * 2)
+    dproj, dproj2 = proj.toarray(), proj2.toarray()
+
+    for recon in (None, proj.T):
+        spm = StaticProjectionMapper(proj=proj, recon=recon)
+        dpm = StaticProjectionMapper(
+                proj=dproj, recon=None if recon is None else recon.toarray())
+        dsf = spm.forward(ds)
+        assert_true(isinstance(dsf.samples, np.ndarray))
+        assert_array_almost_equal(dsf.samples, dpm.forward(ds).samples)
+        # reverse with least-squares solution matches the pseudo-inverse
+        assert_array_almost_equal(spm.reverse(dsf).samples,
+                                  dpm.reverse(dsf).samples)
+        # projection has not been densified
+        assert_true(sps.issparse(spm.proj))
+    # there is no dense pseudo-inverse of sparse projections
+    assert_raises(ValueError, lambda: StaticProjectionMapper(proj=proj).recon)
+
+    if externals.exists('h5py'):
+        from mvpa2.base.hdf5 import h5save, h5load
+        spm = StaticProjectionMapper(proj=proj, recon=proj.T)
+        spm.train(ds)
+        with tempfile.NamedTemporaryFile(suffix='.hdf5') as f:
+            h5save(f.name, spm)
+            lspm = h5load(f.name)
+        assert_true(sps.issparse(lspm.proj))
+        assert_true(sps.issparse(lspm.recon))
+        assert_array_equal(lspm.proj.toarray(), dproj)
+        assert_array_almost_equal(lspm.forward(ds).samples,
+                                  spm.forward(ds).samples)
+
+    # chaining of sparse projections stays sparse
+    m1 = StaticProjectionMapper(proj=proj, recon=proj.T)
+    m2 = StaticProjectionMapper(proj=proj2, recon=proj2.T)
+    cm = chain_projections([m1, m2])
+    assert_true(sps.issparse(cm.proj))
+    assert_true(sps.issparse(cm.recon))
+    assert_array_almost_equal(cm.proj.toarray(), np.dot(dproj, dproj2))
+    assert_array_almost_equal(cm.recon.toarray(), np.dot(dproj2.T, dproj.T))
+    # and maps like the chain of mappers
+    target = m2.forward(m1.forward(ds))
+    assert_array_almost_equal(cm.forward(ds).samples, target.samples)
+    # including demeaning of trained mappers
+    m1.train(ds)
+    m2.train(m1.forward(ds))
+    target = m2.forward(m1.forward(ds))
+    cm = chain_projections([m1, m2])
+    assert_true(cm.is_trained)
+    assert_array_almost_equal(cm.forward(ds).samples, target.samples)
+    assert_array_almost_equal(cm.reverse(target).samples,
+                              m1.reverse(m2.reverse(target)).samples)
+    # offset of the first mapper is preserved
+    assert_array_almost_equal(cm._offset_in, m1._offset_in)
+    # cannot mix trained and untrained
+    assert_raises(ValueError, chain_projections,
+                  [m1, StaticProjectionMapper(proj=proj2)])
+    # or have offsets in intermediate spaces
+    m2.train(ds)
+    assert_raises(ValueError, chain_projections, [m1, m2])
@@ -10,10 +10,13 @@
 
 import inspect
 import re
+import subprocess
 import sys
 import unittest
 
+from mvpa2 import cfg
 from mvpa2.base.dochelpers import get_docstring_split
+from mvpa2.testing import labile, SkipTest
 
 class SuiteTest(unittest.TestCase):
 
@@ -25,6 +28,82 @@ class SuiteTest(unittest.TestCase):
         except Exception, e: # pragma: no cover - should not be hit if ok_
             self.fail(msg="Cannot import everything from mvpa2.suite: %s" % e)
 
+    def test_lazy_suite(self):
+        import mvpa2.suite as mv
+        LazySuite = mv._module._LazySuite
+        full = LazySuite(mv._module)
+        everything = full._load_all()
+        # resolve names in an order different from the one of imports
+        suite = LazySuite(mv._module)
+        names = sorted(k for k in everything if not k.startswith('_'))
+        for name in names[::-1]:
+            self.assertTrue(getattr(suite, name) is everything[name],
+                            msg="%s differs from eager import" % name)
+        self.assertEqual(sorted(suite.__all__), names)
+        self.assertRaises(AttributeError, getattr, suite, 'no_such_thing')
+        self.assertRaises(AttributeError, getattr, suite, '_ENTRIES')
+
+    def test_suite_names(self):
+        # 'import *' provides the names of an eager import of all parts of
+        # the suite, in the order of the entries
+        lazy = """\
+from mvpa2.suite import *
+print sorted(k for k in dir() if not k.startswith('_'))
+"""
+        eager = """\
+import importlib
+import mvpa2.suite
+suite = mvpa2.suite._module
+names = dict((k, v) for k, v in vars(suite).iteritems()
+             if not k.startswith('_'))
+for condition, modname, entry_names in suite._ENTRIES:
+    if suite._condition_holds(condition):
+        names.update(suite._entry_names(importlib.import_module(modname),
+                                        entry_names))
+print sorted(names)
+"""
+        names = [subprocess.check_output([sys.executable, '-c', code]
+                                         ).strip().split('\n')[-1]
+                 for code in (lazy, eager)]
+        self.assertEqual(names[0], names[1])
+        # submodules imported later on are not provided
+        for name in ('collections', 'state', 'learner', 'dataset'):
+            self.assertFalse(repr(name) in names[0], msg=name)
+
+    def test_suite_import_time(self):
+        # guard against regressions of the import time of the suite:
+        # accessing a few names should not import everything
+        code = """\
+import sys
+import mvpa2.suite as mv
+mv.Dataset, mv.Splitter, mv.zscore
+print [m for m in ('mvpa2.clfs.warehouse', 'mvpa2.clfs.gpr',
+                   'mvpa2.measures.rsa', 'pylab') if m in sys.modules]
+"""
+        out = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(out.strip().split('\n')[-1], '[]')
+
+    @labile(3, 1)
+    def test_suite_import_timing(self):
+        if not cfg.getboolean('tests', 'labile', default='yes'):
+            raise SkipTest("Timing of imports is labile")
+        # accessing a few names should take less time than importing the
+        # rest of the suite
+        code = """\
+import time
+t0 = time.time()
+import mvpa2.suite as mv
+mv.Dataset, mv.Splitter, mv.zscore
+t1 = time.time()
+from mvpa2.suite import *
+print t1 - t0, time.time() - t1
+"""
+        out = subprocess.check_output([sys.executable, '-c', code])
+        t_lazy, t_rest = map(float, out.strip().split('\n')[-1].split())
+        self.assertTrue(t_lazy < t_rest,
+                        msg="Accessing a few names of mvpa2.suite took %.2fs, "
+                            "importing the rest %.2fs" % (t_lazy, t_rest))
+
     def test_docstrings(self):
         #import mvpa2.suite as mv
         from mvpa2.suite import suite_stats
@@ -143,6 +143,43 @@ class SurfTests(unittest.TestCase):
         for k, v in some_ds.iteritems():
             assert_true(abs(v - ds2[k]) < eps)
 
+        if externals.exists('scipy'):
+            # batch computation of neighborhoods gives the same distances
+            radius = 1.5
+            n2d = s.dijkstra_distance_matrix(radius, src=[2, 0, 77])
+            assert_equal(n2d.shape, (3, s.nvertices))
+            full = s.dijkstra_distance_matrix(radius)
+            assert_array_almost_equal(n2d.toarray()[1], full.toarray()[0])
+            # sequential queries are answered from cached blocks
+            s_seq = surf.Surface(s.vertices, s.faces)
+            for i, src in enumerate([2, 0, 77]):
+                expected = s.dijkstra_distance(src, radius)
+                row = n2d.getrow(i)
+                assert_equal(set(row.indices), set(expected))
+                for j, d in zip(row.indices, row.data):
+                    assert_almost_equal(d, expected[j])
+            for src in xrange(s.nvertices):
+                assert_equal(sorted(s_seq.dijkstra_distance(src, radius)),
+                             sorted(full.getrow(src).indices))
+            assert_true(radius in s_seq._dijkstra_blocks)
+            assert_equal(s.adjacency_matrix.nnz,
+                         sum(len(v) for v in s.neighbors.itervalues()))
+
+        # Euclidean neighborhoods and nearest nodes agree with brute force
+        for src in [0, 2, 77, (.5, -.2, .3)]:
+            for radius in [0., .3, 1.5, 10.]:
+                ds = s.euclidean_distance(src)
+                expected = np.nonzero(ds <= radius)[0]
+                idxs, nds = s.euclidean_neighborhood(src, radius)
+                assert_array_equal(idxs, expected)
+                assert_array_almost_equal(nds, ds[expected])
+        xyz = np.random.normal(size=(20, 3))
+        nearest = [np.argmin(np.sum((s.vertices - c) ** 2, 1)) for c in xyz]
+        assert_array_equal(s.nearest_node_index(xyz), nearest)
+        assert_array_equal(s.nearest_node_index(xyz, np.arange(10, 100)),
+                [10 + np.argmin(np.sum((s.vertices[10:100] - c) ** 2, 1))
+                 for c in xyz])
+
         # test I/O (through ascii files)
         surf.write(temp_fn, s, overwrite=True)
         s2 = surf.read(temp_fn)
@@ -849,6 +849,112 @@ class SurfVoxelSelectionTests(unittest.TestCase):
         d._src2aux['foo'][1] = np.asarray('bar')
         assert_raises(TypeError, _dict_with_arrays2array_tuple, d._src2aux)
 
+    @with_tempfile('.h5py', 'voxsel')
+    def test_csr_volume_mask_dictionary(self, fn):
+        vg = volgeom.VolGeom((10, 10, 10), np.identity(4))
+        outer = surf.generate_sphere(10) * 5 + 5
+        inner = surf.generate_sphere(10) * 3 + 5
+        vs = volsurf.VolSurfMaximalMapping(vg, outer, inner)
+        sel = surf_voxel_selection.voxel_selection(vs, 2.)
+
+        csr = volume_mask_dict.CSRVolumeMaskDictionary.\
+                    from_volume_mask_dictionary(sel)
+        assert_equal(csr, sel)
+        assert_equal(sel, csr)
+        assert_equal(sorted(csr.keys()), sorted(sel.keys()))
+        assert_equal(set(csr.aux_keys()), set(sel.aux_keys()))
+        assert_equal(csr.get_targets(), sel.get_targets())
+        assert_array_equal(csr.get_mask(), sel.get_mask())
+        assert_array_equal(csr.get_mask([0, 5]), sel.get_mask([0, 5]))
+        for target in xrange(vg.nvoxels):
+            assert_equal(csr.target2sources(target),
+                         sel.target2sources(target))
+        assert_raises(KeyError, csr.__getitem__, -1)
+        assert_raises(ValueError, csr.add, 0, [1])
+        assert_raises(ValueError, csr.add, -1, [1], dict(foo=[1]))
+
+        # masks can still be added
+        aux = dict((k, [.5]) for k in csr.aux_keys())
+        target = sel.get_targets()[0]
+        csr.add(-1, [target, 4], aux)
+        assert_equal(csr[-1], [target, 4])
+        assert_equal(csr.target2sources(target) - sel.target2sources(target),
+                     set([-1]))
+
+        if externals.exists('h5py'):
+            h5save(fn, csr)
+            loaded = h5load(fn)
+            assert_true(isinstance(loaded,
+                                   volume_mask_dict.CSRVolumeMaskDictionary))
+            assert_equal(loaded, csr)
+
+        npz_fn = fn + '.npz'
+        try:
+            csr.save_npz(npz_fn)
+            for mmap_mode in (None, 'r'):
+                loaded = volume_mask_dict.CSRVolumeMaskDictionary.load_npz(
+                                            npz_fn, mmap_mode=mmap_mode)
+                assert_equal(loaded, csr)
+                assert_equal(loaded.meta, sel.meta)
+                assert_equal(isinstance(loaded._indices, np.memmap),
+                             mmap_mode is not None)
+            # works in a query engine
+            qe = SurfaceVerticesQueryEngine(loaded)
+            ds = fmri_dataset(vg.get_masked_nifti_image())
+            qe.train(ds)
+            assert_equal(len(qe[0]), len(sel[0]))
+        finally:
+            os.unlink(npz_fn)
+
+        # masks can also be named
+        named = volume_mask_dict.CSRVolumeMaskDictionary(vg, None)
+        named.add('b', [3, 4])
+        named.add('a', [4, 5])
+        assert_raises(ValueError, named.add, 'a', [1])
+        assert_raises(TypeError, named.add, 1.5, [1])
+        assert_equal(named['a'], [4, 5])
+        named.add('c', [6])
+        assert_equal(sorted(named.keys()), ['a', 'b', 'c'])
+        assert_equal(named['b'], [3, 4])
+        assert_equal(named.target2sources(4), set(['a', 'b']))
+        assert_raises(KeyError, named.__getitem__, 'd')
+
+    @reseed_rng()
+    def test_vectorized_voxel_attributes(self):
+        # array-based implementation gives the same result as the
+        # dictionary-based one
+        n2v = dict((nd, dict((vx, np.random.randint(3) / 2.)
+                             for vx in np.random.randint(30, size=4)))
+                   for nd in xrange(20))
+        n2v[3] = None
+        n2d = dict((nd, np.random.randint(6) / 2.) for nd in xrange(0, 25, 2))
+        selector = surf_voxel_selection.VoxelSelector(5., None, n2v)
+        fast = selector.nodes2voxel_attributes(n2d, n2v)
+        slow = selector.nodes2voxel_attributes_slow(n2d, n2v)
+        labels = (surf_voxel_selection.LINEAR_VOXEL_INDICES,
+                  surf_voxel_selection.CENTER_DISTANCES,
+                  surf_voxel_selection.GREY_MATTER_POSITION)
+        assert_equal(sorted(fast.keys()), sorted(labels))
+        d = fast[surf_voxel_selection.CENTER_DISTANCES]
+        assert_true(np.all(np.diff(d) >= 0))
+        # order among voxels at the same distance can differ
+        for key in labels:
+            assert_array_equal(np.sort(fast[key]), np.sort(slow[key]))
+        assert_equal(dict(zip(fast[labels[0]], fast[labels[2]])),
+                     dict(zip(slow[labels[0]], slow[labels[2]])))
+
+        # selection of the nearest voxels by chunks of equal distance
+        for count in xrange(len(d) + 2):
+            expected = selector._select_approx(dict(fast), count=count)
+            selection = surf_voxel_selection._select_nearest(
+                                    np.random.permutation(d), count)
+            if expected is None:
+                assert_true(selection is None)
+            else:
+                assert_equal(np.sum(selection),
+                             len(expected[surf_voxel_selection.
+                                          CENTER_DISTANCES]))
+
 
 
 def _cartprod(d):
@@ -203,4 +203,93 @@ def test_zscore_withoutchunks():
     zscore(ds, chunks_attr=None)
     assert(np.any(ds.samples != np.arange(32).reshape((8,-1))))
     ds_summary = ds.summary()
-    assert(ds_summary is not None)
\ No newline at end of file
+    assert(ds_summary is not None)
+
+def _train_forward(mapper, ds):
+    mapper.train(ds)
+    return mapper.forward(ds)
+
+
+def test_zscore_float32():
+    from mvpa2.base import cfg
+    from mvpa2.datasets import Dataset
+    samples = np.random.normal(loc=100, scale=10, size=(40, 6))
+    chunks = np.repeat(range(4), 10)
+    ds64 = Dataset(samples, sa=dict(chunks=chunks))
+    ds32 = Dataset(samples.astype(np.float32), sa=dict(chunks=chunks))
+    for chunks_attr in ('chunks', None):
+        zs32 = _train_forward(ZScoreMapper(chunks_attr=chunks_attr), ds32)
+        # no hidden upcast
+        assert_equal(zs32.samples.dtype, np.float32)
+        zs64 = _train_forward(ZScoreMapper(chunks_attr=chunks_attr), ds64)
+        # float32 agrees up to ~1e-5 relative to float64
+        assert_array_almost_equal(zs32.samples, zs64.samples, decimal=4)
+    # in-place
+    ds32z = ds32.copy()
+    zscore(ds32z)
+    assert_equal(ds32z.samples.dtype, np.float32)
+
+    # integer data gets upcasted into the configured dtype
+    dsint = Dataset(np.round(samples).astype(np.int16), sa=dict(chunks=chunks))
+    assert_equal(_train_forward(ZScoreMapper(), dsint).samples.dtype, np.float64)
+    assert_equal(_train_forward(ZScoreMapper(dtype='float32'), dsint).samples.dtype,
+                 np.float32)
+    if not cfg.has_section('datasets'):
+        cfg.add_section('datasets')
+    cfg.set('datasets', 'float dtype', 'float32')
+    try:
+        assert_equal(_train_forward(ZScoreMapper(), dsint).samples.dtype, np.float32)
+    finally:
+        cfg.remove_option('datasets', 'float dtype')
+
+
+def test_zscore_grouped():
+    from mvpa2.datasets import Dataset
+    samples = np.random.normal(loc=50, scale=5, size=(60, 4))
+    # interleaved chunks of different size
+    chunks = np.array([2, 0, 1] * 15 + [1] * 15)
+    targets = np.arange(60) % 4
+    ds = Dataset(samples, sa=dict(chunks=chunks, targets=targets))
+    ref = samples.copy()
+    for c in (0, 1, 2):
+        cmask = chunks == c
+        est = samples[cmask & (targets < 2)]
+        ref[cmask] = (samples[cmask] - est.mean(axis=0)) / est.std(axis=0)
+    for block_size in (None, 1, 7, 1000):
+        zm = ZScoreMapper(param_est=('targets', [0, 1]), block_size=block_size)
+        zm.train(ds)
+        assert_array_almost_equal(zm.forward(ds).samples, ref)
+        assert_array_equal(ds.samples, samples)
+    # in-place
+    zm = ZScoreMapper(param_est=('targets', [0, 1]), inplace=True)
+    zm.train(ds)
+    zds = zm.forward(ds)
+    ok_(zds is ds)
+    assert_array_almost_equal(ds.samples, ref)
+    ok_('inplace=True' in repr(zm))
+
+
+def test_zscore_memmap():
+    import tempfile
+    import os
+    from mvpa2.datasets import Dataset
+    samples = np.random.normal(loc=10, scale=3, size=(50, 6)).astype('float32')
+    chunks = np.repeat(range(5), 10)
+    ref = Dataset(samples.copy(), sa=dict(chunks=chunks))
+    zscore(ref)
+    fd, fname = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        mm = np.memmap(fname, dtype='float32', mode='w+', shape=samples.shape)
+        mm[:] = samples
+        ds = Dataset(mm, sa=dict(chunks=chunks))
+        zscore(ds, block_size=4)
+        # still the same memory map, now z-scored
+        ok_(ds.samples is mm)
+        mm.flush()
+        del ds, mm
+        mm = np.memmap(fname, dtype='float32', mode='r', shape=samples.shape)
+        assert_array_almost_equal(mm, ref.samples, decimal=5)
+        del mm
+    finally:
+        os.unlink(fname)
@@ -10,10 +10,14 @@
 """Python distutils setup for PyMVPA"""
 
 from numpy.distutils.core import setup, Extension
+from numpy.distutils.command.build_ext import build_ext
+from distutils.errors import CompileError, LinkError
 import fnmatch
 import glob
 import os
+import shutil
 import sys
+import tempfile
 
 
 if sys.version_info[:2] < (2, 6):
@@ -50,6 +54,13 @@ for arg in ('--with-libsvm', '--with-system-libsvm'):
     # assure since default is 'auto' wouldn't fail if it is N/A
     bind_libsvm = 'system'
 
+# SMLR could process samples in parallel if built with OpenMP (if the
+# compiler supports it, see build_ext_openmp)
+smlrc_openmp = sys.platform.startswith('linux')
+if sys.argv.count('--no-openmp'):
+    sys.argv.remove('--no-openmp')
+    smlrc_openmp = False
+
 # when no libsvm bindings are requested explicitly
 if sys.argv.count('--no-libsvm'):
     # clean argv if necessary (or distutils will complain)
@@ -101,11 +112,45 @@ smlrc_ext = Extension(
     #library_dirs = library_dirs,
     libraries=['m'] if not sys.platform.startswith('win') else [],
     # extra_compile_args = ['-O0'],
-    extra_link_args=extra_link_args,
+    extra_compile_args=['-fopenmp'] if smlrc_openmp else [],
+    extra_link_args=extra_link_args + (['-fopenmp'] if smlrc_openmp else []),
     language='c')
 
 ext_modules = [smlrc_ext]
 
+
+class build_ext_openmp(build_ext):
+    """Build extensions without OpenMP if the compiler does not support it
+    """
+    def _has_openmp(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            src = os.path.join(tmpdir, 'openmp_test.c')
+            with open(src, 'w') as f:
+                f.write('#include <omp.h>\n'
+                        'int test(void) { return omp_get_max_threads(); }\n')
+            objs = self.compiler.compile([src], output_dir=tmpdir,
+                                         extra_postargs=['-fopenmp'])
+            self.compiler.link_shared_object(
+                objs, os.path.join(tmpdir, 'openmp_test.so'),
+                extra_postargs=['-fopenmp'])
+        except (CompileError, LinkError):
+            return False
+        finally:
+            shutil.rmtree(tmpdir)
+        return True
+
+    def build_extension(self, ext):
+        if '-fopenmp' in ext.extra_compile_args and not self._has_openmp():
+            print("Compiler does not support OpenMP, building %s without it"
+                  % ext.name)
+            ext.extra_compile_args = [a for a in ext.extra_compile_args
+                                      if a != '-fopenmp']
+            ext.extra_link_args = [a for a in ext.extra_link_args
+                                   if a != '-fopenmp']
+        build_ext.build_extension(self, ext)
+
+
 if bind_libsvm:
     ext_modules.append(libsvmc_ext)
 
@@ -216,7 +261,8 @@ def setup_package():
                                        '*.txt', '*.nii.gz', '*.rtc', 'README', '*.bin',
                                        '*.dat', '*.dat.gz', '*.mat', '*.fsf', '*.par'),
           scripts=glob.glob(os.path.join('bin', '*')),
-          ext_modules=ext_modules
+          ext_modules=ext_modules,
+          cmdclass={'build_ext': build_ext_openmp}
           )
 
 